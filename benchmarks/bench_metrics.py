@@ -0,0 +1,118 @@
+"""
+Cost of the metrics surface: the same application served with and without
+MetricsModule, driven through raw ASGI calls (no HTTP client in the way), plus
+the cost of a single histogram observation and of a timed @Transactional call.
+
+    python benchmarks/bench_metrics.py [requests]
+"""
+import asyncio
+import sys
+import time
+from pynidus import NidusFactory, Module, Controller, Get, Injectable, Transactional, MetricsModule, MetricsRegistry
+from pynidus.core.metrics import disable_metrics, enable_metrics
+
+
+@Injectable()
+class ItemService:
+    def find(self, item_id: int):
+        return {"id": item_id}
+
+
+@Controller("/items")
+class ItemController:
+    def __init__(self, service: ItemService):
+        self.service = service
+
+    @Get("/{item_id}")
+    async def show(self, item_id: int):
+        return self.service.find(item_id)
+
+
+class NoopManager:
+    def begin(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class Service:
+    transaction_manager = NoopManager()
+
+    @Transactional()
+    def work(self):
+        return 1
+
+
+def application(metrics: bool):
+    imports = [MetricsModule.for_root()] if metrics else []
+
+    @Module(imports=imports, controllers=[ItemController], providers=[ItemService])
+    class AppModule:
+        pass
+
+    return NidusFactory.create(AppModule)
+
+
+async def serve(app, count: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/items/7", "raw_path": b"/items/7", "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / count
+
+
+def per_call(func, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    plain = application(metrics=False)
+    instrumented = application(metrics=True)
+    registry = instrumented.state.nidus.container[MetricsRegistry]
+    # Interleaved, best of five, so that machine noise affects both alike
+    baseline = enabled = float("inf")
+    for _ in range(5):
+        baseline = min(baseline, asyncio.run(serve(plain, count)))
+        enabled = min(enabled, asyncio.run(serve(instrumented, count)))
+    disable_metrics(registry)
+
+    print(f"requests: {count}")
+    print(f"request without metrics      {baseline * 1e6:8.2f} us")
+    print(f"request with metrics         {enabled * 1e6:8.2f} us   overhead {(enabled - baseline) * 1e6:+.2f} us")
+
+    child = MetricsRegistry().request_duration.labels("GET", "/items/{item_id}", "ItemController.show")
+    print(f"observe()                    {per_call(lambda: child.observe(0.003), count * 10) * 1e6:8.2f} us")
+
+    service = Service()
+    untimed = per_call(service.work, count * 10)
+    enable_metrics(MetricsRegistry())
+    timed = per_call(service.work, count * 10)
+    disable_metrics()
+    print(f"@Transactional               {untimed * 1e6:8.2f} us")
+    print(f"@Transactional with metrics  {timed * 1e6:8.2f} us   overhead {(timed - untimed) * 1e6:+.2f} us")
+
+
+if __name__ == "__main__":
+    main()
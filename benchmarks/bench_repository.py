@@ -0,0 +1,105 @@
+"""
+Repository bulk operations against naive ORM loops, on a SQLite file:
+inserts (session.add loop vs bulk_insert), full scans (.all() vs stream)
+and deep pages (OFFSET vs keyset seek).
+
+    python benchmarks/bench_repository.py [rows]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from sqlalchemy import select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from pynidus.db import Database, DatabaseConfig, Repository
+
+
+class BenchBase(DeclarativeBase):
+    pass
+
+
+class Event(BenchBase):
+    __tablename__ = "events"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+    value: Mapped[int]
+
+
+def fresh_database(directory: Path, name: str) -> Database:
+    database = Database(DatabaseConfig(f"sqlite:///{directory / name}.db"))
+    BenchBase.metadata.create_all(database.engine)
+    return database
+
+
+def rows(count: int):
+    return ({"id": index, "name": f"event{index}", "value": index % 97} for index in range(count))
+
+
+def timed(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def report(label: str, elapsed: float, peak: int):
+    print(f"{label:32} {elapsed * 1000:9.1f} ms   peak {peak / 1e6:7.1f} MB")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        naive_db = fresh_database(directory, "naive")
+        bulk_db = fresh_database(directory, "bulk")
+
+        def naive_insert():
+            with naive_db.session() as session:
+                for row in rows(count):
+                    session.add(Event(**row))
+                session.commit()
+
+        def bulk_insert():
+            with bulk_db.session() as session:
+                Repository(session, model=Event).bulk_insert(rows(count))
+                session.commit()
+
+        print(f"rows: {count}")
+        report("insert: session.add loop", *timed(naive_insert)[:2])
+        report("insert: bulk_insert", *timed(bulk_insert)[:2])
+
+        def naive_scan():
+            with bulk_db.session() as session:
+                return sum(event.value for event in session.scalars(select(Event)).all())
+
+        def stream_scan():
+            with bulk_db.session() as session:
+                return sum(event.value for event in Repository(session, model=Event).stream(chunk=1000))
+
+        report("scan: .all()", *timed(naive_scan)[:2])
+        report("scan: stream(chunk=1000)", *timed(stream_scan)[:2])
+
+        last_page = max(count - 100, 0)
+
+        def offset_page():
+            with bulk_db.session() as session:
+                return session.scalars(select(Event).order_by(Event.id).offset(last_page).limit(100)).all()
+
+        def seek_page():
+            with bulk_db.session() as session:
+                return Repository(session, model=Event).seek(limit=100, after=(last_page - 1,)).items
+
+        report("last page: OFFSET", *timed(offset_page)[:2])
+        report("last page: seek", *timed(seek_page)[:2])
+
+        naive_db.engine.dispose()
+        bulk_db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
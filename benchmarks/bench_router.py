@@ -0,0 +1,62 @@
+"""
+Route matching latency: Starlette's linear scan against the radix tree,
+as the number of routes grows.
+
+    python benchmarks/bench_router.py
+"""
+import random
+import time
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+from pynidus.core.router import RadixTree
+
+
+def endpoint():
+    pass
+
+
+def build_routes(count: int):
+    routes = []
+    for index in range(count // 2):
+        routes.append(APIRoute(f"/resource{index}/{{item_id:int}}", endpoint, methods=["GET"]))
+        routes.append(APIRoute(f"/resource{index}/{{item_id:int}}/children/{{name}}", endpoint, methods=["GET"]))
+    return routes
+
+
+def linear_match(routes, scope):
+    for route in routes:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route, child_scope
+    return None
+
+
+def per_match(func, scopes) -> float:
+    start = time.perf_counter()
+    for scope in scopes:
+        func(scope)
+    return (time.perf_counter() - start) / len(scopes) * 1e6
+
+
+def main():
+    random.seed(0)
+    print(f"{'routes':>8} {'linear us':>12} {'radix us':>12} {'speedup':>9}")
+    for count in (10, 100, 500, 1000, 2000, 5000):
+        routes = build_routes(count)
+        tree = RadixTree()
+        for route in routes:
+            tree.insert(route)
+
+        scopes = []
+        for _ in range(2000):
+            index = random.randrange(count // 2)
+            path = random.choice([f"/resource{index}/17", f"/resource{index}/17/children/leaf"])
+            scopes.append({"type": "http", "method": "GET", "path": path, "root_path": ""})
+
+        linear = per_match(lambda scope: linear_match(routes, scope), scopes)
+        radix = per_match(lambda scope: tree.match(scope["method"], scope["path"]), scopes)
+        print(f"{count:>8} {linear:>12.2f} {radix:>12.2f} {linear / radix:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Resolution cost per provider scope: singleton lookups, request-scoped
+graphs built per request, plain transients and pooled transients.
+
+    python benchmarks/bench_scopes.py [iterations]
+"""
+import sys
+import time
+from pynidus import NidusFactory, Module, Injectable
+from pynidus.core.scope import RequestContext
+
+
+@Injectable()
+class Config:
+    def __init__(self):
+        self.values = {f"key{index}": index for index in range(32)}
+
+
+@Injectable()
+class SingletonService:
+    def __init__(self, config: Config):
+        self.config = config
+
+
+@Injectable(scope="request")
+class RequestService:
+    def __init__(self, config: Config):
+        self.config = config
+        self.lookup = {index: str(index) for index in range(256)}
+
+
+@Injectable(scope="transient")
+class TransientService:
+    def __init__(self, config: Config):
+        self.config = config
+        self.lookup = {index: str(index) for index in range(256)}
+
+
+@Injectable(scope="transient", pool_size=64)
+class PooledService:
+    def __init__(self, config: Config):
+        self.config = config
+        self.lookup = {index: str(index) for index in range(256)}
+
+    def on_recycle(self):
+        pass
+
+
+@Module(providers=[Config, SingletonService, RequestService, TransientService, PooledService])
+class BenchModule:
+    pass
+
+
+def per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    factory = NidusFactory.create(BenchModule).state.nidus
+
+    def request_scoped():
+        context = RequestContext()
+        factory.resolve(RequestService, context)
+        context.close()
+
+    def transient():
+        factory.resolve(TransientService, RequestContext())
+
+    def pooled_transient():
+        context = RequestContext()
+        factory.resolve(PooledService, context)
+        context.close()
+
+    print(f"iterations: {iterations}")
+    print(f"singleton:         {per_call(lambda: factory.resolve(SingletonService), iterations):7.3f} us/resolve")
+    print(f"request:           {per_call(request_scoped, iterations):7.3f} us/request")
+    print(f"transient:         {per_call(transient, iterations):7.3f} us/resolve")
+    print(f"pooled transient:  {per_call(pooled_transient, iterations):7.3f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+List responses of ORM entities: FastAPI's default path (jsonable_encoder then
+JSONResponse) against the precompiled serializer used by routes annotated with
+an entity type or declared with serialize=Model. Measures the encoding alone and
+whole requests through the application.
+
+    python benchmarks/bench_serializer.py [rows]
+"""
+import datetime
+import decimal
+import sys
+import time
+import uuid
+from typing import List, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from pynidus import NidusFactory, Module, Controller, Get
+from pynidus.db import compile_serializer
+
+
+class BenchBase(DeclarativeBase):
+    pass
+
+
+class Order(BenchBase):
+    __tablename__ = "orders"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    reference: Mapped[uuid.UUID]
+    customer: Mapped[str]
+    total: Mapped[decimal.Decimal]
+    created_at: Mapped[datetime.datetime]
+    shipped_on: Mapped[Optional[datetime.date]]
+    paid: Mapped[bool]
+    quantity: Mapped[int]
+
+
+def orders(count: int) -> List[Order]:
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        Order(
+            id=index,
+            reference=uuid.UUID(int=index),
+            customer=f"customer {index % 500}",
+            total=decimal.Decimal(index % 1000) / 4,
+            created_at=start + datetime.timedelta(minutes=index),
+            shipped_on=(start + datetime.timedelta(days=index % 30)).date() if index % 3 else None,
+            paid=index % 2 == 0,
+            quantity=index % 7,
+        )
+        for index in range(count)
+    ]
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label: str, elapsed: float, baseline: float):
+    print(f"{label:36} {elapsed * 1000:9.1f} ms   {baseline / elapsed:5.1f}x")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    entities = orders(count)
+    serializer = compile_serializer(Order)
+    assert JSONResponse(jsonable_encoder(entities)).body == serializer.encode(entities)
+
+    print(f"rows: {count}")
+    default = best_of(lambda: JSONResponse(jsonable_encoder(entities)).body)
+    report("encode: jsonable_encoder", default, default)
+    report("encode: compiled serializer", best_of(lambda: serializer.encode(entities)), default)
+
+    @Controller("/orders")
+    class OrderController:
+        @Get("/default")
+        def default(self):
+            return entities
+
+        @Get("/compiled")
+        def compiled(self) -> List[Order]:
+            return entities
+
+    @Module(controllers=[OrderController])
+    class AppModule:
+        pass
+
+    with TestClient(NidusFactory.create(AppModule)) as client:
+        default = best_of(lambda: client.get("/orders/default"))
+        report("request: default", default, default)
+        report("request: -> List[Order]", best_of(lambda: client.get("/orders/compiled")), default)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Startup benchmark: builds a synthetic graph of providers and measures
+compile() and create() separately.
+
+    python benchmarks/bench_startup.py [providers]
+"""
+import sys
+import time
+from pynidus import NidusFactory, Module, Injectable
+
+
+def build_module(size: int, fan_in: int = 3):
+    providers = []
+    for index in range(size):
+        dependencies = providers[max(0, index - fan_in):index]
+        params = ", ".join(f"d{position}" for position in range(len(dependencies)))
+        namespace = {}
+        source = f"def __init__(self{', ' if params else ''}{params}):\n    pass\n"
+        exec(source, namespace)
+        init = namespace["__init__"]
+        init.__annotations__ = {f"d{position}": dependency for position, dependency in enumerate(dependencies)}
+        providers.append(Injectable()(type(f"Provider{index}", (), {"__init__": init})))
+
+    @Module(providers=list(reversed(providers)))
+    class BenchModule:
+        pass
+
+    return BenchModule
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    module = build_module(size)
+
+    plan, compile_time = timed(lambda: NidusFactory.compile(module))
+    _, cold_time = timed(lambda: NidusFactory.create(module))
+    _, warm_time = timed(lambda: NidusFactory.create(plan))
+
+    print(f"providers:               {size}")
+    print(f"compile():               {compile_time * 1000:8.2f} ms")
+    print(f"create(module):          {cold_time * 1000:8.2f} ms")
+    print(f"create(compiled plan):   {warm_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
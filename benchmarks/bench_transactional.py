@@ -0,0 +1,112 @@
+"""
+Overhead of @Transactional and transactional() next to a bare call,
+with no-op managers so that only the wrapper cost is measured.
+
+    python benchmarks/bench_transactional.py [iterations]
+"""
+import asyncio
+import sys
+import time
+from pynidus import Transactional, transactional
+
+
+class SyncManager:
+    def begin(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class AsyncManager:
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class Service:
+    def __init__(self, manager):
+        self.transaction_manager = manager
+
+    def bare(self, value):
+        return value
+
+    async def bare_async(self, value):
+        return value
+
+    @Transactional()
+    def wrapped(self, value):
+        return value
+
+    @Transactional()
+    async def wrapped_async(self, value):
+        return value
+
+
+def per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for index in range(iterations):
+        func(index)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def per_call_async(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for index in range(iterations):
+        await func(index)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sync_service = Service(SyncManager())
+    async_service = Service(AsyncManager())
+    mixed_service = Service(SyncManager())
+
+    def sync_block(value):
+        with transactional(sync_service.transaction_manager):
+            return value
+
+    async def async_block(value):
+        async with transactional(async_service.transaction_manager):
+            return value
+
+    sync_transaction = transactional(sync_service.transaction_manager)
+    async_transaction = transactional(async_service.transaction_manager)
+
+    def reused_sync_block(value):
+        with sync_transaction:
+            return value
+
+    async def reused_async_block(value):
+        async with async_transaction:
+            return value
+
+    print(f"iterations: {iterations}")
+    bare = per_call(sync_service.bare, iterations)
+    print(f"sync bare call:                  {bare:7.3f} us/call")
+    print(f"sync @Transactional:             {per_call(sync_service.wrapped, iterations):7.3f} us/call")
+    print(f"sync with transactional():       {per_call(sync_block, iterations):7.3f} us/call")
+    print(f"sync with reused transactional:  {per_call(reused_sync_block, iterations):7.3f} us/call")
+
+    async def run_async():
+        bare = await per_call_async(async_service.bare_async, iterations)
+        print(f"async bare call:                 {bare:7.3f} us/call")
+        print(f"async @Transactional:            {await per_call_async(async_service.wrapped_async, iterations):7.3f} us/call")
+        print(f"async @Transactional, sync mgr:  {await per_call_async(mixed_service.wrapped_async, iterations):7.3f} us/call")
+        print(f"async with transactional():      {await per_call_async(async_block, iterations):7.3f} us/call")
+        print(f"async with reused transactional: {await per_call_async(reused_async_block, iterations):7.3f} us/call")
+
+    asyncio.run(run_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Regression suite of the framework hot paths, run offline against SQLite files
+and raw ASGI calls: create() on synthetic module graphs, request dispatch,
+@Transactional overhead, get_db/get_sync_db session acquisition and bulk
+database round-trips. Every metric is a duration (lower is better), the best of
+a few repeats. Results are written as JSON; compare exits with status 1 when a
+metric of the second file is slower than the first by more than the threshold.
+
+    python benchmarks/suite.py run [--quick] [--output results.json]
+    python benchmarks/suite.py compare baseline.json results.json [--threshold 0.15]
+
+To evaluate an upgrade, record a baseline on the reference machine, upgrade,
+run again on the same machine and compare both files.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from bench_startup import build_module
+from bench_transactional import AsyncManager, Service, SyncManager
+from pynidus import NidusFactory, Module, Controller, Get, Injectable
+from pynidus.db import Database, DatabaseConfig, Repository, get_db, get_sync_db
+from pynidus.db.database import set_default_database
+
+Metrics = Dict[str, Dict[str, Any]]
+
+# Each metric is the best of this many runs, which filters out most machine noise
+REPEATS = 5
+
+
+def best(func: Callable[[], float], repeats: int) -> float:
+    return min(func() for _ in range(repeats))
+
+
+def record(metrics: Metrics, name: str, value: float, unit: str):
+    metrics[name] = {"value": value, "unit": unit}
+    print(f"{name:36} {value:12.3f} {unit}")
+
+
+def bench_startup(metrics: Metrics, quick: bool):
+    sizes = (10, 100, 1000) if quick else (10, 100, 1000, 10_000)
+    for size in sizes:
+        module = build_module(size)
+        repeats = 1 if size >= 10_000 else REPEATS
+
+        def create() -> float:
+            start = time.perf_counter()
+            NidusFactory.create(module)
+            return time.perf_counter() - start
+        record(metrics, f"startup.create[{size}]", best(create, repeats) * 1000, "ms")
+
+
+def dispatch_application(controllers: int, routes: int, router: str):
+    @Injectable()
+    class LookupService:
+        def find(self, item_id: int):
+            return {"id": item_id}
+
+    def handler(index: int):
+        async def show(self, item_id: int):
+            return self.service.find(item_id)
+        show.__name__ = f"show{index}"
+        return Get(f"/route{index}/{{item_id}}")(show)
+
+    def init(self, service: LookupService):
+        self.service = service
+
+    controller_classes = []
+    for number in range(controllers):
+        namespace = {"__init__": init}
+        for index in range(routes):
+            namespace[f"show{index}"] = handler(index)
+        controller_classes.append(Controller(f"/controller{number}")(type(f"Controller{number}", (), namespace)))
+
+    @Module(controllers=controller_classes, providers=[LookupService])
+    class DispatchModule:
+        pass
+
+    return NidusFactory.create(DispatchModule, router=router)
+
+
+async def serve(app, paths: List[str]) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for path in paths:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / len(paths)
+
+
+def bench_dispatch(metrics: Metrics, quick: bool):
+    controllers, routes = 20, 10
+    count = 2_000 if quick else 10_000
+    generator = random.Random(7)
+    paths = [f"/controller{generator.randrange(controllers)}/route{generator.randrange(routes)}/{index}" for index in range(count)]
+    for router in ("default", "radix"):
+        app = dispatch_application(controllers, routes, router)
+        asyncio.run(serve(app, paths[:200]))
+        record(metrics, f"dispatch.request[{router}]", best(lambda: asyncio.run(serve(app, paths)), REPEATS) * 1e6, "us")
+
+
+def per_call(func: Callable[[int], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for index in range(iterations):
+        func(index)
+    return (time.perf_counter() - start) / iterations
+
+
+async def per_call_async(func: Callable[[int], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for index in range(iterations):
+        await func(index)
+    return (time.perf_counter() - start) / iterations
+
+
+def bench_transactional(metrics: Metrics, quick: bool):
+    iterations = 20_000 if quick else 200_000
+    sync_service = Service(SyncManager())
+    async_service = Service(AsyncManager())
+    record(metrics, "transactional.sync", best(lambda: per_call(sync_service.wrapped, iterations), REPEATS) * 1e6, "us")
+    record(
+        metrics, "transactional.async",
+        best(lambda: asyncio.run(per_call_async(async_service.wrapped_async, iterations)), REPEATS) * 1e6, "us",
+    )
+
+
+class SuiteBase(DeclarativeBase):
+    pass
+
+
+class Event(SuiteBase):
+    __tablename__ = "events"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+    value: Mapped[int]
+
+
+def bench_sessions(metrics: Metrics, quick: bool, database: Database):
+    iterations = 2_000 if quick else 20_000
+
+    def acquire_sync() -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            dependency = get_sync_db()
+            next(dependency).connection()
+            dependency.close()
+        return (time.perf_counter() - start) / iterations
+
+    async def acquire_async() -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            dependency = get_db()
+            session = await dependency.__anext__()
+            await session.connection()
+            await dependency.aclose()
+        return (time.perf_counter() - start) / iterations
+
+    async def run_async() -> float:
+        try:
+            return min([await acquire_async() for _ in range(REPEATS)])
+        finally:
+            await database.async_engine.dispose()
+
+    record(metrics, "session.get_sync_db", best(acquire_sync, REPEATS) * 1e6, "us")
+    record(metrics, "session.get_db", asyncio.run(run_async()) * 1e6, "us")
+
+
+def bench_bulk(metrics: Metrics, quick: bool, database: Database):
+    count = 10_000 if quick else 100_000
+    rows = [{"id": index, "name": f"event{index}", "value": index % 97} for index in range(count)]
+
+    def insert() -> float:
+        with database.session() as session:
+            session.query(Event).delete()
+            session.commit()
+            start = time.perf_counter()
+            Repository(session, model=Event).bulk_insert(rows)
+            session.commit()
+            return time.perf_counter() - start
+
+    def scan() -> float:
+        with database.session() as session:
+            start = time.perf_counter()
+            sum(event.value for event in Repository(session, model=Event).stream(chunk=1000))
+            return time.perf_counter() - start
+
+    def seek() -> float:
+        with database.session() as session:
+            repository = Repository(session, model=Event)
+            start = time.perf_counter()
+            page = repository.seek(limit=100)
+            while page.next_key is not None:
+                page = repository.seek(limit=100, after=page.next_key)
+            return time.perf_counter() - start
+
+    record(metrics, f"db.bulk_insert[{count}]", best(insert, REPEATS) * 1000, "ms")
+    record(metrics, f"db.stream[{count}]", best(scan, REPEATS) * 1000, "ms")
+    record(metrics, f"db.seek_pages[{count // 100}]", best(seek, REPEATS) * 1000, "ms")
+
+
+def run(quick: bool) -> Dict[str, Any]:
+    metrics: Metrics = {}
+    bench_startup(metrics, quick)
+    bench_dispatch(metrics, quick)
+    bench_transactional(metrics, quick)
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(DatabaseConfig(f"sqlite:///{Path(directory) / 'suite.db'}"))
+        SuiteBase.metadata.create_all(database.engine)
+        set_default_database(database)
+        try:
+            bench_sessions(metrics, quick, database)
+            bench_bulk(metrics, quick, database)
+        finally:
+            set_default_database(None)
+            database.engine.dispose()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "metrics": metrics,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Tuple[str, float]]:
+    """
+    Prints both runs side by side and returns the metrics slower than the
+    baseline by more than threshold (0.15 = 15%), with their relative change.
+    """
+    if baseline.get("quick") != current.get("quick"):
+        print("warning: comparing a --quick run with a full run")
+    regressions = []
+    for name, entry in baseline["metrics"].items():
+        measured = current["metrics"].get(name)
+        if measured is None:
+            print(f"{name:36} {entry['value']:12.3f} {'missing':>12}")
+            continue
+        change = measured["value"] / entry["value"] - 1 if entry["value"] else 0.0
+        regressed = change > threshold
+        if regressed:
+            regressions.append((name, change))
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:36} {entry['value']:12.3f} {measured['value']:12.3f} {entry['unit']:3} {change:+8.1%}{flag}")
+    for name in current["metrics"].keys() - baseline["metrics"].keys():
+        print(f"{name:36} {'new':>12} {current['metrics'][name]['value']:12.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Framework benchmark suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_command = commands.add_parser("run", help="run the suite")
+    run_command.add_argument("--quick", action="store_true", help="smaller sizes, for a smoke run")
+    run_command.add_argument("--output", help="JSON file to write the results to")
+    compare_command = commands.add_parser("compare", help="compare two result files")
+    compare_command.add_argument("baseline")
+    compare_command.add_argument("current")
+    compare_command.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown, 0.15 = 15%%")
+    arguments = parser.parse_args()
+
+    if arguments.command == "run":
+        results = run(arguments.quick)
+        if arguments.output:
+            Path(arguments.output).write_text(json.dumps(results, indent=2) + "\n")
+        return 0
+
+    baseline = json.loads(Path(arguments.baseline).read_text())
+    current = json.loads(Path(arguments.current).read_text())
+    regressions = compare(baseline, current, arguments.threshold)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {arguments.threshold:.0%}: {', '.join(name for name, _ in regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
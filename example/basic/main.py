@@ -1,5 +1,4 @@
 from pynidus import NidusFactory, Module, Controller, Injectable, Get
-import uvicorn
 
 @Injectable()
 class AppService:
@@ -23,8 +22,7 @@ class AppModule:
     pass
 
 def bootstrap():
-    app = NidusFactory.create(AppModule)
-    uvicorn.run(app, host="0.0.0.0", port=3000)
+    NidusFactory.listen(AppModule, host="0.0.0.0", port=3000)
 
 if __name__ == "__main__":
     bootstrap()
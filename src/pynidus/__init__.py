@@ -1,6 +1,72 @@
-from pynidus.core.module import Module
-from pynidus.core.factory import NidusFactory
-from pynidus.common.decorators.controller import Controller
-from pynidus.common.decorators.injectable import Injectable
-from pynidus.common.decorators.http import Get, Post, Put, Delete, Patch
-from pynidus.common.decorators.transactional import Transactional, TransactionManager
+from typing import TYPE_CHECKING
+
+# Public name -> module defining it. Each is imported on first access, so that
+# code using only the decorators does not load FastAPI or SQLAlchemy
+_EXPORTS = {
+    "Module": "pynidus.core.module",
+    "NidusFactory": "pynidus.core.factory",
+    "ApplicationPlan": "pynidus.core.plan",
+    "CircularDependencyError": "pynidus.core.plan",
+    "Provider": "pynidus.core.provider",
+    "Controller": "pynidus.common.decorators.controller",
+    "Injectable": "pynidus.common.decorators.injectable",
+    "Get": "pynidus.common.decorators.http",
+    "Post": "pynidus.common.decorators.http",
+    "Put": "pynidus.common.decorators.http",
+    "Delete": "pynidus.common.decorators.http",
+    "Patch": "pynidus.common.decorators.http",
+    "Stream": "pynidus.common.decorators.stream",
+    "StreamFormat": "pynidus.common.decorators.stream",
+    "ServerSentEvent": "pynidus.core.streaming",
+    "Transactional": "pynidus.common.decorators.transactional",
+    "TransactionManager": "pynidus.common.decorators.transactional",
+    "Propagation": "pynidus.common.decorators.transactional",
+    "transactional": "pynidus.common.decorators.transactional",
+    "RetryPolicy": "pynidus.common.retry",
+    "Cacheable": "pynidus.common.decorators.cache",
+    "CacheEvict": "pynidus.common.decorators.cache",
+    "CacheModule": "pynidus.common.cache",
+    "CacheStore": "pynidus.common.cache",
+    "InMemoryCacheStore": "pynidus.common.cache",
+    "Batched": "pynidus.common.decorators.batched",
+    "MetricsModule": "pynidus.core.metrics",
+    "MetricsRegistry": "pynidus.core.metrics",
+    "ProfilingModule": "pynidus.core.profiling",
+    "Profiler": "pynidus.core.profiling",
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # __import__ rather than importlib.import_module, which -X importtime does not report
+    value = getattr(__import__(module, fromlist=[name]), name)
+    # Later lookups no longer go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from pynidus.core.module import Module
+    from pynidus.core.factory import NidusFactory
+    from pynidus.core.plan import ApplicationPlan, CircularDependencyError
+    from pynidus.core.provider import Provider
+    from pynidus.common.decorators.controller import Controller
+    from pynidus.common.decorators.injectable import Injectable
+    from pynidus.common.decorators.http import Get, Post, Put, Delete, Patch
+    from pynidus.common.decorators.stream import Stream, StreamFormat
+    from pynidus.core.streaming import ServerSentEvent
+    from pynidus.common.decorators.transactional import Transactional, TransactionManager, Propagation, transactional
+    from pynidus.common.retry import RetryPolicy
+    from pynidus.common.decorators.cache import Cacheable, CacheEvict
+    from pynidus.common.cache import CacheModule, CacheStore, InMemoryCacheStore
+    from pynidus.common.decorators.batched import Batched
+    from pynidus.core.metrics import MetricsModule, MetricsRegistry
+    from pynidus.core.profiling import ProfilingModule, Profiler
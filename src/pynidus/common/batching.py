@@ -0,0 +1,105 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Set
+import asyncio
+
+
+class BatchLoader:
+    """
+    Collects the keys loaded during one event-loop tick (or `window` seconds)
+    and resolves them with a single call to `batch`, which receives the list of
+    keys and returns the values in the same order or a mapping of key to value.
+    Keys missing from a mapping resolve to None; an Exception instance returned
+    for a key is raised to its callers only. With cache=True, keys are loaded
+    once for the lifetime of the loader.
+    """
+    def __init__(self, batch: Callable[[List[Any]], Awaitable[Any]], max_batch: int = 100, window: float = 0.0, cache: bool = True):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1.")
+        self._batch = batch
+        self.max_batch = max_batch
+        self.window = window
+        self._cache: Optional[Dict[Hashable, asyncio.Future]] = {} if cache else None
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._handle: Optional[asyncio.Handle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._future(key)
+        # Shielded: a cancelled caller must not cancel the result other callers share
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: List[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self, key: Optional[Hashable] = None):
+        if self._cache is not None:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+    def _future(self, key: Hashable) -> asyncio.Future:
+        if self._cache is not None and key in self._cache:
+            return self._cache[key]
+        future = self._pending.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = self._pending[key] = loop.create_future()
+        if self._cache is not None:
+            self._cache[key] = future
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._handle is None:
+            if self.window > 0:
+                self._handle = loop.call_later(self.window, self._dispatch)
+            else:
+                self._handle = loop.call_soon(self._dispatch)
+        return future
+
+    def _dispatch(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self.batches += 1
+        # The task copies the current context, so the batch sees the caller's session scope
+        task = asyncio.get_running_loop().create_task(self._run(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: Dict[Hashable, asyncio.Future]):
+        keys = list(pending)
+        try:
+            results = await self._batch(keys)
+            if isinstance(results, Mapping):
+                values = [results.get(key) for key in keys]
+            else:
+                values = list(results)
+                if len(values) != len(keys):
+                    raise ValueError(f"Batch function returned {len(values)} values for {len(keys)} keys.")
+        except BaseException as error:
+            for key, future in pending.items():
+                self._fail(key, future, error)
+            if not isinstance(error, Exception):
+                raise
+            return
+
+        for key, value in zip(keys, values):
+            future = pending[key]
+            if isinstance(value, Exception):
+                self._fail(key, future, value)
+            elif not future.done():
+                future.set_result(value)
+
+    def _fail(self, key: Hashable, future: asyncio.Future, error: BaseException):
+        # Failures are not cached: the next load retries
+        if self._cache is not None and self._cache.get(key) is future:
+            del self._cache[key]
+        if not future.done():
+            future.set_exception(error)
+            # Retrieved here so that an unawaited failure is not reported
+            future.exception()
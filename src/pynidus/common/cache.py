@@ -0,0 +1,236 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Protocol, Tuple, Type
+import asyncio
+import threading
+import time
+from pynidus.core.module import Module
+from pynidus.core.provider import Provider
+from pynidus.core.scope import ApplicationBinding
+
+MISSING = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class CacheStore(Protocol):
+    """
+    Storage behind @Cacheable. Entries are grouped by cache name, each cache having
+    its own size limit. get() returns MISSING when there is no live entry.
+    """
+    def get(self, cache: str, key: Hashable) -> Any:
+        ...
+
+    def set(self, cache: str, key: Hashable, value: Any, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        ...
+
+    def delete(self, cache: str, key: Hashable):
+        ...
+
+    def clear(self, cache: str):
+        ...
+
+    def stats(self, cache: str) -> CacheStats:
+        # Optional: stores without counters report none
+        return CacheStats()
+
+
+class _Cache:
+    __slots__ = ("entries", "hits", "misses", "evictions")
+
+    def __init__(self):
+        # key -> (value, expires at or None), least recently used first
+        self.entries: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class InMemoryCacheStore(CacheStore):
+    """
+    In-process LRU store with per-entry TTL. Expired entries are dropped when read
+    or when they reach the LRU end; both count as evictions.
+    """
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._caches: Dict[str, _Cache] = {}
+        self._lock = threading.Lock()
+
+    def _cache(self, name: str) -> _Cache:
+        cache = self._caches.get(name)
+        if cache is None:
+            cache = self._caches.setdefault(name, _Cache())
+        return cache
+
+    def get(self, cache: str, key: Hashable) -> Any:
+        with self._lock:
+            entries = self._cache(cache)
+            entry = entries.entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    entries.entries.move_to_end(key)
+                    entries.hits += 1
+                    return value
+                del entries.entries[key]
+                entries.evictions += 1
+            entries.misses += 1
+            return MISSING
+
+    def set(self, cache: str, key: Hashable, value: Any, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        limit = max_entries or self.max_entries
+        with self._lock:
+            entries = self._cache(cache)
+            entries.entries[key] = (value, expires_at)
+            entries.entries.move_to_end(key)
+            while len(entries.entries) > limit:
+                entries.entries.popitem(last=False)
+                entries.evictions += 1
+
+    def delete(self, cache: str, key: Hashable):
+        with self._lock:
+            self._cache(cache).entries.pop(key, None)
+
+    def clear(self, cache: str):
+        with self._lock:
+            self._cache(cache).entries.clear()
+
+    def stats(self, cache: str) -> CacheStats:
+        with self._lock:
+            entries = self._cache(cache)
+            return CacheStats(entries.hits, entries.misses, entries.evictions, len(entries.entries))
+
+
+# The store of each application, bound by CacheModule
+DEFAULT_CACHE_STORE = ApplicationBinding("cache_store")
+
+
+def default_cache_store() -> CacheStore:
+    """
+    The store used by instances without a 'cache_store' attribute: the one
+    CacheModule configured for the current application, or a process-wide
+    InMemoryCacheStore.
+    """
+    store = DEFAULT_CACHE_STORE.get()
+    if store is None:
+        store = InMemoryCacheStore()
+        DEFAULT_CACHE_STORE.set(store)
+    return store
+
+
+def set_default_cache_store(store: Optional[CacheStore]):
+    DEFAULT_CACHE_STORE.set(store)
+
+
+class CacheModule:
+    @staticmethod
+    def for_root(store: Optional[CacheStore] = None, max_entries: int = 1024) -> Type[Any]:
+        """
+        Builds a module providing CacheStore, which also becomes the store of
+        every @Cacheable method of the application. Pass your own implementation
+        to use a shared cache.
+
+            CacheModule.for_root(store=RedisCacheStore(...))
+        """
+        def create_store() -> CacheStore:
+            return store if store is not None else InMemoryCacheStore(max_entries)
+
+        @Module(providers=[Provider(CacheStore, use_factory=create_store)], exports=[CacheStore])
+        class ConfiguredCacheModule:
+            # Bound when the module is registered, for the application importing it
+            __bindings__ = {DEFAULT_CACHE_STORE: CacheStore}
+
+        return ConfiguredCacheModule
+
+
+# Result of a call_async whose leader was cancelled
+_ABANDONED = object()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations of the same key: the first caller computes,
+    the others wait for its result (or its exception).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Any] = {}
+
+    def call(self, key: Hashable, compute):
+        with self._lock:
+            waiter = self._calls.get(key)
+            leader = waiter is None
+            if leader:
+                waiter = self._calls[key] = _Call()
+        if not leader:
+            return waiter.wait()
+        try:
+            result = compute()
+        except BaseException as error:
+            waiter.fail(error)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+        waiter.resolve(result)
+        return result
+
+    async def call_async(self, key: Hashable, compute):
+        loop = asyncio.get_running_loop()
+        # Keyed by event loop as well: futures cannot be shared between loops
+        key = (id(loop), key)
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            result = await asyncio.shield(future)
+            if result is not _ABANDONED:
+                return result
+            # The leader was cancelled: the first waiter to get here computes instead
+        future = self._calls[key] = loop.create_future()
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            # A client going away must not fail the others waiting for the same key
+            future.set_result(_ABANDONED)
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Retrieved here so that an unawaited failure is not reported
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+    def resolve(self, result: Any):
+        self.result = result
+        self.event.set()
+
+    def fail(self, error: BaseException):
+        self.error = error
+        self.event.set()
+
+    def wait(self) -> Any:
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
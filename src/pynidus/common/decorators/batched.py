@@ -0,0 +1,78 @@
+from typing import Any, Callable, Hashable, List, Optional
+from functools import partial, update_wrapper
+from types import MethodType
+import inspect
+import weakref
+from pynidus.common.batching import BatchLoader
+from pynidus.core.scope import RequestContextMiddleware, current_request_context
+
+class BatchedMethod:
+    """
+    Method wrapper built by @Batched. Calling it with one key returns that key's
+    value; calls made in the same tick are resolved by one call of the batch method.
+    """
+    def __init__(self, func: Callable[..., Any], max_batch: int, window_ms: float, cache: bool):
+        if not inspect.iscoroutinefunction(func):
+            raise ValueError(f"@Batched needs an async method, got {func.__qualname__}.")
+        self.func = func
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self.cache = cache
+        # Loaders used outside of requests, without caching
+        self._loaders: "weakref.WeakKeyDictionary[Any, BatchLoader]" = weakref.WeakKeyDictionary()
+        update_wrapper(self, func)
+
+    def __set_name__(self, owner: type, name: str):
+        # Per-request caching needs a request context even when no provider is request scoped
+        middleware = tuple(getattr(owner, "__middleware__", ()))
+        if RequestContextMiddleware not in middleware:
+            owner.__middleware__ = (RequestContextMiddleware,) + middleware
+
+    def __get__(self, instance: Any, owner: Optional[type] = None):
+        if instance is None:
+            return self
+        return partial(self.load, instance)
+
+    def loader(self, instance: Any) -> BatchLoader:
+        """
+        The loader of an instance: one per request (caching the loaded keys for the
+        rest of the request) or, outside of requests, one per instance without caching.
+        """
+        context = current_request_context()
+        if context is None:
+            loader = self._loaders.get(instance)
+            if loader is None:
+                # Held weakly: the loader is the value of its own instance's weak key
+                method = weakref.WeakMethod(MethodType(self.func, instance))
+                loader = self._loaders[instance] = BatchLoader(lambda keys: method()(keys), self.max_batch, self.window, cache=False)
+            return loader
+        loader = context.items.get((self, instance))
+        if loader is None:
+            loader = context.items[(self, instance)] = BatchLoader(partial(self.func, instance), self.max_batch, self.window, self.cache)
+        return loader
+
+    async def load(self, instance: Any, key: Hashable) -> Any:
+        return await self.loader(instance).load(key)
+
+    async def load_many(self, instance: Any, keys: List[Hashable]) -> List[Any]:
+        return await self.loader(instance).load_many(keys)
+
+def Batched(max_batch: int = 100, window_ms: float = 0, cache: bool = True):
+    """
+    Turns an async batch method (a list of keys in, values in the same order or a
+    key -> value mapping out) into a single-key method whose concurrent calls are
+    batched, removing N+1 queries:
+
+        @Batched(max_batch=500)
+        async def get_user(self, ids: List[int]) -> List[User]:
+            ...
+
+        users = await asyncio.gather(*(service.get_user(id) for id in ids))
+
+    Calls made in the same event-loop tick (or within window_ms) share a batch of at
+    most max_batch keys. Within a request, loaded keys are cached (cache=False disables it).
+    The batch runs in a task that shares the caller's session scope.
+    """
+    def wrapper(func: Callable[..., Any]) -> BatchedMethod:
+        return BatchedMethod(func, max_batch, window_ms, cache)
+    return wrapper
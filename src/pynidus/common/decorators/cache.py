@@ -0,0 +1,128 @@
+from typing import Any, Callable, Hashable, Optional, TypeVar, Union
+from functools import wraps
+import inspect
+from pynidus.common.cache import MISSING, CacheStore, SingleFlight, default_cache_store
+
+T = TypeVar("T")
+
+KeySpec = Union[None, str, Callable[..., Hashable]]
+
+def _store_of(instance: Any) -> CacheStore:
+    store = getattr(instance, "cache_store", None)
+    return store if store is not None else default_cache_store()
+
+def _key_builder(func: Callable[..., Any], key: KeySpec) -> Callable[[Any, tuple, dict], Hashable]:
+    """
+    Builds the cache key from the call arguments, self excluded. A callable
+    receives the arguments like the method, a string is formatted with them
+    by name ("user:{user_id}"), and by default the values of the arguments given
+    are the key.
+    """
+    if callable(key):
+        return lambda self, args, kwargs: key(*args, **kwargs)
+
+    signature = inspect.signature(func)
+
+    def arguments(self, args, kwargs, defaults):
+        bound = signature.bind(self, *args, **kwargs)
+        if defaults:
+            bound.apply_defaults()
+        values = dict(bound.arguments)
+        values.pop(next(iter(signature.parameters)))
+        return values
+
+    if isinstance(key, str):
+        return lambda self, args, kwargs: key.format(**arguments(self, args, kwargs, True))
+
+    def default_key(self, args, kwargs):
+        # The arguments given, so that f(1) and f(x=1) share an entry
+        if not kwargs:
+            return args
+        return tuple(arguments(self, args, kwargs, False).values())
+    return default_key
+
+def Cacheable(ttl: Optional[float] = None, key: KeySpec = None, max_entries: Optional[int] = None, name: Optional[str] = None):
+    """
+    Caches the results of a provider or controller method, sync or async.
+    Entries live for ttl seconds (until evicted when None), in the instance's
+    'cache_store' attribute or the CacheModule store. Concurrent misses on a key
+    are coalesced: one call computes, the others wait for its result.
+    """
+    def wrapper(func: Callable[..., T]) -> Callable[..., T]:
+        cache = name or f"{func.__module__}.{func.__qualname__}"
+        build_key = _key_builder(func, key)
+        flight = SingleFlight()
+
+        @wraps(func)
+        def sync_wrapper(self, *args, **kwargs):
+            store = _store_of(self)
+            cache_key = build_key(self, args, kwargs)
+            value = store.get(cache, cache_key)
+            if value is not MISSING:
+                return value
+
+            def compute():
+                value = func(self, *args, **kwargs)
+                store.set(cache, cache_key, value, ttl, max_entries)
+                return value
+            return flight.call((id(store), cache_key), compute)
+
+        @wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            store = _store_of(self)
+            cache_key = build_key(self, args, kwargs)
+            value = store.get(cache, cache_key)
+            if value is not MISSING:
+                return value
+
+            async def compute():
+                value = await func(self, *args, **kwargs)
+                store.set(cache, cache_key, value, ttl, max_entries)
+                return value
+            return await flight.call_async((id(store), cache_key), compute)
+
+        result = async_wrapper if inspect.iscoroutinefunction(func) else sync_wrapper
+        setattr(result, "__cache_name__", cache)
+        return result
+    return wrapper
+
+def CacheEvict(cache: Union[str, Callable[..., Any]], key: KeySpec = None, all_entries: bool = False, before: bool = False):
+    """
+    Evicts from a cache when the method succeeds (or before it runs with before=True).
+    cache is the @Cacheable method or its cache name. The key is built from this
+    method's arguments as in @Cacheable; all_entries empties the cache instead.
+    """
+    name = cache if isinstance(cache, str) else getattr(cache, "__cache_name__", None)
+    if name is None:
+        raise ValueError(f"{cache!r} is not a @Cacheable method.")
+
+    def wrapper(func: Callable[..., T]) -> Callable[..., T]:
+        build_key = None if all_entries else _key_builder(func, key)
+
+        def evict(self, args, kwargs):
+            store = _store_of(self)
+            if build_key is None:
+                store.clear(name)
+            else:
+                store.delete(name, build_key(self, args, kwargs))
+
+        @wraps(func)
+        def sync_wrapper(self, *args, **kwargs):
+            if before:
+                evict(self, args, kwargs)
+            result = func(self, *args, **kwargs)
+            if not before:
+                evict(self, args, kwargs)
+            return result
+
+        @wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            if before:
+                evict(self, args, kwargs)
+            result = await func(self, *args, **kwargs)
+            if not before:
+                evict(self, args, kwargs)
+            return result
+
+        return async_wrapper if inspect.iscoroutinefunction(func) else sync_wrapper
+    return wrapper
@@ -1,10 +1,16 @@
+from typing import Optional
+from pynidus.common.decorators.http import collect_routes
 
-def Controller(prefix: str = ""):
+def Controller(prefix: str = "", executor: Optional[str] = None):
     """
     Decorator that marks a class as a controller.
+    The route table is collected once, when the class is decorated.
+    executor is the default executor of its sync handlers (see @Get).
     """
     def wrapper(cls):
         setattr(cls, "__is_controller__", True)
         setattr(cls, "__prefix__", prefix)
+        setattr(cls, "__executor__", executor)
+        setattr(cls, "__route_table__", collect_routes(cls))
         return cls
     return wrapper
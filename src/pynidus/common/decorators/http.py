@@ -1,36 +1,96 @@
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, List, Tuple
 
 class RouteDefinition:
-    def __init__(self, path: str, method: str):
+    def __init__(self, path: str, method: str, executor: Optional[str] = None, serialize: Any = None):
         self.path = path
         self.method = method
+        self.executor = executor
+        self.serialize = serialize
 
-def Get(path: str = "/"):
+    def __repr__(self) -> str:
+        return f"RouteDefinition({self.method} {self.path})"
+
+def _mark(func: Callable[..., Any], route: RouteDefinition) -> Callable[..., Any]:
+    # A function may carry several routes (e.g. @Get and @Post stacked)
+    routes = list(getattr(func, "__routes__", ()))
+    routes.append(route)
+    setattr(func, "__routes__", routes)
+    setattr(func, "__route__", route)
+    return func
+
+def Get(path: str = "/", executor: Optional[str] = None, serialize: Any = None):
+    """
+    Registers a GET route (Post, Put, Delete and Patch alike). executor sends a sync
+    handler to a named pool instead of the shared threadpool: "cpu" (a process pool)
+    or one configured with NidusFactory.create(executors={...}). serialize is a mapped
+    class (or a compiled serializer) whose entities are encoded by a precompiled serializer.
+    """
     def wrapper(func: Callable[..., Any]):
-        setattr(func, "__route__", RouteDefinition(path, "GET"))
-        return func
+        return _mark(func, RouteDefinition(path, "GET", executor, serialize))
     return wrapper
 
-def Post(path: str = "/"):
+def Post(path: str = "/", executor: Optional[str] = None, serialize: Any = None):
     def wrapper(func: Callable[..., Any]):
-        setattr(func, "__route__", RouteDefinition(path, "POST"))
-        return func
+        return _mark(func, RouteDefinition(path, "POST", executor, serialize))
     return wrapper
 
-def Put(path: str = "/"):
+def Put(path: str = "/", executor: Optional[str] = None, serialize: Any = None):
     def wrapper(func: Callable[..., Any]):
-        setattr(func, "__route__", RouteDefinition(path, "PUT"))
-        return func
+        return _mark(func, RouteDefinition(path, "PUT", executor, serialize))
     return wrapper
 
-def Delete(path: str = "/"):
+def Delete(path: str = "/", executor: Optional[str] = None, serialize: Any = None):
     def wrapper(func: Callable[..., Any]):
-        setattr(func, "__route__", RouteDefinition(path, "DELETE"))
-        return func
+        return _mark(func, RouteDefinition(path, "DELETE", executor, serialize))
     return wrapper
 
-def Patch(path: str = "/"):
+def Patch(path: str = "/", executor: Optional[str] = None, serialize: Any = None):
     def wrapper(func: Callable[..., Any]):
-        setattr(func, "__route__", RouteDefinition(path, "PATCH"))
-        return func
+        return _mark(func, RouteDefinition(path, "PATCH", executor, serialize))
     return wrapper
+
+def route_definitions(value: Any) -> List[RouteDefinition]:
+    """
+    Returns the routes declared on a class attribute, looking through
+    staticmethod/classmethod and decorators that keep __wrapped__.
+    """
+    routes: List[RouteDefinition] = []
+    seen = set()
+    while value is not None and id(value) not in seen:
+        seen.add(id(value))
+        for route in getattr(value, "__routes__", None) or ([value.__route__] if hasattr(value, "__route__") else []):
+            if route not in routes:
+                routes.append(route)
+        # Route decorators may sit above or below @staticmethod
+        value = value.__func__ if isinstance(value, (staticmethod, classmethod)) else getattr(value, "__wrapped__", None)
+    return routes
+
+def collect_routes(cls: type) -> List[Tuple[str, RouteDefinition]]:
+    """
+    Builds the route table of a controller class: (attribute name, route) pairs
+    in definition order, base classes first. Methods overridden in a subclass
+    replace the inherited ones. Duplicate method + path pairs are rejected.
+    """
+    table = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            routes = route_definitions(value)
+            if routes:
+                table[name] = routes
+            elif name in table:
+                # Overridden without a route decorator
+                del table[name]
+
+    entries: List[Tuple[str, RouteDefinition]] = []
+    owners = {}
+    for name, routes in table.items():
+        for route in routes:
+            key = (route.method, route.path)
+            if key in owners:
+                raise ValueError(
+                    f"Route {route.method} {route.path} is defined by both "
+                    f"{cls.__name__}.{owners[key]} and {cls.__name__}.{name}."
+                )
+            owners[key] = name
+            entries.append((name, route))
+    return entries
@@ -1,10 +1,25 @@
+from pynidus.core.scope import Scope
 
-def Injectable():
+def Injectable(lazy: bool = False, scope: str = Scope.SINGLETON, pool_size: int = 0):
     """
     Decorator that marks a class as a provider.
+    With lazy=True the container injects a proxy and only builds the
+    instance on first use.
+    scope is "singleton" (default), "request" or "transient"; transient
+    providers can keep up to pool_size instances for reuse.
     """
+    if scope not in Scope.ALL:
+        raise ValueError(f"Unknown scope '{scope}'. Expected one of {', '.join(Scope.ALL)}.")
+    if pool_size and scope != Scope.TRANSIENT:
+        raise ValueError("pool_size is only supported for transient providers.")
+    if lazy and scope != Scope.SINGLETON:
+        raise ValueError("lazy is only supported for singleton providers.")
+
     def wrapper(cls):
         # We can add metadata here if needed
         setattr(cls, "__is_injectable__", True)
+        setattr(cls, "__lazy__", lazy)
+        setattr(cls, "__scope__", scope)
+        setattr(cls, "__pool_size__", pool_size)
         return cls
     return wrapper
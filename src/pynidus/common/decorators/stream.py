@@ -0,0 +1,30 @@
+from typing import Any, Callable, Optional
+
+class StreamFormat:
+    NDJSON = "ndjson"
+    CSV = "csv"
+    SSE = "sse"
+
+    ALL = (NDJSON, CSV, SSE)
+
+class StreamOptions:
+    def __init__(self, format: Optional[str] = None):
+        self.format = format
+
+    def __repr__(self) -> str:
+        return f"StreamOptions({self.format})"
+
+def Stream(format: Optional[str] = None):
+    """
+    Streams the items returned by a controller method (a generator, an async
+    generator or any iterable) instead of serializing a whole response.
+    format is "ndjson", "csv" or "sse"; without it the Accept header decides,
+    falling back to NDJSON. Generator methods are streamed even without @Stream.
+    """
+    if format is not None and format not in StreamFormat.ALL:
+        raise ValueError(f"Unknown stream format '{format}'. Expected one of {', '.join(StreamFormat.ALL)}.")
+
+    def wrapper(func: Callable[..., Any]):
+        setattr(func, "__stream__", StreamOptions(format))
+        return func
+    return wrapper
@@ -1,6 +1,11 @@
-from typing import Protocol, Any, Callable, TypeVar, Optional, Union
+from typing import Protocol, Any, Callable, Dict, Tuple, TypeVar, Optional
 from functools import wraps
 import inspect
+import time
+import weakref
+from pynidus.common.retry import RetryPolicy
+from pynidus.core.lazy import unwrap
+from pynidus.core.metrics import current_metrics
 
 T = TypeVar("T")
 
@@ -24,56 +29,278 @@ class AsyncTransactionManager(Protocol):
     async def rollback(self) -> Any:
         ...
 
-def Transactional():
+class Propagation:
+    """
+    How a @Transactional call relates to a transaction that is already running.
+    """
+    REQUIRED = "required"
+    REQUIRES_NEW = "requires_new"
+    NESTED = "nested"
+    SUPPORTS = "supports"
+
+    ALL = (REQUIRED, REQUIRES_NEW, NESTED, SUPPORTS)
+
+_MISSING = object()
+
+# Manager type -> whether its begin/commit/rollback are coroutine functions
+_classified: "weakref.WeakKeyDictionary[type, Tuple[bool, bool, bool]]" = weakref.WeakKeyDictionary()
+
+def classify_manager(manager: Any) -> Tuple[bool, bool, bool]:
+    """
+    Tells which of begin/commit/rollback are coroutine functions.
+    The result is cached per manager type when the methods are defined on the class.
+    """
+    # Lazy proxies all share one type: classify the instance behind them
+    manager = unwrap(manager)
+    cls = type(manager)
+    kind = _classified.get(cls)
+    if kind is not None:
+        return kind
+
+    kind = (
+        inspect.iscoroutinefunction(manager.begin),
+        inspect.iscoroutinefunction(manager.commit),
+        inspect.iscoroutinefunction(manager.rollback),
+    )
+    instance_attributes = getattr(manager, "__dict__", {})
+    if not any(name in instance_attributes for name in ("begin", "commit", "rollback")):
+        _classified[cls] = kind
+    return kind
+
+_NO_OPTIONS: Dict[str, Any] = {}
+
+def _begin_options(read_only: bool, propagation: str) -> Dict[str, Any]:
+    if not read_only and propagation == Propagation.REQUIRED:
+        return _NO_OPTIONS
+    if propagation not in Propagation.ALL:
+        raise ValueError(f"Unknown propagation '{propagation}'. Expected one of {', '.join(Propagation.ALL)}.")
+
+    options: Dict[str, Any] = {}
+    if read_only:
+        options["read_only"] = True
+    if propagation != Propagation.REQUIRED:
+        options["propagation"] = propagation
+    return options
+
+def _manager_of(instance: Any) -> Any:
+    manager = getattr(instance, "transaction_manager", _MISSING)
+    if manager is _MISSING:
+        raise AttributeError(f"Instance of {instance.__class__.__name__} has no 'transaction_manager' attribute.")
+    return manager
+
+class transactional:
+    """
+    Context manager form of @Transactional, for hot loops and code without a service:
+
+        with transactional(manager):
+            ...
+        async with transactional(manager, propagation=Propagation.NESTED):
+            ...
+
+    The block commits when it completes and rolls back when it raises.
+    Retries are not supported, since a block cannot be re-run. In hot loops the
+    object can be created once and entered repeatedly.
+    """
+    __slots__ = ("manager", "begin_options", "kind")
+
+    def __init__(self, manager: Any, read_only: bool = False, propagation: str = Propagation.REQUIRED):
+        self.manager = manager
+        self.begin_options = _begin_options(read_only, propagation)
+        self.kind = classify_manager(manager)
+
+    def __enter__(self):
+        self.manager.begin(**self.begin_options)
+        return self.manager
+
+    def __exit__(self, exc_type, exc, traceback):
+        manager = self.manager
+        if exc_type is not None:
+            manager.rollback()
+            return False
+        try:
+            manager.commit()
+        except BaseException:
+            manager.rollback()
+            raise
+        return False
+
+    async def __aenter__(self):
+        begin_async, _, _ = self.kind
+        if begin_async:
+            await self.manager.begin(**self.begin_options)
+        else:
+            self.manager.begin(**self.begin_options)
+        return self.manager
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        manager = self.manager
+        _, commit_async, _ = self.kind
+        if exc_type is not None:
+            await self._rollback()
+            return False
+        try:
+            if commit_async:
+                await manager.commit()
+            else:
+                manager.commit()
+        except BaseException:
+            await self._rollback()
+            raise
+        return False
+
+    async def _rollback(self):
+        if self.kind[2]:
+            await self.manager.rollback()
+        else:
+            self.manager.rollback()
+
+def _timed(timer: Any, method: Callable[..., Any], options: Dict[str, Any]) -> Any:
+    start = time.perf_counter()
+    try:
+        return method(**options)
+    finally:
+        timer.observe(time.perf_counter() - start)
+
+async def _timed_async(timer: Any, method: Callable[..., Any], options: Dict[str, Any], is_async: bool) -> Any:
+    start = time.perf_counter()
+    try:
+        if is_async:
+            return await method(**options)
+        return method(**options)
+    finally:
+        timer.observe(time.perf_counter() - start)
+
+def Transactional(read_only: bool = False, propagation: str = Propagation.REQUIRED, retry: Optional[RetryPolicy] = None):
     """
     Decorator that manages a transaction around a method call.
     It expects the instance (self) to have a 'transaction_manager' attribute
     that adheres to the TransactionManager or AsyncTransactionManager protocol.
+    With read_only=True the manager's begin() is called with read_only=True,
+    which lets the SQLAlchemy managers route the transaction to a read replica.
+    A propagation other than REQUIRED is passed to begin() as well.
+    With a retry policy, failures it accepts re-run the method in a fresh transaction.
+    Calls joining a running transaction are not retried, the outermost call is.
     """
+    begin_options = _begin_options(read_only, propagation)
+
+    def can_retry(manager: Any) -> bool:
+        if propagation == Propagation.REQUIRES_NEW:
+            return True
+        in_transaction = getattr(manager, "in_transaction", None)
+        return in_transaction is None or not in_transaction()
+
     def wrapper(func: Callable[..., T]) -> Callable[..., T]:
-        @wraps(func)
-        def sync_wrapper(self, *args, **kwargs):
-            if not hasattr(self, "transaction_manager"):
-                raise AttributeError(f"Instance of {self.__class__.__name__} has no 'transaction_manager' attribute.")
-            
-            manager: Union[TransactionManager, AsyncTransactionManager] = getattr(self, "transaction_manager")
-            
+        name = func.__qualname__
+
+        def run_sync(self, manager, args, kwargs):
+            metrics = current_metrics()
+            if metrics is not None:
+                return run_sync_timed(self, manager, args, kwargs, metrics)
+            manager.begin(**begin_options)
+            # BaseException: a cancelled or interrupted call must not leave its frame behind
             try:
-                manager.begin()
                 result = func(self, *args, **kwargs)
                 manager.commit()
                 return result
-            except Exception as e:
+            except BaseException:
                 manager.rollback()
-                raise e
+                raise
 
-        @wraps(func)
-        async def async_wrapper(self, *args, **kwargs):
-            if not hasattr(self, "transaction_manager"):
-                raise AttributeError(f"Instance of {self.__class__.__name__} has no 'transaction_manager' attribute.")
-            
-            manager: Union[TransactionManager, AsyncTransactionManager] = getattr(self, "transaction_manager")
-            
+        def run_sync_timed(self, manager, args, kwargs, metrics):
+            _timed(metrics.transaction_begin, manager.begin, begin_options)
+            try:
+                result = func(self, *args, **kwargs)
+                _timed(metrics.transaction_commit, manager.commit, _NO_OPTIONS)
+                return result
+            except BaseException:
+                _timed(metrics.transaction_rollback, manager.rollback, _NO_OPTIONS)
+                raise
+
+        async def run_async(self, manager, args, kwargs):
+            begin_async, commit_async, rollback_async = classify_manager(manager)
+            metrics = current_metrics()
+            if metrics is not None:
+                return await run_async_timed(self, manager, args, kwargs, metrics, begin_async, commit_async, rollback_async)
+            if begin_async:
+                await manager.begin(**begin_options)
+            else:
+                manager.begin(**begin_options)
+            # BaseException: a cancelled call must not leave its frame behind
             try:
-                if inspect.iscoroutinefunction(manager.begin):
-                    await manager.begin()
-                else:
-                    manager.begin()
-                
                 result = await func(self, *args, **kwargs)
-                
-                if inspect.iscoroutinefunction(manager.commit):
+
+                if commit_async:
                     await manager.commit()
                 else:
                     manager.commit()
-                
+
                 return result
-            except Exception as e:
-                if inspect.iscoroutinefunction(manager.rollback):
+            except BaseException:
+                if rollback_async:
                     await manager.rollback()
                 else:
                     manager.rollback()
-                raise e
+                raise
+
+        async def run_async_timed(self, manager, args, kwargs, metrics, begin_async, commit_async, rollback_async):
+            await _timed_async(metrics.transaction_begin, manager.begin, begin_options, begin_async)
+            try:
+                result = await func(self, *args, **kwargs)
+                await _timed_async(metrics.transaction_commit, manager.commit, _NO_OPTIONS, commit_async)
+                return result
+            except BaseException:
+                await _timed_async(metrics.transaction_rollback, manager.rollback, _NO_OPTIONS, rollback_async)
+                raise
+
+        @wraps(func)
+        def sync_wrapper(self, *args, **kwargs):
+            manager = _manager_of(self)
+            if retry is None or not can_retry(manager):
+                return run_sync(self, manager, args, kwargs)
+
+            attempt = 1
+            while True:
+                try:
+                    result = run_sync(self, manager, args, kwargs)
+                except Exception as error:
+                    if not retry.should_retry(error, attempt):
+                        if attempt > 1:
+                            retry.stats.record_exhausted(name, attempt)
+                        raise
+                    delay = retry.delay(attempt)
+                    retry.stats.record_retry(name, delay)
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                if attempt > 1:
+                    retry.stats.record_recovered(name, attempt)
+                return result
+
+        @wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            manager = _manager_of(self)
+            if retry is None or not can_retry(manager):
+                return await run_async(self, manager, args, kwargs)
+
+            attempt = 1
+            while True:
+                try:
+                    result = await run_async(self, manager, args, kwargs)
+                except Exception as error:
+                    if not retry.should_retry(error, attempt):
+                        if attempt > 1:
+                            retry.stats.record_exhausted(name, attempt)
+                        raise
+                    delay = retry.delay(attempt)
+                    retry.stats.record_retry(name, delay)
+                    # Imported here: the decorators alone do not load asyncio
+                    import asyncio
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                if attempt > 1:
+                    retry.stats.record_recovered(name, attempt)
+                return result
 
         if inspect.iscoroutinefunction(func):
             return async_wrapper
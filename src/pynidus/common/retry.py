@@ -0,0 +1,108 @@
+from typing import Callable, Dict, Optional, Tuple, Type, Union
+import random
+import threading
+from pynidus.core.metrics import current_metrics
+
+# SQLSTATE codes of PostgreSQL serialization failures and deadlocks
+_POSTGRES_CODES = {"40001", "40P01"}
+# MySQL deadlock and lock wait timeout
+_MYSQL_CODES = {1213, 1205}
+_SQLITE_MESSAGES = ("database is locked", "database table is locked", "database is busy")
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    True for contention failures that usually succeed when the transaction is re-run:
+    SQLite "database is locked", PostgreSQL 40001/40P01, MySQL 1213/1205.
+    """
+    # Imported here so that importing the decorators does not load SQLAlchemy
+    from sqlalchemy.exc import DBAPIError, OperationalError
+
+    if not isinstance(error, DBAPIError):
+        return False
+    original = error.orig
+    code = getattr(original, "sqlstate", None) or getattr(original, "pgcode", None)
+    if code in _POSTGRES_CODES:
+        return True
+    args = getattr(original, "args", ())
+    if args and args[0] in _MYSQL_CODES:
+        return True
+    if isinstance(error, OperationalError):
+        message = str(original).lower()
+        return any(text in message for text in _SQLITE_MESSAGES)
+    return False
+
+
+class RetryStats:
+    """
+    Retry counters of a policy. by_function counts retries per qualified function name.
+    With metrics enabled, retries and outcomes are also recorded in the registry.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.by_function: Dict[str, int] = {}
+
+    def record_retry(self, name: str, delay: float):
+        with self._lock:
+            self.retries += 1
+            self.by_function[name] = self.by_function.get(name, 0) + 1
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.transaction_retry_backoff.labels(name).observe(delay)
+
+    def record_recovered(self, name: str, attempts: int):
+        with self._lock:
+            self.recovered += 1
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.transaction_attempts.labels(name, "recovered").observe(attempts)
+
+    def record_exhausted(self, name: str, attempts: int):
+        with self._lock:
+            self.exhausted += 1
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.transaction_attempts.labels(name, "exhausted").observe(attempts)
+
+
+class RetryPolicy:
+    """
+    Re-runs a failed @Transactional method in a fresh transaction.
+    Waits backoff * 2 ** (attempt - 1) seconds (capped at max_backoff) between attempts,
+    reduced by up to `jitter` (a fraction) at random so that contending callers spread out.
+    retry_on is an exception type, a tuple of types or a predicate; by default
+    contention errors are retried (see is_retryable_error).
+    """
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 0.05,
+        max_backoff: float = 2.0,
+        jitter: float = 0.5,
+        retry_on: Optional[Union[Type[BaseException], Tuple[Type[BaseException], ...], Callable[[BaseException], bool]]] = None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1.")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        if retry_on is None:
+            self._predicate = is_retryable_error
+        elif isinstance(retry_on, tuple) or isinstance(retry_on, type):
+            self._predicate = lambda error: isinstance(error, retry_on)
+        else:
+            self._predicate = retry_on
+        self.stats = RetryStats()
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        return attempt < self.max_attempts and self._predicate(error)
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
@@ -0,0 +1,11 @@
+from typing import Type, Any, List
+
+
+class CircularDependencyError(ValueError):
+    """
+    Raised when the provider graph or the module imports contain a cycle.
+    """
+    def __init__(self, path: List[Type[Any]]):
+        self.path = path
+        chain = " -> ".join(getattr(cls, "__name__", repr(cls)) for cls in path)
+        super().__init__(f"Circular dependency detected: {chain}")
@@ -0,0 +1,131 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Union
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+
+DEFAULT_EXECUTOR = "default"
+CPU_EXECUTOR = "cpu"
+
+ExecutorSpec = Union[None, int, Executor]
+
+
+@dataclass(frozen=True)
+class ExecutorStats:
+    max_workers: int
+    # Calls submitted and not finished yet
+    in_flight: int
+    running: int
+    # Calls waiting for a free worker
+    queued: int
+    completed: int
+    max_queued: int
+
+
+class TrackedExecutor:
+    """
+    A named thread or process pool that counts the calls it holds, so that a slow
+    endpoint shows up as a growing queue instead of a starved default threadpool.
+    The underlying executor is created on first use.
+    """
+    def __init__(self, name: str, spec: ExecutorSpec = None, process: bool = False):
+        self.name = name
+        if isinstance(spec, Executor):
+            self._executor: Optional[Executor] = spec
+            self.process = isinstance(spec, ProcessPoolExecutor)
+            self.max_workers = getattr(spec, "_max_workers", 0)
+        else:
+            self._executor = None
+            self.process = process
+            cores = os.cpu_count() or 1
+            # ThreadPoolExecutor's own default for thread pools
+            self.max_workers = spec or (cores if process else min(32, cores + 4))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._max_queued = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.process:
+                        self._executor = ProcessPoolExecutor(self.max_workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"nidus-{self.name}")
+        return self._executor
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            self._in_flight += 1
+            self._max_queued = max(self._max_queued, self._in_flight - self.max_workers)
+        try:
+            future = self.executor.submit(function, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Optional[Future]):
+        with self._lock:
+            self._in_flight -= 1
+            if future is not None:
+                self._completed += 1
+
+    async def run(self, function: Callable[..., Any], **kwargs: Any) -> Any:
+        """
+        Runs function(**kwargs) in the pool. Thread pools run it in a copy of the
+        current context (request and session scopes stay visible). Process pools
+        receive the function by reference; the call is pickled once, by the pool's
+        feeder thread, so large arguments do not hold up the event loop.
+        """
+        if self.process:
+            return await asyncio.wrap_future(self.submit(functools.partial(function, **kwargs)))
+        context = contextvars.copy_context()
+        return await asyncio.wrap_future(self.submit(context.run, functools.partial(function, **kwargs)))
+
+    def stats(self) -> ExecutorStats:
+        with self._lock:
+            in_flight = self._in_flight
+            running = min(in_flight, self.max_workers)
+            return ExecutorStats(self.max_workers, in_flight, running, in_flight - running, self._completed, self._max_queued)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+class ExecutorRegistry:
+    """
+    The executors sync handlers can be sent to with @Controller(executor=...) or
+    @Get(..., executor=...). "cpu" is a process pool with one worker per core;
+    other names are configured with NidusFactory.create(executors={...}), as a
+    thread pool size or an Executor instance. "default" is Starlette's threadpool.
+    """
+    def __init__(self, executors: Optional[Dict[str, ExecutorSpec]] = None):
+        self._executors: Dict[str, TrackedExecutor] = {CPU_EXECUTOR: TrackedExecutor(CPU_EXECUTOR, process=True)}
+        for name, spec in (executors or {}).items():
+            if name == DEFAULT_EXECUTOR:
+                raise ValueError("The default executor is Starlette's threadpool and cannot be replaced.")
+            if spec is not None and not isinstance(spec, (int, Executor)):
+                raise ValueError(f"Executor '{name}' must be a pool size or an Executor, got {spec!r}.")
+            self._executors[name] = TrackedExecutor(name, spec, process=name == CPU_EXECUTOR and not isinstance(spec, Executor))
+
+    def get(self, name: str) -> TrackedExecutor:
+        executor = self._executors.get(name)
+        if executor is None:
+            raise ValueError(f"Unknown executor '{name}'. Configure it with NidusFactory.create(executors={{'{name}': size}}).")
+        return executor
+
+    def stats(self) -> Dict[str, ExecutorStats]:
+        return {name: executor.stats() for name, executor in self._executors.items()}
+
+    def shutdown(self, wait: bool = True):
+        for executor in self._executors.values():
+            executor.shutdown(wait)
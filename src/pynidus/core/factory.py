@@ -1,110 +1,451 @@
+from contextlib import asynccontextmanager, nullcontext
 from fastapi import FastAPI, APIRouter
-from typing import Type, Any, Dict, List
+from starlette.responses import StreamingResponse
+from typing import Type, Any, Callable, Dict, List, Optional, Tuple, Union
+import functools
 import inspect
-from pynidus.core.module import ModuleMetadata
-from pynidus.common.decorators.http import RouteDefinition
+import sys
+import time
+import typing
+from pynidus.core.executors import DEFAULT_EXECUTOR, ExecutorRegistry, ExecutorSpec, TrackedExecutor
+from pynidus.core.lifecycle import LifecycleManager, logger
+from pynidus.core.metrics import MetricsRegistry, current_metrics, timed_app
+from pynidus.core.profiling import current_profiler
+from pynidus.core.lazy import LazyProxy, LazyReport, is_materialized, unwrap
+from pynidus.core.plan import ApplicationPlan, ControllerPlan, ProviderPlan, compile_plan, controller_scope, plan_providers, resolve_dependencies
+from pynidus.core.provider import Provider
+from pynidus.core.router import install_radix_router
+from pynidus.core.startup import StartupProfiler, StartupReport
+from pynidus.core.streaming import stream_options, streaming_endpoint
+from pynidus.core.scope import (
+    ApplicationBinding,
+    ApplicationBindingMiddleware,
+    InstancePool,
+    RequestContext,
+    RequestContextMiddleware,
+    Scope,
+    application_bindings,
+    current_request_context,
+)
+from pynidus.common.decorators.http import RouteDefinition, collect_routes
 
 class NidusFactory:
     @staticmethod
-    def create(app_module: Type[Any]) -> FastAPI:
-        app = FastAPI()
-        factory = NidusFactory()
-        factory.initialize(app, app_module)
+    def create(
+        app_module: Union[Type[Any], ApplicationPlan],
+        lazy: bool = False,
+        hook_timeout: Optional[float] = None,
+        router: str = "default",
+        executors: Optional[Dict[str, ExecutorSpec]] = None,
+        profile_startup: Union[bool, str] = False,
+    ) -> FastAPI:
+        """
+        Builds the application. With lazy=True every provider is built on first use.
+        Lifecycle hooks run in the application lifespan, each bounded by hook_timeout seconds.
+        router="radix" matches HTTP routes through a radix tree instead of a linear scan.
+        executors names the pools sync handlers can run in (a thread pool size or an
+        Executor); "cpu", a process pool, is always available.
+        profile_startup=True records the time and memory of every provider and
+        controller into app.state.nidus.startup_report and logs the slowest ones;
+        a path also writes them there as a Chrome trace.
+        The factory stays reachable through app.state.nidus.
+        """
+        if router not in ("default", "radix"):
+            raise ValueError(f"Unknown router '{router}'. Expected 'default' or 'radix'.")
+
+        factory = NidusFactory(lazy=lazy, hook_timeout=hook_timeout, executors=executors)
+        app = FastAPI(lifespan=factory.lifespan)
+        app.state.nidus = factory
+        if profile_startup:
+            factory.startup = StartupProfiler()
+            factory.startup.start()
+        try:
+            if isinstance(app_module, ApplicationPlan):
+                factory.execute(app, app_module)
+            else:
+                factory.initialize(app, app_module)
+            if router == "radix":
+                with factory._step("router"):
+                    install_radix_router(app)
+        finally:
+            if factory.startup is not None:
+                factory.startup.stop()
+        if factory.startup is not None:
+            factory.startup_report = factory.startup.report(factory.plan)
+            factory.startup = None
+            logger.info("%s", factory.startup_report.render())
+            if isinstance(profile_startup, str):
+                factory.startup_report.write_chrome_trace(profile_startup)
         return app
 
-    def __init__(self):
+    @staticmethod
+    def listen(
+        app_module: Union[Type[Any], ApplicationPlan, FastAPI],
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int = 1,
+        log_level: str = "info",
+        **options: Any,
+    ):
+        """
+        Builds the application once (options go to create()) and serves it with uvicorn.
+        An already built application is served as is and accepts no create() options.
+        With workers > 1 the built application is shared by forked worker processes
+        (see PreforkServer); each runs the lifecycle hooks, after on_worker_start.
+        """
+        if isinstance(app_module, FastAPI) and options:
+            raise ValueError(f"The application is already built; create() options cannot be applied: {', '.join(sorted(options))}")
+
+        # Imported here: uvicorn is only needed to serve
+        import uvicorn
+        from pynidus.core.server import PreforkServer
+
+        app = app_module if isinstance(app_module, FastAPI) else NidusFactory.create(app_module, **options)
+        if workers == 1:
+            uvicorn.run(app, host=host, port=port, log_level=log_level)
+        else:
+            PreforkServer(app, host, port, workers, log_level=log_level).run()
+
+    @staticmethod
+    def compile(app_module: Type[Any]) -> ApplicationPlan:
+        """
+        Resolves the whole provider graph of a module once.
+        The returned plan is immutable and can be passed to create() any number of times.
+        """
+        return compile_plan(app_module)
+
+    def __init__(self, lazy: bool = False, hook_timeout: Optional[float] = None, executors: Optional[Dict[str, ExecutorSpec]] = None):
         self.container: Dict[Type[Any], Any] = {}
+        self.controllers: Dict[Type[Any], Any] = {}
+        self.plans: Dict[Type[Any], ProviderPlan] = {}
+        self.pools: Dict[Type[Any], InstancePool] = {}
+        # The framework state configured by the modules of this application (see ApplicationBinding)
+        self.bindings: Dict[ApplicationBinding, Any] = {}
+        self.lifecycle = LifecycleManager(hook_timeout)
+        self.executors = ExecutorRegistry(executors)
+        self._construction_timers: Dict[Any, Any] = {}
+        self.lazy = lazy
+        self.plan: Optional[ApplicationPlan] = None
+        self.startup: Optional[StartupProfiler] = None
+        self.startup_report: Optional[StartupReport] = None
+        # Set in the workers forked by listen()
+        self.forked = False
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI):
+        self.lifecycle.build_layers(self.plans, self.container, self.controllers)
+        if self.forked:
+            await self.lifecycle.worker_start()
+        await self.lifecycle.startup()
+        try:
+            yield
+        finally:
+            try:
+                await self.lifecycle.shutdown()
+            finally:
+                self.executors.shutdown()
 
     def initialize(self, app: FastAPI, module_cls: Type[Any]):
-        if not hasattr(module_cls, "__module_metadata__"):
-            raise ValueError(f"{module_cls.__name__} is not a valid Module. Did you forget the @Module decorator?")
-        
-        metadata: ModuleMetadata = getattr(module_cls, "__module_metadata__")
-        
-        # 1. Process Imports (Recursion)
-        for imported_module in metadata.imports:
-            self.initialize(app, imported_module)
-
-        # 2. Register Providers
-        for provider_cls in metadata.providers:
-            self.register_provider(provider_cls)
-
-        # 3. Register Controllers
-        for controller_cls in metadata.controllers:
-            self.register_controller(app, controller_cls)
-
-    def register_provider(self, provider_cls: Type[Any]):
-        if provider_cls in self.container:
+        with self._step("compile", module_cls):
+            plan = compile_plan(module_cls)
+        self.execute(app, plan)
+
+    def _step(self, kind: str, token: Any = None):
+        if self.startup is None:
+            return nullcontext()
+        return self.startup.span(kind, token)
+
+    def execute(self, app: FastAPI, plan: ApplicationPlan):
+        self.plan = plan
+        # 1. Bind the state the modules configure (default database, metrics registry, ...).
+        # Its providers are built first, even when lazy, so that it is active for all the others
+        planned = {provider.token: provider for provider in plan.providers}
+        for node in plan.modules:
+            for binding, token in getattr(node.module, "__bindings__", {}).items():
+                self._register_with_dependencies(token, planned)
+                value = self.container[token] = unwrap(self.resolve(token))
+                self.bindings[binding] = value
+                binding.set(value)
+
+        with application_bindings(self.bindings):
+            # 2. Register Providers (already in dependency order)
+            for provider in plan.providers:
+                if provider.token not in self.plans:
+                    with self._step("provider", provider.token):
+                        self.register_provider(provider)
+
+            # 3. Register Controllers
+            for controller in plan.controllers:
+                with self._step("controller", controller.token):
+                    self.register_controller(app, controller)
+
+        # Providers may need per-request middleware without being request scoped themselves
+        middleware: List[type] = []
+        if any(provider.scope != Scope.SINGLETON for provider in plan.providers):
+            middleware.append(RequestContextMiddleware)
+        # Read from the planned classes rather than the instances, which lazy providers do not have yet
+        for provider in self.plans.values():
+            for source in (provider.token, provider.factory):
+                for middleware_cls in getattr(source, "__middleware__", ()):
+                    if middleware_cls not in middleware:
+                        middleware.append(middleware_cls)
+        # The first one listed ends up outermost
+        with self._step("middleware"):
+            for middleware_cls in reversed(middleware):
+                app.add_middleware(middleware_cls)
+            # Outermost, so that the lifespan and every other middleware see the bindings
+            app.add_middleware(ApplicationBindingMiddleware, bindings=self.bindings)
+
+    def _register_with_dependencies(self, token: Any, planned: Dict[Any, ProviderPlan]):
+        provider = planned[token]
+        for dependency in provider.dependencies:
+            if dependency not in self.plans:
+                self._register_with_dependencies(dependency, planned)
+        if token not in self.plans:
+            with self._step("provider", token):
+                self.register_provider(provider)
+
+    def register_provider(self, provider: Union[Type[Any], Provider, ProviderPlan]):
+        if not isinstance(provider, ProviderPlan):
+            # Simple auto-wiring for providers that were not compiled ahead of time
+            for planned in plan_providers([provider], self.plans):
+                self.register_provider(planned)
+            return
+
+        token = provider.token
+        if token in self.plans:
+            return
+        self.plans[token] = provider
+
+        if provider.scope != Scope.SINGLETON:
+            if provider.pool_size:
+                self.pools[token] = InstancePool(token, provider.pool_size)
             return
 
-        # Resolve dependencies for the provider
-        init_signature = inspect.signature(provider_cls.__init__)
-        dependencies = []
-        
-        for param_name, param in init_signature.parameters.items():
-            if param_name == 'self':
-                continue
-            
-            # Ignore *args and **kwargs
-            if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
-                continue
-
-            if param.annotation == inspect.Parameter.empty:
-                 raise ValueError(f"Dependency {param_name} in {provider_cls.__name__} must have a type hint.")
-            
-            # Recursively ensure dependency is registered (if it's a provider)
-            # In a real app, we'd check if it's in the module's providers or imports.
-            # For simplicity, we assume global registration or self-contained for now.
-            if param.annotation not in self.container:
-                 # Auto-register if not explicitly registered? 
-                 # Or throw error? Let's try to instantiate if possible.
-                 self.register_provider(param.annotation)
-            
-            dependencies.append(self.container[param.annotation])
-
-        instance = provider_cls(*dependencies)
-        self.container[provider_cls] = instance
-
-    def register_controller(self, app: FastAPI, controller_cls: Type[Any]):
-        # Resolve dependencies
-        init_signature = inspect.signature(controller_cls.__init__)
-        dependencies = []
-        
-        for param_name, param in init_signature.parameters.items():
-            if param_name == 'self':
-                continue
-            
-            # Ignore *args and **kwargs
-            if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
-                continue
-
-            if param.annotation == inspect.Parameter.empty:
-                 raise ValueError(f"Dependency {param_name} in {controller_cls.__name__} must have a type hint.")
-            
-            if param.annotation not in self.container:
-                # Try to register it if it's missing (simple auto-wiring)
-                self.register_provider(param.annotation)
-            
-            dependencies.append(self.container[param.annotation])
-
-        controller_instance = controller_cls(*dependencies)
-        
+        if self.lazy or provider.lazy:
+            self.container[token] = LazyProxy(token, lambda: self._build_lazy(provider))
+        else:
+            self.container[token] = self._instantiate(provider, None)
+
+    def _build_lazy(self, provider: ProviderPlan) -> Any:
+        instance = self._instantiate(provider, None)
+        self.lifecycle.materialized(provider.token, instance)
+        return instance
+
+    def _instantiate(self, provider: ProviderPlan, context: Optional[RequestContext]) -> Any:
+        dependencies = [self.resolve(dependency, context) for dependency in provider.dependencies]
+        metrics = current_metrics()
+        if metrics is None:
+            return provider.build(*dependencies)
+        start = time.perf_counter()
+        try:
+            return provider.build(*dependencies)
+        finally:
+            self._construction_timer(metrics, provider.token).observe(time.perf_counter() - start)
+
+    def _construction_timer(self, metrics: MetricsRegistry, token: Any):
+        timer = self._construction_timers.get(token)
+        if timer is None or timer.histogram.registry is not metrics:
+            timer = self._construction_timers[token] = metrics.provider_construction.labels(getattr(token, "__name__", token))
+        return timer
+
+    def resolve(self, token: Type[Any], context: Optional[RequestContext] = None) -> Any:
+        """
+        Returns the instance for a token, honouring its scope.
+        Request-scoped providers need a context; transient ones are built on every call.
+        """
+        provider = self.plans[token]
+
+        if provider.scope == Scope.SINGLETON:
+            return self.container[token]
+
+        if provider.scope == Scope.REQUEST:
+            if context is None:
+                raise RuntimeError(f"{token.__name__} is request scoped and cannot be resolved outside of a request.")
+            instance = context.instances.get(token)
+            if instance is None:
+                instance = self._instantiate(provider, context)
+                context.instances[token] = instance
+            return instance
+
+        pool = self.pools.get(token)
+        if pool is not None and context is not None:
+            return context.borrow(pool, lambda: self._instantiate(provider, None))
+        return self._instantiate(provider, context)
+
+    def lazy_report(self) -> LazyReport:
+        """
+        Lists the lazy providers that have (and have not) been used so far.
+        """
+        materialized = []
+        unmaterialized = []
+        for token, instance in self.container.items():
+            if type(instance) is LazyProxy:
+                (materialized if is_materialized(instance) else unmaterialized).append(token)
+        return LazyReport(tuple(materialized), tuple(unmaterialized))
+
+    def register_controller(self, app: FastAPI, controller: Union[Type[Any], ControllerPlan]):
+        if not isinstance(controller, ControllerPlan):
+            dependencies = resolve_dependencies(controller)
+            for dependency in dependencies:
+                if dependency not in self.plans:
+                    # Try to register it if it's missing (simple auto-wiring)
+                    self.register_provider(dependency)
+            controller = ControllerPlan(controller, dependencies, controller_scope(dependencies, self.plans))
+
+        controller_cls = controller.token
+        route_table = controller_routes(controller_cls)
+
+        if controller.scope == Scope.SINGLETON:
+            controller_instance = controller_cls(*[self.resolve(dependency) for dependency in controller.dependencies])
+            self.controllers[controller_cls] = controller_instance
+            endpoints = [(name, route_def, getattr(controller_cls, name), getattr(controller_instance, name)) for name, route_def in route_table]
+        else:
+            # Built per request, so routes are served through endpoints that resolve the controller first
+            endpoints = [
+                (name, route_def, getattr(controller_cls, name), self._request_scoped_endpoint(controller, getattr(controller_cls, name)))
+                for name, route_def in route_table
+            ]
+
         # Register Routes
         prefix = getattr(controller_cls, "__prefix__", "")
         router = APIRouter(prefix=prefix)
 
-        for name, method in inspect.getmembers(controller_instance, predicate=inspect.ismethod):
-            if hasattr(method, "__route__"):
-                route_def: RouteDefinition = getattr(method, "__route__")
-                
-                # We need to wrap the method to ensure FastAPI calls it correctly
-                # FastAPI expects the function signature to match the parameters.
-                # Since we are using a bound method, 'self' is already handled.
-                
-                router.add_api_route(
-                    route_def.path,
-                    method,
-                    methods=[route_def.method],
-                )
-        
+        for name, route_def, function, endpoint in endpoints:
+            route_options: Dict[str, Any] = {}
+            executor = route_def.executor or getattr(controller_cls, "__executor__", None)
+            options = stream_options(function)
+            if executor not in (None, DEFAULT_EXECUTOR):
+                endpoint = self._executor_endpoint(controller_cls, name, function, endpoint, self.executors.get(executor), options is not None)
+            elif options is not None:
+                endpoint = streaming_endpoint(endpoint, _unbound_signature(function), options)
+                route_options = {"response_model": None, "response_class": StreamingResponse}
+            if options is None:
+                serializer = _route_serializer(function, route_def.serialize)
+                if serializer is not None:
+                    from pynidus.db.serializer import serializing_endpoint
+                    # Entities skip jsonable_encoder: the response is encoded once, by a compiled serializer
+                    signature = getattr(endpoint, "__signature__", None) or _unbound_signature(function)
+                    endpoint = serializing_endpoint(endpoint, signature, serializer)
+                    route_options = {"response_model": None}
+
+            # Bound methods already handle 'self', so FastAPI sees the
+            # remaining parameters only.
+            router.add_api_route(
+                route_def.path,
+                endpoint,
+                methods=[route_def.method],
+                **route_options,
+            )
+
+        first_route = len(app.router.routes)
         app.include_router(router)
+        metrics = current_metrics()
+        profiler = current_profiler()
+        if metrics is not None or profiler is not None:
+            # include_router copies the routes, so the app's own ones are wrapped
+            for route, (name, route_def, function, _) in zip(app.router.routes[first_route:], endpoints):
+                handler = f"{controller_cls.__name__}.{name}"
+                if profiler is not None:
+                    route.app = profiler.wrap(route.app, handler, function)
+                if metrics is not None:
+                    route.app = timed_app(route.app, metrics.request_duration.labels(route_def.method, route.path, handler))
+
+    def _request_scoped_endpoint(self, controller: ControllerPlan, function: Callable[..., Any]) -> Callable[..., Any]:
+        controller_cls = controller.token
+        dependencies = controller.dependencies
+
+        def build(context: RequestContext) -> Any:
+            return controller_cls(*[self.resolve(dependency, context) for dependency in dependencies])
+
+        if inspect.iscoroutinefunction(function):
+            async def endpoint(**kwargs):
+                context = current_request_context()
+                if context is not None:
+                    return await function(build(context), **kwargs)
+                context = RequestContext()
+                try:
+                    return await function(build(context), **kwargs)
+                finally:
+                    context.close()
+        else:
+            def endpoint(**kwargs):
+                context = current_request_context()
+                if context is not None:
+                    return function(build(context), **kwargs)
+                context = RequestContext()
+                try:
+                    return function(build(context), **kwargs)
+                finally:
+                    context.close()
+
+        functools.update_wrapper(endpoint, function)
+        del endpoint.__wrapped__
+        endpoint.__signature__ = _unbound_signature(function)
+        return endpoint
+
+
+    def _executor_endpoint(
+        self,
+        controller_cls: Type[Any],
+        name: str,
+        function: Callable[..., Any],
+        endpoint: Callable[..., Any],
+        executor: TrackedExecutor,
+        streaming: bool,
+    ) -> Callable[..., Any]:
+        qualified = f"{controller_cls.__name__}.{name}"
+        if inspect.iscoroutinefunction(function) or streaming:
+            raise ValueError(f"{qualified} cannot run in executor '{executor.name}': only sync, non-streaming handlers can.")
+
+        if executor.process:
+            # The controller instance stays in this process: workers get the function only
+            if not isinstance(inspect.getattr_static(controller_cls, name), staticmethod):
+                raise ValueError(f"{qualified} runs in the process pool '{executor.name}' and must be a @staticmethod.")
+            target = function
+            signature = _unbound_signature(function, bound=False)
+        else:
+            target = endpoint
+            signature = _unbound_signature(function)
+
+        async def executor_endpoint(**kwargs):
+            return await executor.run(target, **kwargs)
+
+        functools.update_wrapper(executor_endpoint, function)
+        del executor_endpoint.__wrapped__
+        executor_endpoint.__signature__ = signature
+        return executor_endpoint
+
+
+def controller_routes(controller_cls: Type[Any]) -> List[Tuple[str, RouteDefinition]]:
+    """
+    Returns the route table collected by @Controller, or builds it for
+    classes registered without the decorator.
+    """
+    if "__route_table__" in vars(controller_cls):
+        return controller_cls.__route_table__
+    return collect_routes(controller_cls)
+
+
+def _route_serializer(function: Callable[..., Any], serialize: Any) -> Any:
+    # Mapped classes only exist once SQLAlchemy is loaded, so applications without
+    # a database never import it (nor the serializer module)
+    if serialize is None and "sqlalchemy.orm" not in sys.modules:
+        return None
+    from pynidus.db.serializer import route_serializer
+    return route_serializer(function, serialize)
+
+
+def _unbound_signature(function: Callable[..., Any], bound: bool = True) -> inspect.Signature:
+    # The endpoint lives in this module, so annotations are resolved against the original function
+    signature = inspect.signature(function)
+    try:
+        hints = typing.get_type_hints(function, include_extras=True)
+    except Exception:
+        hints = {}
+
+    parameters = [
+        parameter.replace(annotation=hints.get(parameter.name, parameter.annotation))
+        for parameter in list(signature.parameters.values())[1 if bound else 0:]
+    ]
+    return signature.replace(parameters=parameters, return_annotation=hints.get("return", signature.return_annotation))
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import Type, Any, Callable, Tuple
+import threading
+
+_MISSING = object()
+
+
+class LazyProxy:
+    """
+    Stand-in injected for lazy providers.
+    The real instance is built on first attribute access and reused afterwards.
+    """
+    __slots__ = ("_token", "_factory", "_instance", "_lock")
+
+    def __init__(self, token: Type[Any], factory: Callable[[], Any]):
+        object.__setattr__(self, "_token", token)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", _MISSING)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def __class__(self):
+        # Keeps isinstance() checks working without materializing the provider
+        return object.__getattribute__(self, "_token")
+
+    def _materialize(self) -> Any:
+        instance = object.__getattribute__(self, "_instance")
+        if instance is not _MISSING:
+            return instance
+
+        # Construction is synchronous, so a thread lock also covers
+        # handlers running on the event loop and in the threadpool.
+        with object.__getattribute__(self, "_lock"):
+            instance = object.__getattribute__(self, "_instance")
+            if instance is _MISSING:
+                instance = object.__getattribute__(self, "_factory")()
+                object.__setattr__(self, "_instance", instance)
+                object.__setattr__(self, "_factory", None)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._materialize(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._materialize(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._materialize(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._materialize()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        if is_materialized(self):
+            return repr(self._materialize())
+        return f"<LazyProxy {object.__getattribute__(self, '_token').__name__} (not materialized)>"
+
+    def __bool__(self) -> bool:
+        return bool(self._materialize())
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._materialize()
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._materialize()[key]
+
+    def __eq__(self, other: Any) -> bool:
+        return self._materialize() == other
+
+    def __hash__(self) -> int:
+        return hash(self._materialize())
+
+
+def is_materialized(value: Any) -> bool:
+    """
+    Returns False only for lazy proxies that have not been used yet.
+    """
+    if type(value) is LazyProxy:
+        return object.__getattribute__(value, "_instance") is not _MISSING
+    return True
+
+
+def unwrap(value: Any) -> Any:
+    """
+    The instance behind a lazy proxy, built if needed. Other values are returned as is.
+    """
+    if type(value) is LazyProxy:
+        return value._materialize()
+    return value
+
+
+@dataclass(frozen=True)
+class LazyReport:
+    materialized: Tuple[Type[Any], ...]
+    unmaterialized: Tuple[Type[Any], ...]
+
+    def __str__(self) -> str:
+        lines = [f"{len(self.unmaterialized)} of {len(self.materialized) + len(self.unmaterialized)} lazy providers were never materialized"]
+        lines.extend(f"  - {token.__name__}" for token in self.unmaterialized)
+        return "\n".join(lines)
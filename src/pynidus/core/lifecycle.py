@@ -0,0 +1,155 @@
+from typing import Type, Any, Dict, List, Mapping, Optional, Set, Tuple
+import asyncio
+import inspect
+import logging
+from pynidus.core.lazy import is_materialized, unwrap
+from pynidus.core.plan import ProviderPlan
+from pynidus.core.scope import Scope
+
+logger = logging.getLogger("pynidus")
+
+ON_MODULE_INIT = "on_module_init"
+ON_APPLICATION_BOOTSTRAP = "on_application_bootstrap"
+ON_APPLICATION_SHUTDOWN = "on_application_shutdown"
+# Runs first in each worker forked by NidusFactory.listen, to recreate per-process resources
+ON_WORKER_START = "on_worker_start"
+INIT_HOOKS = (ON_MODULE_INIT, ON_APPLICATION_BOOTSTRAP)
+
+
+class LifecycleManager:
+    """
+    Runs provider and controller lifecycle hooks.
+    Instances are grouped in dependency layers: every instance in a layer only
+    depends on earlier layers, so the hooks of a layer run concurrently.
+    Shutdown walks the layers in reverse order.
+    Lazy providers first used after startup began get their init hooks on
+    materialization (see materialized) and their shutdown hook with the others.
+    """
+    def __init__(self, hook_timeout: Optional[float] = None):
+        self.hook_timeout = hook_timeout
+        self.layers: List[List[Tuple[Type[Any], Any]]] = []
+        self._initialized: List[Tuple[Type[Any], Any]] = []
+        # Layer of each provider, and the layer each init hook has reached (-1 before startup)
+        self._depth: Dict[Type[Any], int] = {}
+        self._reached: Dict[str, int] = dict.fromkeys(INIT_HOOKS, -1)
+        # (id of the instance, hook) of the init hooks already run
+        self._hooked: Set[Tuple[int, str]] = set()
+
+    def build_layers(
+        self,
+        plans: Mapping[Type[Any], ProviderPlan],
+        container: Mapping[Type[Any], Any],
+        controllers: Mapping[Type[Any], Any],
+    ):
+        depth: Dict[Type[Any], int] = {}
+        layers: List[List[Tuple[Type[Any], Any]]] = []
+
+        # Plans are registered in dependency order, so every dependency already has a depth
+        for token, provider in plans.items():
+            if provider.scope != Scope.SINGLETON:
+                continue
+            level = 1 + max((depth[dependency] for dependency in provider.dependencies if dependency in depth), default=-1)
+            depth[token] = level
+            while len(layers) <= level:
+                layers.append([])
+            layers[level].append((token, container[token]))
+
+        if controllers:
+            layers.append(list(controllers.items()))
+
+        self.layers = layers
+        self._depth = depth
+
+    async def startup(self):
+        try:
+            for hook in INIT_HOOKS:
+                for index, layer in enumerate(self.layers):
+                    self._reached[hook] = index
+                    await self._run_layer(layer, hook, self._initialized if hook == ON_MODULE_INIT else None)
+                self._reached[hook] = len(self.layers)
+        except BaseException:
+            await self.shutdown()
+            raise
+
+    async def worker_start(self):
+        for layer in self.layers:
+            await self._run_layer(layer, ON_WORKER_START)
+
+    async def shutdown(self):
+        initialized = {id(instance) for _, instance in self._initialized}
+        self._initialized = []
+        self._reached = dict.fromkeys(INIT_HOOKS, -1)
+        self._hooked = set()
+        for layer in reversed(self.layers):
+            started = [(token, instance) for token, instance in layer if id(instance) in initialized]
+            if not started:
+                continue
+            results = await asyncio.gather(
+                *(self._call(token, instance, ON_APPLICATION_SHUTDOWN) for token, instance in started),
+                return_exceptions=True,
+            )
+            # Shutdown keeps going so that every provider gets a chance to release its resources
+            for (token, _), result in zip(started, results):
+                if isinstance(result, BaseException):
+                    logger.error("%s.%s failed", token.__name__, ON_APPLICATION_SHUTDOWN, exc_info=result)
+
+    async def _run_layer(self, layer: List[Tuple[Type[Any], Any]], hook: str, completed: Optional[List[Tuple[Type[Any], Any]]] = None):
+        results = await asyncio.gather(*(self._call(token, instance, hook) for token, instance in layer), return_exceptions=True)
+        errors = []
+        for entry, result in zip(layer, results):
+            if isinstance(result, BaseException):
+                errors.append(result)
+            elif completed is not None:
+                completed.append(entry)
+        if errors:
+            raise errors[0]
+
+    def materialized(self, token: Type[Any], instance: Any):
+        """
+        Runs the init hooks of a lazy provider built once startup has begun, which
+        its layer may have skipped. During startup, only the hooks that have
+        already reached its layer run: the others run with that layer.
+        """
+        layer = self._depth.get(token, 0)
+        for hook in INIT_HOOKS:
+            if self._reached[hook] < layer:
+                continue
+            method = getattr(instance, hook, None)
+            # Async hooks are awaited by startup, which builds those providers itself
+            if method is not None and not inspect.iscoroutinefunction(method) and self._claim(instance, hook):
+                method()
+
+    def _claim(self, instance: Any, hook: str) -> bool:
+        key = (id(instance), hook)
+        if key in self._hooked:
+            return False
+        self._hooked.add(key)
+        return True
+
+    async def _call(self, token: Type[Any], instance: Any, hook: str):
+        if not is_materialized(instance):
+            # Lazy providers that were never used have nothing to tear down.
+            # Their init hooks run on first use, which cannot wait for a
+            # coroutine: providers with async init hooks are built now instead
+            if hook not in INIT_HOOKS or not _has_async_init(token):
+                return
+
+        if hook in INIT_HOOKS and not self._claim(unwrap(instance), hook):
+            return
+
+        method = getattr(instance, hook, None)
+        if method is None:
+            return
+
+        result = method()
+        if not inspect.isawaitable(result):
+            return
+
+        try:
+            await asyncio.wait_for(result, self.hook_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{token.__name__}.{hook} did not complete within {self.hook_timeout} seconds.") from None
+
+
+def _has_async_init(token: Any) -> bool:
+    return any(inspect.iscoroutinefunction(getattr(token, hook, None)) for hook in INIT_HOOKS)
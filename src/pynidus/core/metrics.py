@@ -0,0 +1,233 @@
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+import math
+import threading
+import time
+from pynidus.common.decorators.controller import Controller
+from pynidus.common.decorators.http import Get
+from pynidus.core.module import Module
+from pynidus.core.provider import Provider
+from pynidus.core.scope import ApplicationBinding
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Attempts made by retried transactions; not durations, so not the registry buckets
+ATTEMPT_BUCKETS: Tuple[float, ...] = (2, 3, 4, 5, 10)
+
+# Called with (histogram, label values, observed value)
+Subscriber = Callable[["Histogram", Tuple[str, ...], float], None]
+
+
+class HistogramChild:
+    """
+    The series of one label combination. Resolve it once (histogram.labels(...))
+    and keep it: observe() then only bumps preallocated counters.
+    """
+    __slots__ = ("histogram", "label_values", "counts", "sum", "count", "_buckets", "_registry", "_lock")
+
+    def __init__(self, histogram: "Histogram", label_values: Tuple[str, ...]):
+        self.histogram = histogram
+        self.label_values = label_values
+        # One counter per bucket, plus +Inf; not cumulative
+        self.counts = [0] * (len(histogram.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._buckets = histogram.buckets
+        self._registry = histogram.registry
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+        if self._registry.subscribers:
+            for subscriber in self._registry.subscribers:
+                subscriber(self.histogram, self.label_values, value)
+
+    def cumulative_counts(self) -> List[int]:
+        with self._lock:
+            counts = list(self.counts)
+        total = 0
+        for index, count in enumerate(counts):
+            total += count
+            counts[index] = total
+        return counts
+
+
+class Histogram:
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str, label_names: Sequence[str] = (), buckets: Optional[Sequence[float]] = None):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets or registry.buckets))
+        self.children: Dict[Tuple[str, ...], HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any) -> HistogramChild:
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {', '.join(self.label_names) or '(none)'}, got {len(values)} values.")
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(key, HistogramChild(self, key))
+        return child
+
+    def observe(self, value: float, *label_values: Any):
+        self.labels(*label_values).observe(value)
+
+
+class MetricsRegistry:
+    """
+    Histograms of the application. The framework records request latency per
+    controller method, @Transactional begin/commit/rollback time and retries,
+    connection pool wait time and provider construction time; applications can add their own
+    with histogram(). subscribe() forwards every observation to another backend.
+    """
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        self.buckets = tuple(sorted(buckets or DEFAULT_BUCKETS))
+        self.histograms: Dict[str, Histogram] = {}
+        self.subscribers: Tuple[Subscriber, ...] = ()
+        self.request_duration = self.histogram(
+            "nidus_request_duration_seconds", "Time spent serving requests, per controller method.", ("method", "route", "handler")
+        )
+        self.transaction_duration = self.histogram(
+            "nidus_transaction_duration_seconds", "Time spent in transaction begin, commit and rollback.", ("phase",)
+        )
+        self.transaction_begin = self.transaction_duration.labels("begin")
+        self.transaction_commit = self.transaction_duration.labels("commit")
+        self.transaction_rollback = self.transaction_duration.labels("rollback")
+        self.transaction_retry_backoff = self.histogram(
+            "nidus_transaction_retry_backoff_seconds", "Backoff before re-running a failed @Transactional method, per function.", ("function",)
+        )
+        self.transaction_attempts = self.histogram(
+            "nidus_transaction_attempts", "Attempts made by retried @Transactional calls, per function and outcome (recovered or exhausted).",
+            ("function", "outcome"), ATTEMPT_BUCKETS,
+        )
+        self.pool_wait = self.histogram(
+            "nidus_db_pool_wait_seconds", "Time spent waiting for a database connection.", ("database",)
+        )
+        self.provider_construction = self.histogram(
+            "nidus_provider_construction_seconds", "Time spent building provider instances.", ("provider",)
+        )
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Optional[Sequence[float]] = None) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(self, name, help, labels, buckets)
+        elif histogram.label_names != tuple(labels):
+            raise ValueError(f"Histogram {name} is already registered with labels {histogram.label_names}.")
+        return histogram
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """
+        Calls subscriber(histogram, label_values, value) on every observation.
+        Returns a function that unsubscribes it.
+        """
+        self.subscribers = self.subscribers + (subscriber,)
+
+        def unsubscribe():
+            self.subscribers = tuple(existing for existing in self.subscribers if existing is not subscriber)
+        return unsubscribe
+
+    def render(self) -> str:
+        """
+        The histograms in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        for histogram in self.histograms.values():
+            lines.append(f"# HELP {histogram.name} {histogram.help}")
+            lines.append(f"# TYPE {histogram.name} histogram")
+            for child in list(histogram.children.values()):
+                labels = [f'{name}="{_escape(value)}"' for name, value in zip(histogram.label_names, child.label_values)]
+                counts = child.cumulative_counts()
+                for bound, count in zip(histogram.buckets + (math.inf,), counts):
+                    bucket_labels = ",".join(labels + [f'le="{_format(bound)}"'])
+                    lines.append(f"{histogram.name}_bucket{{{bucket_labels}}} {count}")
+                suffix = "{" + ",".join(labels) + "}" if labels else ""
+                lines.append(f"{histogram.name}_sum{suffix} {_format(child.sum)}")
+                lines.append(f"{histogram.name}_count{suffix} {counts[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def on_application_shutdown(self):
+        disable_metrics(self)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+# The registry of each application, bound by MetricsModule. Isolated: the
+# requests of an application without one record nothing, rather than into another's
+METRICS = ApplicationBinding("metrics", isolated=True)
+
+
+def current_metrics() -> Optional[MetricsRegistry]:
+    """
+    The registry instrumentation records into, or None when metrics are disabled.
+    """
+    return METRICS.get()
+
+
+def enable_metrics(registry: MetricsRegistry):
+    METRICS.set(registry)
+
+
+def disable_metrics(registry: Optional[MetricsRegistry] = None):
+    if registry is None or METRICS.value is registry:
+        METRICS.set(None)
+
+
+def timed_app(app: Callable[..., Any], child: HistogramChild) -> Callable[..., Any]:
+    """
+    Wraps the ASGI app of a route so that each call is observed by child.
+    """
+    perf_counter = time.perf_counter
+
+    async def timed(scope, receive, send):
+        start = perf_counter()
+        try:
+            await app(scope, receive, send)
+        finally:
+            child.observe(perf_counter() - start)
+    return timed
+
+
+class MetricsModule:
+    @staticmethod
+    def for_root(path: str = "/metrics", buckets: Optional[Sequence[float]] = None, registry: Optional[MetricsRegistry] = None) -> Type[Any]:
+        """
+        Builds a module enabling the framework metrics of the application and
+        serving them at `path` in the Prometheus text format. It provides the MetricsRegistry.
+
+            MetricsModule.for_root(buckets=(0.001, 0.01, 0.1, 1))
+        """
+        # Imported here: @Transactional reads current_metrics() and must not load Starlette
+        from starlette.responses import Response
+
+        metrics = registry if registry is not None else MetricsRegistry(buckets)
+
+        @Controller()
+        class MetricsController:
+            @Get(path)
+            def metrics(self):
+                return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+        @Module(
+            controllers=[MetricsController],
+            providers=[Provider(MetricsRegistry, use_value=metrics)],
+            exports=[MetricsRegistry],
+        )
+        class ConfiguredMetricsModule:
+            # Bound when the module is registered, before the other providers are built
+            __bindings__ = {METRICS: MetricsRegistry}
+
+        return ConfiguredMetricsModule
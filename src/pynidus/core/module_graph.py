@@ -0,0 +1,97 @@
+from types import MappingProxyType
+from typing import Type, Any, Dict, FrozenSet, List, Mapping, Tuple
+from pynidus.core.module import ModuleMetadata
+from pynidus.core.exceptions import CircularDependencyError
+from pynidus.core.provider import provider_token
+
+
+class ModuleNode:
+    """
+    A module visited once by the ModuleGraph, together with the
+    providers it can see and the tokens it offers to its importers.
+    """
+    def __init__(
+        self,
+        module: Type[Any],
+        metadata: ModuleMetadata,
+        imports: Tuple["ModuleNode", ...],
+        exports: FrozenSet[Any],
+        visible: FrozenSet[Any],
+    ):
+        self.module = module
+        self.metadata = metadata
+        self.imports = imports
+        self.exports = exports
+        self.visible = visible
+
+    def __repr__(self) -> str:
+        return f"ModuleNode({self.module.__name__})"
+
+
+class ModuleGraph:
+    """
+    Graph of the distinct modules reachable from a root module.
+    Shared imports (diamonds) are visited exactly once.
+    """
+    def __init__(self, root: Type[Any]):
+        nodes: Dict[Type[Any], ModuleNode] = {}
+        self._build(root, nodes)
+        self.root = root
+        self.nodes: Mapping[Type[Any], ModuleNode] = MappingProxyType(nodes)
+
+    def __iter__(self):
+        # Imports come before the modules that import them
+        return iter(self.nodes.values())
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, module: Type[Any]) -> bool:
+        return module in self.nodes
+
+    def node(self, module: Type[Any]) -> ModuleNode:
+        return self.nodes[module]
+
+    def visible_to(self, module: Type[Any]) -> FrozenSet[Any]:
+        """
+        Tokens a module can inject: its own providers plus the exports of its imports.
+        """
+        return self.nodes[module].visible
+
+    def _build(self, root: Type[Any], nodes: Dict[Type[Any], ModuleNode]):
+        in_progress: List[Type[Any]] = []
+
+        def visit(module_cls: Type[Any]) -> ModuleNode:
+            node = nodes.get(module_cls)
+            if node is not None:
+                return node
+
+            if module_cls in in_progress:
+                raise CircularDependencyError(in_progress[in_progress.index(module_cls):] + [module_cls])
+
+            if not hasattr(module_cls, "__module_metadata__"):
+                raise ValueError(f"{module_cls.__name__} is not a valid Module. Did you forget the @Module decorator?")
+
+            metadata: ModuleMetadata = getattr(module_cls, "__module_metadata__")
+
+            in_progress.append(module_cls)
+            imports = tuple(visit(imported_module) for imported_module in metadata.imports)
+            in_progress.pop()
+
+            imported_tokens = frozenset().union(*(imported.exports for imported in imports))
+            visible = frozenset(provider_token(provider) for provider in metadata.providers) | imported_tokens
+
+            exports = set()
+            imported_by_module = {imported.module: imported for imported in imports}
+            for exported in metadata.exports:
+                if exported in imported_by_module:
+                    # Re-exporting an imported module exposes everything it exports
+                    exports |= imported_by_module[exported].exports
+                else:
+                    exports.add(exported)
+
+            node = ModuleNode(module_cls, metadata, imports, frozenset(exports), visible)
+            nodes[module_cls] = node
+            return node
+
+        visit(root)
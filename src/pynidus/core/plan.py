@@ -0,0 +1,252 @@
+from dataclasses import dataclass
+from typing import Type, Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+import inspect
+import weakref
+from pynidus.core.exceptions import CircularDependencyError
+from pynidus.core.module_graph import ModuleGraph
+from pynidus.core.provider import Provider, provider_token
+from pynidus.core.scope import Scope
+
+
+@dataclass(frozen=True)
+class ProviderPlan:
+    token: Type[Any]
+    dependencies: Tuple[Type[Any], ...]
+    scope: str = Scope.SINGLETON
+    pool_size: int = 0
+    # True when building the provider needs an active request context
+    contextual: bool = False
+    lazy: bool = False
+    # Called with the resolved dependencies instead of the token itself (custom providers)
+    factory: Optional[Callable[..., Any]] = None
+
+    def build(self, *dependencies: Any) -> Any:
+        return (self.factory or self.token)(*dependencies)
+
+
+@dataclass(frozen=True)
+class ControllerPlan:
+    token: Type[Any]
+    dependencies: Tuple[Type[Any], ...]
+    scope: str = Scope.SINGLETON
+
+
+@dataclass(frozen=True)
+class ApplicationPlan:
+    """
+    Precomputed, reusable resolution plan for a root module.
+    Providers are stored in dependency order, so executing the plan
+    never needs to inspect a constructor again.
+    """
+    root_module: Type[Any]
+    modules: ModuleGraph
+    providers: Tuple[ProviderPlan, ...]
+    controllers: Tuple[ControllerPlan, ...]
+
+
+_dependency_cache: "weakref.WeakKeyDictionary[Type[Any], Tuple[Type[Any], ...]]" = weakref.WeakKeyDictionary()
+
+
+def resolve_dependencies(cls: Type[Any]) -> Tuple[Type[Any], ...]:
+    """
+    Returns the constructor dependencies of a class, in parameter order.
+    The result is cached per class.
+    """
+    try:
+        return _dependency_cache[cls]
+    except (KeyError, TypeError):
+        pass
+
+    init_signature = inspect.signature(cls.__init__)
+    dependencies = []
+
+    for param_name, param in init_signature.parameters.items():
+        if param_name == 'self':
+            continue
+
+        # Ignore *args and **kwargs
+        if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+
+        if param.annotation == inspect.Parameter.empty:
+            raise ValueError(f"Dependency {param_name} in {cls.__name__} must have a type hint.")
+
+        dependencies.append(param.annotation)
+
+    resolved = tuple(dependencies)
+    try:
+        _dependency_cache[cls] = resolved
+    except TypeError:
+        pass
+    return resolved
+
+
+def compile_plan(module_cls: Type[Any]) -> ApplicationPlan:
+    """
+    Walks the module graph once and orders every provider so that its
+    dependencies are always built first.
+    """
+    graph = ModuleGraph(module_cls)
+
+    ordered: List[ProviderPlan] = []
+    state: Dict[Any, int] = {}
+    planned: Dict[Any, ProviderPlan] = {}
+    controllers: List[ControllerPlan] = []
+    seen_controllers = set()
+
+    # Custom providers declared later (closer to the root module) take precedence
+    specs: Dict[Any, Provider] = {}
+    for node in graph:
+        for provider in node.metadata.providers:
+            if isinstance(provider, Provider):
+                specs[provider.provide] = provider
+
+    _check_visibility(graph, specs)
+
+    for node in graph:
+        for provider in node.metadata.providers:
+            _visit(provider_token(provider), ordered, state, planned, specs)
+
+    for node in graph:
+        for controller_cls in node.metadata.controllers:
+            if controller_cls in seen_controllers:
+                continue
+            seen_controllers.add(controller_cls)
+
+            dependencies = resolve_dependencies(controller_cls)
+            for dependency in dependencies:
+                _visit(dependency, ordered, state, planned, specs)
+
+            controllers.append(ControllerPlan(controller_cls, dependencies, controller_scope(dependencies, planned)))
+
+    return ApplicationPlan(module_cls, graph, tuple(ordered), tuple(controllers))
+
+
+def _check_visibility(graph: ModuleGraph, specs: Mapping[Any, Provider]):
+    """
+    Rejects dependencies on providers declared by a module that the dependent
+    module cannot see: not imported, or not exported by its module.
+    Tokens no module declares are left to auto-wiring.
+    """
+    owners: Dict[Any, Type[Any]] = {}
+    for node in graph:
+        for provider in node.metadata.providers:
+            owners.setdefault(provider_token(provider), node.module)
+
+    for node in graph:
+        dependents = [(provider_token(provider), _dependencies(provider_token(provider), specs)) for provider in node.metadata.providers]
+        dependents += [(controller, resolve_dependencies(controller)) for controller in node.metadata.controllers]
+        for token, dependencies in dependents:
+            for dependency in dependencies:
+                owner = owners.get(dependency)
+                if owner is not None and dependency not in node.visible:
+                    raise ValueError(
+                        f"{_name(token)} in {node.module.__name__} depends on {_name(dependency)}, which is not visible there: "
+                        f"{owner.__name__} must export it and {node.module.__name__} must import {owner.__name__}."
+                    )
+
+
+def controller_scope(dependencies: Tuple[Type[Any], ...], planned: Mapping[Type[Any], ProviderPlan]) -> str:
+    """
+    Controllers are singletons unless they receive a request-scoped or
+    transient provider, in which case they are built for every request.
+    """
+    for dependency in dependencies:
+        provider = planned[dependency]
+        if provider.contextual or provider.scope != Scope.SINGLETON:
+            return Scope.REQUEST
+    return Scope.SINGLETON
+
+
+def plan_providers(roots: Iterable[Any], known: Mapping[Any, ProviderPlan]) -> List[ProviderPlan]:
+    """
+    Plans providers outside of a compiled application (used for auto-wiring).
+    Providers already present in `known` are not planned again.
+    """
+    ordered: List[ProviderPlan] = []
+    state: Dict[Any, int] = {token: _DONE for token in known}
+    planned: Dict[Any, ProviderPlan] = dict(known)
+    specs = {root.provide: root for root in roots if isinstance(root, Provider)}
+    for root in roots:
+        _visit(provider_token(root), ordered, state, planned, specs)
+    return ordered
+
+
+def _dependencies(token: Any, specs: Mapping[Any, Provider]) -> Tuple[Any, ...]:
+    spec = specs.get(token)
+    if spec is None:
+        return resolve_dependencies(token)
+    if spec.use_factory is not None:
+        return spec.inject
+    if spec.use_class is not None:
+        return resolve_dependencies(spec.use_class)
+    return ()
+
+
+def _plan_provider(token: Any, dependencies: Tuple[Any, ...], planned: Mapping[Any, ProviderPlan], spec: Optional[Provider]) -> ProviderPlan:
+    factory: Optional[Callable[..., Any]] = None
+    source: Any = token
+    if spec is not None:
+        if spec.use_factory is not None:
+            factory, source = spec.use_factory, None
+        elif spec.use_class is not None:
+            factory = source = spec.use_class
+        else:
+            value = spec.use_value
+            factory, source = (lambda: value), None
+
+    declared = (spec.scope if spec is not None else None) or getattr(source, "__scope__", Scope.SINGLETON)
+    pool_size = getattr(source, "__pool_size__", 0)
+    lazy = (spec is not None and spec.lazy) or getattr(source, "__lazy__", False)
+    needs_context = any(planned[dependency].contextual for dependency in dependencies)
+
+    # A singleton cannot hold on to per-request state, so it becomes request scoped
+    scope = Scope.REQUEST if declared == Scope.SINGLETON and needs_context else declared
+    contextual = scope == Scope.REQUEST or needs_context
+
+    if pool_size and contextual:
+        raise ValueError(f"Pooled provider {_name(token)} cannot depend on request-scoped providers.")
+
+    return ProviderPlan(token, dependencies, scope, pool_size, contextual, lazy, factory)
+
+
+def _name(token: Any) -> str:
+    return getattr(token, "__name__", repr(token))
+
+
+_VISITING = 1
+_DONE = 2
+
+
+def _visit(root: Any, ordered: List[ProviderPlan], state: Dict[Any, int], planned: Dict[Any, ProviderPlan], specs: Mapping[Any, Provider]):
+    # Iterative depth-first search, so deep dependency chains do not hit the recursion limit.
+    if state.get(root) == _DONE:
+        return
+
+    stack: List[Tuple[Any, Tuple[Any, ...], int]] = []
+    state[root] = _VISITING
+    stack.append((root, _dependencies(root, specs), 0))
+
+    while stack:
+        token, dependencies, index = stack[-1]
+
+        if index < len(dependencies):
+            stack[-1] = (token, dependencies, index + 1)
+            dependency = dependencies[index]
+            dependency_state = state.get(dependency)
+
+            if dependency_state == _DONE:
+                continue
+            if dependency_state == _VISITING:
+                path = [entry[0] for entry in stack]
+                raise CircularDependencyError(path[path.index(dependency):] + [dependency])
+
+            state[dependency] = _VISITING
+            stack.append((dependency, _dependencies(dependency, specs), 0))
+            continue
+
+        stack.pop()
+        state[token] = _DONE
+        provider = _plan_provider(token, dependencies, planned, specs.get(token))
+        planned[token] = provider
+        ordered.append(provider)
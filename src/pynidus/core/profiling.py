@@ -0,0 +1,252 @@
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Type
+import sys
+import threading
+import time
+from starlette.responses import PlainTextResponse, Response
+from pynidus.common.decorators.controller import Controller
+from pynidus.common.decorators.http import Delete, Get
+from pynidus.core.module import Module
+from pynidus.core.provider import Provider
+from pynidus.core.scope import ApplicationBinding
+
+
+class Profiler:
+    """
+    Stack sampler for production requests. One request in `sample_every` (and every
+    request carrying `header`) is profiled: while it runs, a background thread
+    samples the stacks of all threads every `interval` seconds and keeps those that
+    run the route's handler, aggregated per controller method as collapsed stacks
+    (flamegraph.pl / speedscope format). Concurrent calls of the same handler are
+    sampled as well; time spent awaiting is not, since no thread runs it.
+    """
+    def __init__(
+        self,
+        sample_every: int = 1000,
+        header: Optional[str] = "x-nidus-profile",
+        interval: float = 0.001,
+        max_stacks: int = 10_000,
+    ):
+        if sample_every < 0:
+            raise ValueError("sample_every must be positive, or 0 to sample on the header only.")
+        self.sample_every = sample_every
+        self.header = header.lower().encode("latin-1") if header else None
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.requests: Dict[str, int] = {}
+        self._stacks: Dict[str, Dict[str, int]] = {}
+        self._handlers: Dict[CodeType, str] = {}
+        # Handler code -> number of profiled requests running it
+        self._active: Dict[CodeType, int] = {}
+        self._names: Dict[CodeType, str] = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def should_sample(self, scope: Dict[str, Any]) -> bool:
+        if self.header is not None:
+            for name, _ in scope.get("headers", ()):
+                if name == self.header:
+                    return True
+        if self.sample_every:
+            self._counter += 1
+            if self._counter >= self.sample_every:
+                self._counter = 0
+                return True
+        return False
+
+    def wrap(self, app: Callable[..., Any], handler: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wraps the ASGI app of a route whose handler is `function`, named `handler`
+        (Controller.method) in the results.
+        """
+        codes = _codes(function)
+        for code in codes:
+            self._handlers[code] = handler
+
+        async def profiled(scope, receive, send):
+            if not self.should_sample(scope):
+                await app(scope, receive, send)
+                return
+            self._begin(handler, codes)
+            try:
+                await app(scope, receive, send)
+            finally:
+                self._end(codes)
+        return profiled
+
+    def _begin(self, handler: str, codes: List[CodeType]):
+        with self._lock:
+            self.requests[handler] = self.requests.get(handler, 0) + 1
+            for code in codes:
+                self._active[code] = self._active.get(code, 0) + 1
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="nidus-profiler", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def _end(self, codes: List[CodeType]):
+        with self._lock:
+            for code in codes:
+                if self._active[code] == 1:
+                    del self._active[code]
+                else:
+                    self._active[code] -= 1
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._active and not self._stopped:
+                    self._wake.wait()
+                if self._stopped:
+                    return
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self):
+        """
+        Takes one sample of every thread running a profiled handler.
+        """
+        with self._lock:
+            active = set(self._active)
+        if not active:
+            return
+        current = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == current:
+                continue
+            codes: List[CodeType] = []
+            root = 0
+            while frame is not None:
+                codes.append(frame.f_code)
+                if frame.f_code in active:
+                    # The outermost frame of the handler, above its decorators' wrappers
+                    root = len(codes)
+                frame = frame.f_back
+            if root:
+                self._record(codes[:root])
+
+    def _record(self, codes: List[CodeType]):
+        codes.reverse()
+        handler = self._handlers[codes[0]]
+        names = [handler]
+        for code in codes[1:]:
+            name = self._names.get(code)
+            if name is None:
+                name = self._names[code] = _code_name(code)
+            names.append(name)
+        stack = ";".join(names)
+        with self._lock:
+            stacks = self._stacks.setdefault(handler, {})
+            if stack not in stacks and len(stacks) >= self.max_stacks:
+                stack = f"{handler};(other)"
+            stacks[stack] = stacks.get(stack, 0) + 1
+
+    def collapsed(self, handler: Optional[str] = None) -> str:
+        """
+        The samples as collapsed stacks ("frame;frame;frame count" per line),
+        rooted at the controller method, most frequent first.
+        """
+        with self._lock:
+            lines = [
+                (count, stack)
+                for name, stacks in self._stacks.items()
+                if handler is None or name == handler
+                for stack, count in stacks.items()
+            ]
+        lines.sort(key=lambda line: (-line[0], line[1]))
+        return "".join(f"{stack} {count}\n" for count, stack in lines)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.requests.clear()
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+            self._wake.notify()
+        if thread is not None:
+            thread.join()
+
+    def on_application_shutdown(self):
+        self.stop()
+        disable_profiler(self)
+
+
+def _codes(function: Callable[..., Any]) -> List[CodeType]:
+    # The handler and the functions its decorators wrap
+    codes = []
+    seen = set()
+    while function is not None and id(function) not in seen:
+        seen.add(id(function))
+        code = getattr(getattr(function, "__func__", function), "__code__", None)
+        if code is not None:
+            codes.append(code)
+        function = getattr(function, "__wrapped__", None)
+    return codes
+
+
+def _code_name(code: CodeType) -> str:
+    module = code.co_filename.rsplit("/", 1)[-1].removesuffix(".py")
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+# The profiler of each application, bound by ProfilingModule
+PROFILER = ApplicationBinding("profiler", isolated=True)
+
+
+def current_profiler() -> Optional[Profiler]:
+    return PROFILER.get()
+
+
+def enable_profiler(profiler: Profiler):
+    PROFILER.set(profiler)
+
+
+def disable_profiler(profiler: Optional[Profiler] = None):
+    if profiler is None or PROFILER.value is profiler:
+        PROFILER.set(None)
+
+
+class ProfilingModule:
+    @staticmethod
+    def for_root(
+        sample_every: int = 1000,
+        header: Optional[str] = "x-nidus-profile",
+        path: str = "/_profile",
+        interval: float = 0.001,
+        profiler: Optional[Profiler] = None,
+    ) -> Type[Any]:
+        """
+        Builds a module profiling a sample of the requests (see Profiler) and serving
+        the collapsed stacks at `path` (?handler=Controller.method narrows them down;
+        DELETE clears them). Keep `path` behind your admin authentication.
+        """
+        configured = profiler if profiler is not None else Profiler(sample_every, header, interval)
+
+        @Controller()
+        class ProfilerController:
+            @Get(path)
+            def collapsed(self, handler: Optional[str] = None):
+                return PlainTextResponse(configured.collapsed(handler))
+
+            @Delete(path)
+            def reset(self):
+                configured.reset()
+                return Response(status_code=204)
+
+        @Module(
+            controllers=[ProfilerController],
+            providers=[Provider(Profiler, use_value=configured)],
+            exports=[Profiler],
+        )
+        class ConfiguredProfilingModule:
+            # Bound when the module is registered, so that the routes are wrapped
+            __bindings__ = {PROFILER: Profiler}
+
+        return ConfiguredProfilingModule
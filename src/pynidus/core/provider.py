@@ -0,0 +1,57 @@
+from typing import Type, Any, Callable, List, Optional
+from pynidus.core.scope import Scope
+
+_NO_VALUE = object()
+
+
+class Provider:
+    """
+    Custom provider for a token, for cases a plain class does not cover:
+
+        Provider(CacheStore, use_class=InMemoryCacheStore)
+        Provider(Settings, use_value=settings)
+        Provider(Engine, use_factory=make_engine, inject=[Settings])
+    """
+    def __init__(
+        self,
+        provide: Any,
+        use_class: Optional[Type[Any]] = None,
+        use_value: Any = _NO_VALUE,
+        use_factory: Optional[Callable[..., Any]] = None,
+        inject: Optional[List[Any]] = None,
+        scope: Optional[str] = None,
+        lazy: bool = False,
+    ):
+        given = sum([use_class is not None, use_value is not _NO_VALUE, use_factory is not None])
+        if given != 1:
+            raise ValueError(f"Provider for {_name(provide)} needs exactly one of use_class, use_value or use_factory.")
+        if inject and use_factory is None:
+            raise ValueError(f"inject is only supported together with use_factory (provider for {_name(provide)}).")
+        if scope is not None and scope not in Scope.ALL:
+            raise ValueError(f"Unknown scope '{scope}'. Expected one of {', '.join(Scope.ALL)}.")
+
+        self.provide = provide
+        self.use_class = use_class
+        self.use_value = use_value
+        self.use_factory = use_factory
+        self.inject = tuple(inject or ())
+        self.scope = scope
+        self.lazy = lazy
+
+    @property
+    def has_value(self) -> bool:
+        return self.use_value is not _NO_VALUE
+
+    def __repr__(self) -> str:
+        return f"Provider({_name(self.provide)})"
+
+
+def provider_token(provider: Any) -> Any:
+    """
+    The DI token of a module provider entry (a class or a Provider).
+    """
+    return provider.provide if isinstance(provider, Provider) else provider
+
+
+def _name(token: Any) -> str:
+    return getattr(token, "__name__", repr(token))
@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.convertors import Convertor
+from starlette.routing import Route, Router, WebSocketRoute
+import re
+
+_PARAM = re.compile(r"^\{([a-zA-Z_][a-zA-Z0-9_]*)(?::([a-zA-Z_][a-zA-Z0-9_]*))?\}$")
+
+
+class _Node:
+    __slots__ = ("static", "params", "handlers")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        # (name, convertor, compiled regex, child)
+        self.params: List[Tuple[str, Convertor, "re.Pattern[str]", "_Node"]] = []
+        # method -> (registration order, route)
+        self.handlers: Dict[str, Tuple[int, Route]] = {}
+
+
+class RadixTree:
+    """
+    Segment-based radix tree of routes, keyed by HTTP method at the leaves.
+    When several routes match a path, the first registered one wins, as with
+    Starlette's linear matching.
+    """
+    def __init__(self):
+        self.root = _Node()
+        self.size = 0
+
+    def insert(self, route: Route) -> bool:
+        """
+        Indexes a route. Returns False for routes the tree cannot represent
+        (mounts, websocket routes, partial-segment or path parameters); those
+        are left to Starlette's own matching.
+        """
+        if not isinstance(route, Route):
+            return False
+        if not route.methods or not route.path.startswith("/"):
+            return False
+
+        node = self.root
+        for segment in route.path.split("/")[1:]:
+            if "{" not in segment:
+                node = node.static.setdefault(segment, _Node())
+                continue
+
+            match = _PARAM.match(segment)
+            if match is None:
+                return False
+            name = match.group(1)
+            convertor = route.param_convertors.get(name)
+            if convertor is None or match.group(2) == "path":
+                return False
+
+            for existing_name, existing_convertor, _, child in node.params:
+                if existing_name == name and type(existing_convertor) is type(convertor):
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.params.append((name, convertor, re.compile(convertor.regex), child))
+                node = child
+
+        for method in route.methods:
+            # First registered route wins, as with linear matching
+            node.handlers.setdefault(method, (self.size, route))
+        self.size += 1
+        return True
+
+    def match(self, method: str, path: str) -> Optional[Tuple[Route, Dict[str, Any]]]:
+        if not path.startswith("/"):
+            return None
+        params: Dict[str, Any] = {}
+        found = self._match(self.root, path.split("/")[1:], 0, method, params)
+        if found is None:
+            return None
+        _, route, params = found
+        return route, params
+
+    def _match(self, node: _Node, segments: List[str], index: int, method: str, params: Dict[str, Any]) -> Optional[Tuple[int, Route, Dict[str, Any]]]:
+        if index == len(segments):
+            handler = node.handlers.get(method)
+            if handler is None:
+                return None
+            return handler[0], handler[1], dict(params)
+
+        # Every matching branch is explored, so that a static segment does not
+        # shadow a parameter route registered before it
+        segment = segments[index]
+        best = None
+        child = node.static.get(segment)
+        if child is not None:
+            best = self._match(child, segments, index + 1, method, params)
+
+        for name, convertor, regex, child in node.params:
+            if not segment or regex.fullmatch(segment) is None:
+                continue
+            params[name] = convertor.convert(segment)
+            found = self._match(child, segments, index + 1, method, params)
+            del params[name]
+            if found is not None and (best is None or found[0] < best[0]):
+                best = found
+
+        return best
+
+
+class RadixRouter:
+    """
+    Replaces the router's linear scan for plain HTTP routes.
+    Anything the tree cannot answer (websockets, mounts, 404/405 handling,
+    trailing slash redirects) falls through to Starlette unchanged. Routes
+    registered after a mount or a path parameter route are not indexed.
+    OpenAPI generation is unaffected, since app.routes is left as is.
+    """
+    def __init__(self, router: Router):
+        self.router = router
+        self.fallback = router.middleware_stack
+        self.tree = RadixTree()
+        self._indexed = -1
+
+    def rebuild(self):
+        tree = RadixTree()
+        for route in self.router.routes:
+            if not tree.insert(route) and not isinstance(route, WebSocketRoute):
+                # Later routes could be shadowed by this one, so they stay with Starlette
+                break
+        self.tree = tree
+        self._indexed = len(self.router.routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            if self._indexed != len(self.router.routes):
+                # Routes were added after the tree was built
+                self.rebuild()
+
+            found = self.tree.match(scope["method"], _route_path(scope))
+            if found is not None:
+                route, params = found
+                if "router" not in scope:
+                    scope["router"] = self.router
+                path_params = dict(scope.get("path_params", {}))
+                path_params.update(params)
+                scope["endpoint"] = route.endpoint
+                scope["path_params"] = path_params
+                if isinstance(route, APIRoute):
+                    scope["route"] = route
+                await route.handle(scope, receive, send)
+                return
+
+        await self.fallback(scope, receive, send)
+
+
+def install_radix_router(app: FastAPI) -> RadixRouter:
+    """
+    Routes HTTP requests of an application through a RadixRouter.
+    """
+    dispatcher = RadixRouter(app.router)
+    dispatcher.rebuild()
+    app.router.middleware_stack = dispatcher
+    return dispatcher
+
+
+def _route_path(scope) -> str:
+    # Same rules as Starlette: the path relative to root_path
+    path: str = scope["path"]
+    root_path = scope.get("root_path", "")
+    if not root_path or not path.startswith(root_path):
+        return path
+    if path == root_path:
+        return ""
+    if path[len(root_path)] == "/":
+        return path[len(root_path):]
+    return path
@@ -0,0 +1,172 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Type, Any, Callable, Dict, List, Optional, Tuple
+import threading
+
+
+class Scope:
+    """
+    Lifetimes a provider can have.
+    """
+    SINGLETON = "singleton"
+    REQUEST = "request"
+    TRANSIENT = "transient"
+
+    ALL = (SINGLETON, REQUEST, TRANSIENT)
+
+
+class InstancePool:
+    """
+    Bounded pool of recycled transient instances.
+    Instances may define on_recycle() to reset their state before reuse.
+    """
+    def __init__(self, token: Type[Any], max_size: int):
+        self.token = token
+        self.max_size = max_size
+        self.created = 0
+        self.reused = 0
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.created += 1
+        return factory()
+
+    def release(self, instance: Any):
+        recycle = getattr(instance, "on_recycle", None)
+        if recycle is not None:
+            recycle()
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(instance)
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+
+class RequestContext:
+    """
+    Holds the request-scoped instances of a single HTTP request.
+    """
+    __slots__ = ("instances", "items", "_borrowed")
+
+    def __init__(self):
+        self.instances: Dict[Type[Any], Any] = {}
+        # Free-form per-request storage for framework features
+        self.items: Dict[Any, Any] = {}
+        self._borrowed: List[Tuple[InstancePool, Any]] = []
+
+    def borrow(self, pool: InstancePool, factory: Callable[[], Any]) -> Any:
+        instance = pool.acquire(factory)
+        self._borrowed.append((pool, instance))
+        return instance
+
+    def close(self):
+        borrowed, self._borrowed = self._borrowed, []
+        for pool, instance in borrowed:
+            pool.release(instance)
+        self.instances.clear()
+
+
+_current_context: ContextVar[Optional[RequestContext]] = ContextVar("pynidus_request_context", default=None)
+
+
+def current_request_context() -> Optional[RequestContext]:
+    return _current_context.get()
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that opens a RequestContext for every HTTP request
+    and releases it once the response has been sent.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        context = RequestContext()
+        token = _current_context.set(context)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_context.reset(token)
+            context.close()
+
+
+_UNBOUND = object()
+_current_bindings: ContextVar[Optional[Dict["ApplicationBinding", Any]]] = ContextVar("pynidus_application_bindings", default=None)
+
+
+class ApplicationBinding:
+    """
+    Framework state a module configures for the application importing it (the
+    default database, the metrics registry, ...). get() returns the value of the
+    application being created or serving the current request or lifespan, so that
+    several applications in one process keep their own. Elsewhere, or when that
+    application has none, it returns the process-wide value: set(), or the one of
+    the application registered last. An isolated binding returns None instead, so
+    that an application never records into the state of another one.
+    """
+    __slots__ = ("name", "isolated", "_value")
+
+    def __init__(self, name: str, isolated: bool = False):
+        self.name = name
+        self.isolated = isolated
+        self._value: Any = None
+
+    def get(self) -> Any:
+        bindings = _current_bindings.get()
+        if bindings is not None:
+            value = bindings.get(self, _UNBOUND)
+            if value is not _UNBOUND:
+                return value
+            if self.isolated:
+                return None
+        return self._value
+
+    @property
+    def value(self) -> Any:
+        # The process-wide value, whatever the current application
+        return self._value
+
+    def set(self, value: Any):
+        self._value = value
+
+    def __repr__(self) -> str:
+        return f"ApplicationBinding({self.name})"
+
+
+@contextmanager
+def application_bindings(bindings: Dict[ApplicationBinding, Any]):
+    token = _current_bindings.set(bindings)
+    try:
+        yield
+    finally:
+        _current_bindings.reset(token)
+
+
+class ApplicationBindingMiddleware:
+    """
+    ASGI middleware making the bindings of its application current for every
+    request and for the lifespan.
+    """
+    def __init__(self, app, bindings: Dict[ApplicationBinding, Any]):
+        self.app = app
+        self.bindings = bindings
+
+    async def __call__(self, scope, receive, send):
+        token = _current_bindings.set(self.bindings)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_bindings.reset(token)
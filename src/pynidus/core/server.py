@@ -0,0 +1,125 @@
+from typing import Any, Dict, Optional, Tuple
+import gc
+import os
+import signal
+import socket
+import time
+import uvicorn
+from fastapi import FastAPI
+from pynidus.core.lifecycle import logger
+
+# A worker dying sooner than this after its start is restarted after a pause,
+# so that a worker crashing on startup does not spin the parent
+MIN_UPTIME = 1.0
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+def bind_socket(host: str, port: int, reuse_port: bool, listen: bool = True) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if listen:
+        sock.listen(2048)
+    return sock
+
+
+class PreforkServer:
+    """
+    Serves an application built once in the parent process from `workers` forked
+    uvicorn processes. The parent freezes its objects (gc.freeze) before forking,
+    so that the container pages stay shared copy-on-write, then only supervises:
+    crashed workers are restarted, SIGINT/SIGTERM stop them all.
+    With SO_REUSEPORT each worker binds its own socket and the kernel balances
+    connections between them; elsewhere they share the socket of the parent.
+    """
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 8000, workers: int = 2, **config: Any):
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if not hasattr(os, "fork"):
+            raise ValueError("Forking workers is not supported on this platform.")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.config = config
+        self.reuse_port = hasattr(socket, "SO_REUSEPORT")
+        # pid -> (worker index, start time)
+        self.children: Dict[int, Tuple[int, float]] = {}
+        self._socket: Optional[socket.socket] = None
+        self._stopping = False
+
+    def run(self):
+        if self.reuse_port:
+            # Fails here when the port is in use; not listening, so never handed connections
+            bind_socket(self.host, self.port, reuse_port=True, listen=False).close()
+        else:
+            self._socket = bind_socket(self.host, self.port, reuse_port=False)
+
+        gc.collect()
+        gc.freeze()
+        previous = {signum: signal.signal(signum, self._stop) for signum in STOP_SIGNALS}
+        try:
+            for index in range(self.workers):
+                self._spawn(index)
+            self._supervise()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            if self._socket is not None:
+                self._socket.close()
+            gc.unfreeze()
+
+    def _spawn(self, index: int):
+        # Blocked until the child has restored the default handlers
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = self._serve(index)
+            except BaseException:
+                logger.exception("Worker %d failed", index)
+            finally:
+                os._exit(code)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+        self.children[pid] = (index, time.monotonic())
+        logger.info("Started worker %d (pid %d)", index, pid)
+
+    def _serve(self, index: int) -> int:
+        for signum in STOP_SIGNALS:
+            signal.signal(signum, signal.SIG_DFL)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+        sock = bind_socket(self.host, self.port, reuse_port=True) if self.reuse_port else self._socket
+        factory = getattr(self.app.state, "nidus", None)
+        if factory is not None:
+            factory.forked = True
+        server = uvicorn.Server(uvicorn.Config(self.app, host=self.host, port=self.port, **self.config))
+        server.run(sockets=[sock])
+        # Like uvicorn.run: a failed lifespan startup exits with status 3
+        return 0 if server.started else 3
+
+    def _supervise(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            index, started = self.children.pop(pid)
+            if self._stopping:
+                continue
+            logger.warning("Worker %d (pid %d) exited with status %d, restarting it", index, pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < MIN_UPTIME:
+                time.sleep(MIN_UPTIME)
+            if not self._stopping:
+                self._spawn(index)
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
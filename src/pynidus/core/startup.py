@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import time
+import tracemalloc
+from pynidus.core.plan import ApplicationPlan
+from pynidus.core.provider import provider_token
+
+
+@dataclass(frozen=True)
+class StartupSpan:
+    # "compile", "provider", "controller", "middleware" or "router"
+    kind: str
+    name: str
+    # The module declaring the provider or controller
+    module: Optional[str]
+    # Why it was built: root module first, then each dependent down to it
+    chain: Tuple[str, ...]
+    # Seconds since profiling started
+    start: float
+    duration: float
+    # Bytes allocated during the span and still alive at its end (tracemalloc)
+    allocated: int
+
+
+class _Span:
+    __slots__ = ("profiler", "kind", "token", "start", "memory")
+
+    def __init__(self, profiler: "StartupProfiler", kind: str, token: Any):
+        self.profiler = profiler
+        self.kind = kind
+        self.token = token
+
+    def __enter__(self):
+        self.memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self.start
+        allocated = tracemalloc.get_traced_memory()[0] - self.memory
+        self.profiler.records.append((self.kind, self.token, self.start - self.profiler.origin, duration, allocated))
+        return False
+
+
+class StartupProfiler:
+    """
+    Records the time and memory spent on each step of NidusFactory.create
+    (NidusFactory.create(..., profile_startup=True)). tracemalloc runs for the
+    duration of the profiling, which makes startup itself slower.
+    """
+    def __init__(self):
+        self.records: List[Tuple[str, Any, float, float, int]] = []
+        self.origin = time.perf_counter()
+        self._owns_tracing = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        self.origin = time.perf_counter()
+
+    def stop(self):
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def span(self, kind: str, token: Any = None) -> _Span:
+        return _Span(self, kind, token)
+
+    def report(self, plan: Optional[ApplicationPlan]) -> "StartupReport":
+        modules, chains = _provenance(plan) if plan is not None else ({}, {})
+        spans = []
+        for kind, token, start, duration, allocated in self.records:
+            name = _name(token) if token is not None else kind
+            spans.append(StartupSpan(kind, name, modules.get(token), chains.get(token, ()), start, duration, allocated))
+        return StartupReport(spans)
+
+
+def _name(token: Any) -> str:
+    return getattr(token, "__name__", None) or repr(token)
+
+
+def _provenance(plan: ApplicationPlan) -> Tuple[Dict[Any, str], Dict[Any, Tuple[str, ...]]]:
+    """
+    The declaring module of every token, and the dependency chain that led to it:
+    the first dependent found, up to a controller or a provider nothing depends on.
+    """
+    modules: Dict[Any, str] = {}
+    for node in plan.modules:
+        for provider in node.metadata.providers:
+            modules.setdefault(provider_token(provider), node.module.__name__)
+        for controller in node.metadata.controllers:
+            modules.setdefault(controller, node.module.__name__)
+
+    dependents: Dict[Any, Any] = {}
+    for controller in plan.controllers:
+        for dependency in controller.dependencies:
+            dependents.setdefault(dependency, controller.token)
+    for provider in plan.providers:
+        for dependency in provider.dependencies:
+            dependents.setdefault(dependency, provider.token)
+
+    chains: Dict[Any, Tuple[str, ...]] = {}
+    for token in list(modules) + [provider.token for provider in plan.providers]:
+        chain = [token]
+        seen = {token}
+        while chain[-1] in dependents and dependents[chain[-1]] not in seen:
+            seen.add(dependents[chain[-1]])
+            chain.append(dependents[chain[-1]])
+        root = modules.get(chain[-1], plan.root_module.__name__)
+        chains[token] = (root,) + tuple(_name(link) for link in reversed(chain))
+    return modules, chains
+
+
+class StartupReport:
+    """
+    The spans of a profiled startup, with a text summary (render) and a Chrome
+    trace-event export that chrome://tracing or ui.perfetto.dev can open.
+    """
+    def __init__(self, spans: List[StartupSpan]):
+        self.spans = spans
+        self.total = max((span.start + span.duration for span in spans), default=0.0)
+
+    def slowest(self, limit: int = 20) -> List[StartupSpan]:
+        return sorted(self.spans, key=lambda span: span.duration, reverse=True)[:limit]
+
+    def by_module(self) -> Dict[str, Tuple[float, int]]:
+        """
+        Total (seconds, bytes) of the providers and controllers of each module, slowest first.
+        """
+        totals: Dict[str, Tuple[float, int]] = {}
+        for span in self.spans:
+            if span.module is not None:
+                duration, allocated = totals.get(span.module, (0.0, 0))
+                totals[span.module] = (duration + span.duration, allocated + span.allocated)
+        return dict(sorted(totals.items(), key=lambda item: item[1][0], reverse=True))
+
+    def render(self, limit: int = 20) -> str:
+        lines = [f"Startup: {self.total * 1000:.1f} ms, {len(self.spans)} steps"]
+        lines.append(f"{'ms':>9} {'KiB':>9}  {'kind':10}  name")
+        for span in self.slowest(limit):
+            chain = f"  ({' > '.join(span.chain)})" if len(span.chain) > 2 else ""
+            lines.append(f"{span.duration * 1000:9.2f} {span.allocated / 1024:9.1f}  {span.kind:10}  {span.name}{chain}")
+        modules = self.by_module()
+        if modules:
+            lines.append("By module:")
+            for module, (duration, allocated) in list(modules.items())[:limit]:
+                lines.append(f"{duration * 1000:9.2f} {allocated / 1024:9.1f}  {module}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        events = [
+            {
+                "name": span.name,
+                "cat": span.kind,
+                "ph": "X",
+                "ts": round(span.start * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": 1,
+                "tid": 1,
+                "args": {"module": span.module, "chain": " > ".join(span.chain), "allocated_bytes": span.allocated},
+            }
+            for span in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
@@ -0,0 +1,202 @@
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, Union
+import asyncio
+import csv
+import functools
+import inspect
+import io
+import json
+import anyio
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from pynidus.common.decorators.stream import StreamFormat, StreamOptions
+
+_MEDIA_TYPES = {
+    StreamFormat.NDJSON: "application/x-ndjson",
+    StreamFormat.CSV: "text/csv",
+    StreamFormat.SSE: "text/event-stream",
+}
+_ACCEPTED = {
+    "application/x-ndjson": StreamFormat.NDJSON,
+    "application/jsonlines": StreamFormat.NDJSON,
+    "application/json-seq": StreamFormat.NDJSON,
+    "text/csv": StreamFormat.CSV,
+    "text/event-stream": StreamFormat.SSE,
+}
+_DONE = object()
+
+
+class ServerSentEvent:
+    """
+    An item of an SSE stream with an explicit event name, id or retry delay.
+    Other items are sent as `data:` lines only.
+    """
+    __slots__ = ("data", "event", "id", "retry")
+
+    def __init__(self, data: Any, event: Optional[str] = None, id: Optional[str] = None, retry: Optional[int] = None):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+
+def stream_options(function: Callable[..., Any]) -> Optional[StreamOptions]:
+    """
+    The streaming options of a controller method: those set by @Stream, default
+    options for generator functions, or None for regular methods.
+    """
+    value = function
+    seen = set()
+    while value is not None and id(value) not in seen:
+        seen.add(id(value))
+        options = getattr(value, "__stream__", None)
+        if options is not None:
+            return options
+        if inspect.isgeneratorfunction(value) or inspect.isasyncgenfunction(value):
+            return StreamOptions()
+        value = getattr(value, "__wrapped__", None)
+    return None
+
+
+def negotiate(request: Request, options: StreamOptions) -> str:
+    accept = request.headers.get("accept", "")
+    if options.format is None:
+        for media_range in accept.split(","):
+            stream_format = _ACCEPTED.get(media_range.split(";")[0].strip().lower())
+            if stream_format is not None:
+                return stream_format
+    return options.format or StreamFormat.NDJSON
+
+
+def streaming_endpoint(endpoint: Callable[..., Any], signature: inspect.Signature, options: StreamOptions) -> Callable[..., Any]:
+    """
+    Wraps a controller endpoint so that its result is sent as a StreamingResponse.
+    signature is the endpoint's signature (without self); the request is added
+    to it to negotiate the format from the Accept header.
+    """
+    # Sync handlers may block (e.g. a query building a list): like FastAPI does for
+    # plain routes, they run in the thread pool. Generators only start when iterated
+    on_loop = inspect.iscoroutinefunction(endpoint) or inspect.isasyncgenfunction(endpoint) or inspect.isgeneratorfunction(endpoint)
+
+    async def stream(_nidus_request: Request, **kwargs):
+        if on_loop:
+            result = endpoint(**kwargs)
+        else:
+            result = await run_in_threadpool(endpoint, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        stream_format = negotiate(_nidus_request, options)
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"} if stream_format == StreamFormat.SSE else None
+        return StreamingResponse(
+            encode(result, stream_format),
+            media_type=_MEDIA_TYPES[stream_format],
+            headers=headers,
+        )
+
+    request_parameter = inspect.Parameter("_nidus_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+    parameters = [parameter for parameter in signature.parameters.values() if parameter.kind != inspect.Parameter.VAR_KEYWORD]
+    functools.update_wrapper(stream, endpoint)
+    del stream.__wrapped__
+    stream.__signature__ = signature.replace(parameters=[*parameters, request_parameter], return_annotation=inspect.Signature.empty)
+    return stream
+
+
+async def iterate(items: Union[Iterable[Any], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    """
+    Iterates sync or async items. Sync generators advance in the thread pool, one
+    item per step, so a slow client only holds the generator back (backpressure).
+    The source is closed when iteration stops early, e.g. on client disconnect.
+    """
+    if hasattr(items, "__aiter__"):
+        try:
+            async for item in items:
+                yield item
+        finally:
+            close = getattr(items, "aclose", None)
+            if close is not None:
+                await close()
+        return
+
+    iterator = iter(items)
+    step: Optional[asyncio.Future] = None
+    try:
+        while True:
+            # Shielded: a cancelled step keeps running in its thread until next() returns
+            step = asyncio.ensure_future(run_in_threadpool(next, iterator, _DONE))
+            item = await asyncio.shield(step)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            if step is not None and not step.done():
+                # A generator cannot be closed while it runs: let that step finish first
+                with anyio.CancelScope(shield=True):
+                    await asyncio.wait([step])
+                if not step.cancelled():
+                    # Retrieved so that an error of the abandoned step is not reported as unhandled
+                    step.exception()
+            close()
+
+
+async def encode(items: Union[Iterable[Any], AsyncIterator[Any]], stream_format: str) -> AsyncIterator[str]:
+    if stream_format == StreamFormat.CSV:
+        async for chunk in _encode_csv(iterate(items)):
+            yield chunk
+        return
+
+    source = iterate(items)
+    try:
+        if stream_format == StreamFormat.SSE:
+            async for item in source:
+                yield _sse(item)
+        else:
+            async for item in source:
+                yield _json(item) + "\n"
+    finally:
+        await source.aclose()
+
+
+async def _encode_csv(source: AsyncIterator[Any]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    fields = None
+    try:
+        async for item in source:
+            item = jsonable_encoder(item)
+            if isinstance(item, dict):
+                if fields is None:
+                    # The first row decides the columns
+                    fields = list(item)
+                    writer.writerow(fields)
+                writer.writerow([item.get(field) for field in fields])
+            elif isinstance(item, (list, tuple)):
+                writer.writerow(item)
+            else:
+                writer.writerow([item])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    finally:
+        await source.aclose()
+
+
+def _json(item: Any) -> str:
+    return json.dumps(jsonable_encoder(item), separators=(",", ":"))
+
+
+def _sse(item: Any) -> str:
+    lines = []
+    if isinstance(item, ServerSentEvent):
+        if item.event is not None:
+            lines.append(f"event: {item.event}")
+        if item.id is not None:
+            lines.append(f"id: {item.id}")
+        if item.retry is not None:
+            lines.append(f"retry: {item.retry}")
+        item = item.data
+    data = item if isinstance(item, str) else _json(item)
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
@@ -1,7 +1,59 @@
-from .base import Base
-from .session import AsyncSessionLocal, engine as async_engine
-from .sync_session import SessionLocal, engine as sync_engine
-from .dependencies import get_db, get_sync_db
+from typing import TYPE_CHECKING
+
+# Public name -> submodule defining it. Each is imported on first access, so that
+# importing pynidus.db neither loads SQLAlchemy nor touches a database
+_EXPORTS = {
+    "Base": "pynidus.db.base",
+    "Database": "pynidus.db.database",
+    "DatabaseConfig": "pynidus.db.database",
+    "DatabaseManager": "pynidus.db.database",
+    "PoolOptions": "pynidus.db.database",
+    "PoolStats": "pynidus.db.database",
+    "default_database": "pynidus.db.database",
+    "ReplicaSelection": "pynidus.db.routing",
+    "SessionScope": "pynidus.db.scope",
+    "SessionScopeMiddleware": "pynidus.db.scope",
+    "current_session_scope": "pynidus.db.scope",
+    "session_scope": "pynidus.db.scope",
+    "SessionContext": "pynidus.db.context",
+    "AsyncSessionContext": "pynidus.db.context",
+    "SQLAlchemyTransactionManager": "pynidus.db.transaction_manager",
+    "AsyncSQLAlchemyTransactionManager": "pynidus.db.transaction_manager",
+    "Repository": "pynidus.db.repository",
+    "AsyncRepository": "pynidus.db.repository",
+    "KeysetPage": "pynidus.db.repository",
+    "EntitySerializer": "pynidus.db.serializer",
+    "compile_serializer": "pynidus.db.serializer",
+    "DatabaseModule": "pynidus.db.module",
+    "get_db": "pynidus.db.dependencies",
+    "get_sync_db": "pynidus.db.dependencies",
+}
+
+_DEFAULT_ATTRIBUTES = {
+    "AsyncSessionLocal": "async_session_factory",
+    "async_engine": "async_engine",
+    "SessionLocal": "session_factory",
+    "sync_engine": "engine",
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is not None:
+        # __import__ rather than importlib.import_module, which -X importtime does not report
+        value = getattr(__import__(module, fromlist=[name]), name)
+        globals()[name] = value
+        return value
+    # Engines and session factories of the default database, created on first use
+    # and never cached here, since the default database can be replaced
+    if name in _DEFAULT_ATTRIBUTES:
+        return getattr(__getattr__("default_database")(), _DEFAULT_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_DEFAULT_ATTRIBUTES))
+
 
 __all__ = [
     "Base",
@@ -11,4 +63,36 @@ __all__ = [
     "sync_engine",
     "get_db",
     "get_sync_db",
+    "Database",
+    "DatabaseConfig",
+    "DatabaseManager",
+    "DatabaseModule",
+    "PoolOptions",
+    "PoolStats",
+    "ReplicaSelection",
+    "SessionScope",
+    "SessionScopeMiddleware",
+    "current_session_scope",
+    "session_scope",
+    "SessionContext",
+    "AsyncSessionContext",
+    "SQLAlchemyTransactionManager",
+    "AsyncSQLAlchemyTransactionManager",
+    "Repository",
+    "AsyncRepository",
+    "KeysetPage",
+    "EntitySerializer",
+    "compile_serializer",
 ]
+
+if TYPE_CHECKING:
+    from .base import Base
+    from .database import Database, DatabaseConfig, DatabaseManager, PoolOptions, PoolStats, default_database
+    from .routing import ReplicaSelection
+    from .scope import SessionScope, SessionScopeMiddleware, current_session_scope, session_scope
+    from .context import SessionContext, AsyncSessionContext
+    from .transaction_manager import SQLAlchemyTransactionManager, AsyncSQLAlchemyTransactionManager
+    from .repository import Repository, AsyncRepository, KeysetPage
+    from .serializer import EntitySerializer, compile_serializer
+    from .module import DatabaseModule
+    from .dependencies import get_db, get_sync_db
@@ -0,0 +1,49 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .database import Database, default_database
+from .scope import SessionScope, _current_scope
+
+
+class SessionContext:
+    """
+    Resolves the session of the current scope for a database (the default one when
+    not given). Safe to hold in singletons: every request or task gets its own session.
+    """
+    is_async = False
+
+    def __init__(self, database: Optional[Database] = None):
+        self._database = database
+
+    @property
+    def database(self) -> Database:
+        return self._database or default_database()
+
+    def scope(self) -> SessionScope:
+        scope = _current_scope.get()
+        if scope is None:
+            raise RuntimeError(
+                "No session scope is active. Sessions are available inside requests "
+                "(SessionScopeMiddleware) or within 'with session_scope()'."
+            )
+        return scope
+
+    @property
+    def session(self) -> Session:
+        return self.scope().session(self.database)
+
+    @property
+    def session_factory(self):
+        return self.database.session_factory
+
+
+class AsyncSessionContext(SessionContext):
+    is_async = True
+
+    @property
+    def session(self) -> AsyncSession:
+        return self.scope().async_session(self.database)
+
+    @property
+    def session_factory(self):
+        return self.database.async_session_factory
@@ -0,0 +1,441 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from pynidus.core.metrics import current_metrics
+from pynidus.core.scope import ApplicationBinding, RequestContextMiddleware
+from pynidus.db.routing import ReplicaRouter, ReplicaSelection, RoutingSession
+from pynidus.db.scope import SessionScopeMiddleware
+
+# Async driver used for each backend when only a sync URL is configured (and back)
+_ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+_SYNC_DRIVERS = {
+    "sqlite": "pysqlite",
+    "postgresql": "psycopg2",
+    "mysql": "mysqldb",
+}
+
+
+class PoolOptions:
+    """
+    Connection pool settings, applied to both the sync and the async engine.
+    """
+    def __init__(
+        self,
+        size: int = 5,
+        max_overflow: int = 10,
+        timeout: float = 30.0,
+        recycle: int = -1,
+        pre_ping: bool = False,
+        use_lifo: bool = False,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.use_lifo = use_lifo
+
+    def engine_options(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.timeout,
+            "pool_recycle": self.recycle,
+            "pool_pre_ping": self.pre_ping,
+            "pool_use_lifo": self.use_lifo,
+        }
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    # Checkouts that found every connection in use and had to wait
+    waits: int
+    wait_time_total: float
+    wait_time_max: float
+
+
+class _WaitTimer:
+    __slots__ = ("lock", "checkouts", "waits", "total", "max", "database", "_histogram")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Named by the Database owning the engine
+        self.database = "unknown"
+        self._histogram = None
+
+    def record(self, elapsed: float, waited: bool):
+        metrics = current_metrics()
+        if metrics is not None:
+            histogram = self._histogram
+            if histogram is None or histogram.histogram.registry is not metrics:
+                histogram = self._histogram = metrics.pool_wait.labels(self.database)
+            histogram.observe(elapsed)
+        with self.lock:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.total += elapsed
+                if elapsed > self.max:
+                    self.max = elapsed
+
+
+class _TimedPoolMixin:
+    """
+    Records how long checkouts wait for a connection when the pool is exhausted.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_timer = _WaitTimer()
+
+    def _do_get(self):
+        exhausted = self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_timer.record(time.perf_counter() - start, exhausted)
+
+    def stats(self) -> PoolStats:
+        timer = self.wait_timer
+        return PoolStats(
+            size=self.size(),
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=max(self.overflow(), 0),
+            checkouts=timer.checkouts,
+            waits=timer.waits,
+            wait_time_total=timer.total,
+            wait_time_max=timer.max,
+        )
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _named(engine: Any, name: str) -> Any:
+    # Labels the pool wait metrics of the engine
+    timer = getattr(engine.pool, "wait_timer", None)
+    if timer is not None:
+        timer.database = name
+    return engine
+
+
+class DatabaseConfig:
+    """
+    Settings of one database. Only one URL is needed: the async URL is derived
+    from the sync one (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg, ...)
+    and the other way around. statement_cache_size maps to SQLAlchemy's compiled cache.
+
+    Read-only transactions are served by `replicas` (URLs or configs), chosen by
+    `replica_selection`; `read_your_writes` is the number of seconds a session or
+    request stays on the primary after writing. journal_mode sets SQLite's journal
+    mode (e.g. "wal") on every new connection.
+    """
+    def __init__(
+        self,
+        url: Union[str, URL],
+        async_url: Optional[Union[str, URL]] = None,
+        pool: Optional[PoolOptions] = None,
+        echo: bool = False,
+        connect_args: Optional[Dict[str, Any]] = None,
+        statement_cache_size: int = 500,
+        replicas: Optional[Sequence[Union[str, URL, "DatabaseConfig"]]] = None,
+        replica_selection: str = ReplicaSelection.ROUND_ROBIN,
+        read_your_writes: float = 0.0,
+        journal_mode: Optional[str] = None,
+        **engine_options: Any,
+    ):
+        if replica_selection not in ReplicaSelection.ALL:
+            raise ValueError(f"Unknown replica selection '{replica_selection}'. Expected one of {', '.join(ReplicaSelection.ALL)}.")
+        url = make_url(url)
+        if url.get_driver_name() == _ASYNC_DRIVERS.get(url.get_backend_name()):
+            async_url, url = url, _with_driver(url, _SYNC_DRIVERS)
+        self.url = url
+        self.async_url = make_url(async_url) if async_url is not None else _with_driver(url, _ASYNC_DRIVERS)
+        self.pool = pool or PoolOptions()
+        self.echo = echo
+        self.connect_args = dict(connect_args or {})
+        if url.get_backend_name() == "sqlite":
+            self.connect_args.setdefault("check_same_thread", False)
+        self.statement_cache_size = statement_cache_size
+        self.journal_mode = journal_mode
+        self.engine_options = engine_options
+        self.replica_selection = replica_selection
+        self.read_your_writes = read_your_writes
+        # Replicas share the pool and connection settings of the primary
+        self.replicas: List[DatabaseConfig] = [
+            replica if isinstance(replica, DatabaseConfig) else DatabaseConfig(
+                replica,
+                pool=self.pool,
+                echo=echo,
+                connect_args=connect_args,
+                statement_cache_size=statement_cache_size,
+                journal_mode=journal_mode,
+                **engine_options,
+            )
+            for replica in replicas or ()
+        ]
+
+    def engine_kwargs(self, url: URL, poolclass: type) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "echo": self.echo,
+            "connect_args": self.connect_args,
+            "query_cache_size": self.statement_cache_size,
+        }
+        if not _is_memory(url):
+            # In-memory SQLite keeps its single shared connection pool
+            kwargs["poolclass"] = poolclass
+            kwargs.update(self.pool.engine_options())
+        kwargs.update(self.engine_options)
+        return kwargs
+
+    def configure_engine(self, engine: Engine):
+        if self.journal_mode is None or self.url.get_backend_name() != "sqlite":
+            return
+
+        @event.listens_for(engine, "connect")
+        def set_journal_mode(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            cursor.close()
+
+    def create_engine(self) -> Engine:
+        engine = create_engine(self.url, **self.engine_kwargs(self.url, TimedQueuePool))
+        self.configure_engine(engine)
+        return engine
+
+    def create_async_engine(self) -> AsyncEngine:
+        engine = create_async_engine(self.async_url, **self.engine_kwargs(self.async_url, TimedAsyncQueuePool))
+        self.configure_engine(engine.sync_engine)
+        return engine
+
+
+class Database:
+    """
+    One configured database. Engines and session factories are created on first use,
+    so importing or configuring a database never opens a connection.
+    """
+    def __init__(self, config: DatabaseConfig, name: str = "default"):
+        self.config = config
+        self.name = name
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._async_engine: Optional[AsyncEngine] = None
+        self._session_factory: Optional[sessionmaker] = None
+        self._async_session_factory: Optional[async_sessionmaker] = None
+        self._replica_engines: Optional[List[Engine]] = None
+        self._async_replica_engines: Optional[List[AsyncEngine]] = None
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = _named(self.config.create_engine(), self.name)
+        return self._engine
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    self._async_engine = _named(self.config.create_async_engine(), self.name)
+        return self._async_engine
+
+    @property
+    def replica_engines(self) -> List[Engine]:
+        if self._replica_engines is None:
+            with self._lock:
+                if self._replica_engines is None:
+                    self._replica_engines = [
+                        _named(replica.create_engine(), f"{self.name}-replica{index}") for index, replica in enumerate(self.config.replicas)
+                    ]
+        return self._replica_engines
+
+    @property
+    def async_replica_engines(self) -> List[AsyncEngine]:
+        if self._async_replica_engines is None:
+            with self._lock:
+                if self._async_replica_engines is None:
+                    self._async_replica_engines = [
+                        _named(replica.create_async_engine(), f"{self.name}-replica{index}") for index, replica in enumerate(self.config.replicas)
+                    ]
+        return self._async_replica_engines
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        if self._session_factory is None:
+            options: Dict[str, Any] = {"class_": Session}
+            if self.config.replicas:
+                options = {"class_": RoutingSession, "router": self._router(lambda: self.replica_engines)}
+            self._session_factory = sessionmaker(
+                bind=self.engine,
+                expire_on_commit=False,
+                autoflush=False,
+                **options,
+            )
+        return self._session_factory
+
+    @property
+    def async_session_factory(self) -> async_sessionmaker:
+        if self._async_session_factory is None:
+            options: Dict[str, Any] = {}
+            if self.config.replicas:
+                # AsyncSession routes through its underlying sync session
+                replicas = lambda: [engine.sync_engine for engine in self.async_replica_engines]
+                options = {"sync_session_class": RoutingSession, "router": self._router(replicas)}
+            self._async_session_factory = async_sessionmaker(
+                bind=self.async_engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autoflush=False,
+                **options,
+            )
+        return self._async_session_factory
+
+    def _router(self, replicas) -> ReplicaRouter:
+        return ReplicaRouter(replicas, self.config.replica_selection, self.config.read_your_writes)
+
+    def session(self) -> Session:
+        return self.session_factory()
+
+    def async_session(self) -> AsyncSession:
+        return self.async_session_factory()
+
+    def pool_stats(self) -> Dict[str, PoolStats]:
+        """
+        Pool statistics of the engines created so far, keyed by "sync" and "async".
+        """
+        stats = {}
+        if self._engine is not None and isinstance(self._engine.pool, _TimedPoolMixin):
+            stats["sync"] = self._engine.pool.stats()
+        if self._async_engine is not None and isinstance(self._async_engine.pool, _TimedPoolMixin):
+            stats["async"] = self._async_engine.pool.stats()
+        for index, engine in enumerate(self._replica_engines or ()):
+            if isinstance(engine.pool, _TimedPoolMixin):
+                stats[f"replica{index}"] = engine.pool.stats()
+        for index, engine in enumerate(self._async_replica_engines or ()):
+            if isinstance(engine.pool, _TimedPoolMixin):
+                stats[f"async_replica{index}"] = engine.pool.stats()
+        return stats
+
+    async def dispose(self):
+        for engine in [self._engine, *(self._replica_engines or ())]:
+            if engine is not None:
+                engine.dispose()
+        for async_engine in [self._async_engine, *(self._async_replica_engines or ())]:
+            if async_engine is not None:
+                await async_engine.dispose()
+
+    def after_fork(self):
+        """
+        Drops the pooled connections inherited from the parent process without
+        closing them, since the parent still owns them. New ones are opened on demand.
+        """
+        for engine in [self._engine, *(self._replica_engines or ())]:
+            if engine is not None:
+                engine.dispose(close=False)
+        for async_engine in [self._async_engine, *(self._async_replica_engines or ())]:
+            if async_engine is not None:
+                async_engine.sync_engine.dispose(close=False)
+
+    def __repr__(self) -> str:
+        return f"Database({self.name}, {self.config.url.render_as_string(hide_password=True)})"
+
+
+class DatabaseManager:
+    """
+    Holds the named databases of an application and disposes their engines at shutdown.
+    """
+    # Installed by the factory: read-your-writes pinning spans a whole request,
+    # and ambient sessions (SessionContext) are opened and closed per request
+    __middleware__ = (RequestContextMiddleware, SessionScopeMiddleware)
+
+    def __init__(self, configs: Dict[str, DatabaseConfig]):
+        if not configs:
+            raise ValueError("At least one database must be configured.")
+        self.databases: Dict[str, Database] = {name: Database(config, name) for name, config in configs.items()}
+
+    @property
+    def default(self) -> Database:
+        # The database named "default", or the first configured one
+        return self.databases.get("default") or next(iter(self.databases.values()))
+
+    def get(self, name: Optional[str] = None) -> Database:
+        if name is None:
+            return self.default
+        try:
+            return self.databases[name]
+        except KeyError:
+            raise ValueError(f"Unknown database '{name}'. Configured: {', '.join(self.databases)}.") from None
+
+    def pool_stats(self) -> Dict[str, Dict[str, PoolStats]]:
+        return {name: database.pool_stats() for name, database in self.databases.items()}
+
+    def on_worker_start(self):
+        for database in self.databases.values():
+            database.after_fork()
+
+    async def on_application_shutdown(self):
+        for database in self.databases.values():
+            await database.dispose()
+
+
+DEFAULT_DATABASE_URL = "sqlite:///./test.db"
+
+# The default database of each application, bound by DatabaseModule
+DEFAULT_DATABASE = ApplicationBinding("default_database")
+
+
+def default_database() -> Database:
+    """
+    The database used by get_db/get_sync_db: the one DatabaseModule configured for
+    the current application, or set_default_database's, created on first use otherwise.
+    """
+    database = DEFAULT_DATABASE.get()
+    if database is None:
+        database = Database(DatabaseConfig(DEFAULT_DATABASE_URL))
+        DEFAULT_DATABASE.set(database)
+    return database
+
+
+def set_default_database(database: Optional[Database]):
+    DEFAULT_DATABASE.set(database)
+
+
+def _with_driver(url: URL, drivers: Dict[str, str]) -> URL:
+    backend = url.get_backend_name()
+    driver = drivers.get(backend)
+    if driver is None:
+        return url
+    return url.set(drivername=f"{backend}+{driver}")
+
+
+def _is_memory(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
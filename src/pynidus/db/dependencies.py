@@ -1,19 +1,29 @@
 from typing import AsyncGenerator, Generator
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .session import AsyncSessionLocal
-from .sync_session import SessionLocal
+from .database import default_database
+from .scope import current_session_scope
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for getting an async database session.
+    Inside a session scope this is the scope's session, closed with the scope.
     """
-    async with AsyncSessionLocal() as session:
+    scope = current_session_scope()
+    if scope is not None:
+        yield scope.async_session(default_database())
+        return
+    async with default_database().async_session_factory() as session:
         yield session
 
 def get_sync_db() -> Generator[Session, None, None]:
     """
     Dependency for getting a synchronous database session.
+    Inside a session scope this is the scope's session, closed with the scope.
     """
-    with SessionLocal() as session:
+    scope = current_session_scope()
+    if scope is not None:
+        yield scope.session(default_database())
+        return
+    with default_database().session_factory() as session:
         yield session
@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Optional, Type, Union
+import functools
+from pynidus.core.module import Module
+from pynidus.core.provider import Provider
+from pynidus.db.context import AsyncSessionContext, SessionContext
+from pynidus.db.base import Base
+from pynidus.db.database import DEFAULT_DATABASE, Database, DatabaseConfig, DatabaseManager, PoolOptions
+from pynidus.db.repository import AsyncRepository, Repository
+from pynidus.db.transaction_manager import AsyncSQLAlchemyTransactionManager, SQLAlchemyTransactionManager
+
+
+class DatabaseModule:
+    @staticmethod
+    def for_root(
+        url: Optional[str] = None,
+        pool: Optional[PoolOptions] = None,
+        databases: Optional[Dict[str, Union[str, DatabaseConfig]]] = None,
+        **options: Any,
+    ) -> Type[Any]:
+        """
+        Builds a module providing DatabaseManager and Database (the default database),
+        plus SessionContext/AsyncSessionContext and transaction managers working on the
+        session of the current request, which singleton services can share safely.
+        Engines are created lazily on first use and disposed at application shutdown.
+
+            DatabaseModule.for_root(url="postgresql://...", pool=PoolOptions(size=20))
+            DatabaseModule.for_root(databases={"default": "sqlite:///app.db", "analytics": "sqlite:///stats.db"})
+
+        The default database also backs get_db, get_sync_db and for_feature repositories,
+        within the requests of the application (see ApplicationBinding).
+        """
+        configs: Dict[str, DatabaseConfig] = {}
+        if url is not None:
+            configs["default"] = DatabaseConfig(url, pool=pool, **options)
+        for name, config in (databases or {}).items():
+            if name in configs:
+                raise ValueError(f"Database '{name}' is configured twice.")
+            configs[name] = config if isinstance(config, DatabaseConfig) else DatabaseConfig(config, pool=pool, **options)
+        if not configs:
+            raise ValueError("DatabaseModule.for_root() needs a url or databases.")
+
+        @Module(
+            providers=[
+                Provider(DatabaseManager, use_factory=lambda: DatabaseManager(configs)),
+                Provider(Database, use_factory=lambda manager: manager.default, inject=[DatabaseManager]),
+                Provider(SessionContext, use_factory=SessionContext, inject=[Database]),
+                Provider(AsyncSessionContext, use_factory=AsyncSessionContext, inject=[Database]),
+                Provider(SQLAlchemyTransactionManager, use_factory=SQLAlchemyTransactionManager, inject=[SessionContext]),
+                Provider(AsyncSQLAlchemyTransactionManager, use_factory=AsyncSQLAlchemyTransactionManager, inject=[AsyncSessionContext]),
+            ],
+            exports=[
+                DatabaseManager,
+                Database,
+                SessionContext,
+                AsyncSessionContext,
+                SQLAlchemyTransactionManager,
+                AsyncSQLAlchemyTransactionManager,
+            ],
+        )
+        class ConfiguredDatabaseModule:
+            # Bound when the module is registered, for the application importing it
+            __bindings__ = {DEFAULT_DATABASE: Database}
+
+        return ConfiguredDatabaseModule
+
+    @staticmethod
+    def for_feature(models: List[Type[Base]]) -> Type[Any]:
+        """
+        Builds a module providing Repository[Model] and AsyncRepository[Model] for each
+        model, working on the session of the current request (default database).
+
+            def __init__(self, users: Repository[User]): ...
+        """
+        providers = []
+        for model in models:
+            providers.append(Provider(Repository[model], use_factory=functools.partial(Repository, SessionContext(), model)))
+            providers.append(Provider(AsyncRepository[model], use_factory=functools.partial(AsyncRepository, AsyncSessionContext(), model)))
+
+        @Module(providers=providers, exports=[provider.provide for provider in providers])
+        class FeatureDatabaseModule:
+            pass
+
+        return FeatureDatabaseModule
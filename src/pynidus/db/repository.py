@@ -0,0 +1,259 @@
+from typing import Any, AsyncIterator, Dict, Generic, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar, Union
+from sqlalchemy import Column, Select, insert, inspect, select, tuple_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from .base import Base
+from .context import AsyncSessionContext, SessionContext
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+
+class KeysetPage(Generic[ModelT]):
+    """
+    One page of a keyset pagination. Pass next_key as `after` to get the next page;
+    it is None on the last page.
+    """
+    __slots__ = ("items", "next_key")
+
+    def __init__(self, items: List[ModelT], next_key: Optional[Tuple[Any, ...]]):
+        self.items = items
+        self.next_key = next_key
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class _BaseRepository(Generic[ModelT]):
+    model: Type[ModelT]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # class UserRepository(Repository[User]) binds the model
+        for base in getattr(cls, "__orig_bases__", ()):
+            for argument in getattr(base, "__args__", ()):
+                if isinstance(argument, type) and issubclass(argument, Base):
+                    cls.model = argument
+
+    def __init__(self, session: Any, model: Optional[Type[ModelT]] = None):
+        if model is not None:
+            self.model = model
+        if getattr(self, "model", None) is None:
+            raise ValueError(f"{type(self).__name__} needs a model: subclass {type(self).__name__}[Model] or pass model=.")
+        if isinstance(session, SessionContext):
+            self._context: Optional[SessionContext] = session
+            self._session = None
+        else:
+            self._context = None
+            self._session = session
+
+    @property
+    def session(self) -> Any:
+        return self._context.session if self._context is not None else self._session
+
+    def _key_columns(self, key: Optional[Sequence[Any]]) -> Sequence[Any]:
+        if key is not None:
+            return [getattr(self.model, column) if isinstance(column, str) else column for column in key]
+        return list(inspect(self.model).primary_key)
+
+    def _seek_query(self, query: Optional[Select], after: Optional[Tuple[Any, ...]], limit: int, key: Optional[Sequence[Any]], descending: bool) -> Tuple[Select, Sequence[Any]]:
+        columns = self._key_columns(key)
+        query = query if query is not None else select(self.model)
+        if after is not None:
+            if not isinstance(after, tuple):
+                after = (after,)
+            left = columns[0] if len(columns) == 1 else tuple_(*columns)
+            right = after[0] if len(columns) == 1 else tuple_(*after)
+            query = query.where(left < right if descending else left > right)
+        order = [column.desc() if descending else column.asc() for column in columns]
+        # One extra row tells whether there is a next page
+        return query.order_by(*order).limit(limit + 1), columns
+
+    def _page(self, items: List[ModelT], limit: int, columns: Sequence[Any]) -> KeysetPage[ModelT]:
+        if len(items) <= limit:
+            return KeysetPage(items, None)
+        items = items[:limit]
+        last = items[-1]
+        mapper = inspect(self.model)
+        # Table columns are read through their attribute, whose name can differ (mapped_column("name", ...))
+        keys = [mapper.get_property_by_column(column).key if isinstance(column, Column) else column.key for column in columns]
+        return KeysetPage(items, tuple(getattr(last, key) for key in keys))
+
+    def _upsert_statement(self, dialect: str, rows: List[Dict[str, Any]], index_elements: Optional[Sequence[str]], update_columns: Optional[Sequence[str]]):
+        mapper = inspect(self.model)
+        keys = list(index_elements or [mapper.get_property_by_column(column).key for column in mapper.primary_key])
+        updates = list(update_columns) if update_columns is not None else [name for name in rows[0] if name not in keys]
+        # Rows use attribute names; the conflict clauses need column names (mapped_column("name", ...))
+        keys = [_column_name(mapper, name) for name in keys]
+        updates = [_column_name(mapper, name) for name in updates]
+
+        if dialect in ("sqlite", "postgresql"):
+            statement = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(self.model)
+            if not updates:
+                return statement.on_conflict_do_nothing(index_elements=keys)
+            return statement.on_conflict_do_update(
+                index_elements=keys,
+                set_={name: statement.excluded[name] for name in updates},
+            )
+        if dialect in ("mysql", "mariadb"):
+            statement = mysql.insert(self.model)
+            return statement.on_duplicate_key_update({name: statement.inserted[name] for name in (updates or keys)})
+        raise ValueError(f"bulk_upsert is not supported for the {dialect} dialect.")
+
+
+def _column_name(mapper: Any, name: str) -> str:
+    return mapper.attrs[name].columns[0].name if name in mapper.attrs else name
+
+
+class Repository(_BaseRepository[ModelT]):
+    """
+    Data access for one model, on a Session or on the session of the current
+    request (SessionContext). Writes are not committed: use @Transactional.
+
+        class UserRepository(Repository[User]):
+            ...
+
+        Repository(session, model=User)
+    """
+    def get(self, identity: Any) -> Optional[ModelT]:
+        return self.session.get(self.model, identity)
+
+    def add(self, entity: ModelT) -> ModelT:
+        self.session.add(entity)
+        return entity
+
+    def delete(self, entity: ModelT):
+        self.session.delete(entity)
+
+    def bulk_insert(self, rows: Iterable[Union[Mapping[str, Any], ModelT]], batch_size: int = 1000) -> int:
+        """
+        Inserts rows (mappings or model instances) with one executemany per batch,
+        without building ORM objects or tracking them in the session.
+        Returns the number of rows inserted.
+        """
+        count = 0
+        for batch in _batches(rows, batch_size):
+            self.session.execute(insert(self.model), batch)
+            count += len(batch)
+        return count
+
+    def bulk_upsert(
+        self,
+        rows: Iterable[Union[Mapping[str, Any], ModelT]],
+        index_elements: Optional[Sequence[str]] = None,
+        update_columns: Optional[Sequence[str]] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Inserts rows, updating the existing ones that conflict on index_elements
+        (the primary key by default). update_columns defaults to every other column given.
+        Supported on SQLite, PostgreSQL and MySQL.
+        """
+        dialect = self.session.get_bind(self.model).dialect.name
+        count = 0
+        for batch in _batches(rows, batch_size):
+            self.session.execute(self._upsert_statement(dialect, batch, index_elements, update_columns), batch)
+            count += len(batch)
+        return count
+
+    def stream(self, query: Optional[Select] = None, chunk: int = 1000) -> Iterator[ModelT]:
+        """
+        Iterates over the results, fetching `chunk` rows at a time (yield_per),
+        so large tables are never fully loaded in memory.
+        """
+        query = query if query is not None else select(self.model)
+        yield from self.session.scalars(query.execution_options(yield_per=chunk))
+
+    def seek(
+        self,
+        limit: int = 100,
+        after: Optional[Tuple[Any, ...]] = None,
+        key: Optional[Sequence[Any]] = None,
+        descending: bool = False,
+        query: Optional[Select] = None,
+    ) -> KeysetPage[ModelT]:
+        """
+        Keyset pagination: rows strictly after `after` in `key` order (the primary key
+        by default). Unlike OFFSET, the cost of a page does not grow with its position.
+        """
+        statement, columns = self._seek_query(query, after, limit, key, descending)
+        return self._page(list(self.session.scalars(statement)), limit, columns)
+
+
+class AsyncRepository(_BaseRepository[ModelT]):
+    """
+    Async counterpart of Repository, on an AsyncSession or an AsyncSessionContext.
+    """
+    async def get(self, identity: Any) -> Optional[ModelT]:
+        return await self.session.get(self.model, identity)
+
+    def add(self, entity: ModelT) -> ModelT:
+        self.session.add(entity)
+        return entity
+
+    async def delete(self, entity: ModelT):
+        await self.session.delete(entity)
+
+    async def bulk_insert(self, rows: Iterable[Union[Mapping[str, Any], ModelT]], batch_size: int = 1000) -> int:
+        count = 0
+        for batch in _batches(rows, batch_size):
+            await self.session.execute(insert(self.model), batch)
+            count += len(batch)
+        return count
+
+    async def bulk_upsert(
+        self,
+        rows: Iterable[Union[Mapping[str, Any], ModelT]],
+        index_elements: Optional[Sequence[str]] = None,
+        update_columns: Optional[Sequence[str]] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        session: AsyncSession = self.session
+        dialect = session.sync_session.get_bind(self.model).dialect.name
+        count = 0
+        for batch in _batches(rows, batch_size):
+            await session.execute(self._upsert_statement(dialect, batch, index_elements, update_columns), batch)
+            count += len(batch)
+        return count
+
+    async def stream(self, query: Optional[Select] = None, chunk: int = 1000) -> AsyncIterator[ModelT]:
+        """
+        Iterates over the results with a server-side cursor (stream_scalars),
+        fetching `chunk` rows at a time.
+        """
+        query = query if query is not None else select(self.model)
+        result = await self.session.stream_scalars(query.execution_options(yield_per=chunk))
+        async for entity in result:
+            yield entity
+
+    async def seek(
+        self,
+        limit: int = 100,
+        after: Optional[Tuple[Any, ...]] = None,
+        key: Optional[Sequence[Any]] = None,
+        descending: bool = False,
+        query: Optional[Select] = None,
+    ) -> KeysetPage[ModelT]:
+        statement, columns = self._seek_query(query, after, limit, key, descending)
+        return self._page(list(await self.session.scalars(statement)), limit, columns)
+
+
+def _batches(rows: Iterable[Union[Mapping[str, Any], Base]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(_as_row(row))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _as_row(row: Union[Mapping[str, Any], Base]) -> Dict[str, Any]:
+    if isinstance(row, Base):
+        # Column attributes that were set on the instance
+        state = inspect(row)
+        return {attribute.key: state.dict[attribute.key] for attribute in state.mapper.column_attrs if attribute.key in state.dict}
+    return dict(row)
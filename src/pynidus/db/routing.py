@@ -0,0 +1,103 @@
+from typing import Any, Callable, Optional, Sequence
+import itertools
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from pynidus.core.scope import current_request_context
+
+# Keys in Session.info
+READ_ONLY = "pynidus.read_only"
+_WROTE = "pynidus.wrote"
+_LAST_WRITE = "pynidus.last_write"
+_REPLICA = "pynidus.replica"
+
+
+class ReplicaSelection:
+    ROUND_ROBIN = "round_robin"
+    LEAST_CONNECTIONS = "least_connections"
+
+    ALL = (ROUND_ROBIN, LEAST_CONNECTIONS)
+
+
+class ReplicaRouter:
+    """
+    Chooses the engine serving read-only transactions.
+    A session (and, inside an HTTP request, the whole request) that wrote less than
+    read_your_writes seconds ago stays on the primary, so it reads its own writes.
+    """
+    def __init__(
+        self,
+        replicas: Callable[[], Sequence[Engine]],
+        selection: str = ReplicaSelection.ROUND_ROBIN,
+        read_your_writes: float = 0.0,
+    ):
+        if selection not in ReplicaSelection.ALL:
+            raise ValueError(f"Unknown replica selection '{selection}'. Expected one of {', '.join(ReplicaSelection.ALL)}.")
+        self._replicas = replicas
+        self.selection = selection
+        self.read_your_writes = read_your_writes
+        self._counter = itertools.count()
+
+    def replica(self) -> Engine:
+        engines = self._replicas()
+        if self.selection == ReplicaSelection.LEAST_CONNECTIONS:
+            return min(engines, key=_checked_out)
+        return engines[next(self._counter) % len(engines)]
+
+    def record_write(self, session: Session):
+        now = time.monotonic()
+        session.info[_WROTE] = True
+        session.info[_LAST_WRITE] = now
+        context = current_request_context()
+        if context is not None:
+            context.items[_LAST_WRITE] = now
+
+    def pinned(self, session: Session) -> bool:
+        if session.info.get(_WROTE):
+            # Uncommitted writes of this transaction are only visible on the primary
+            return True
+        if not self.read_your_writes:
+            return False
+        last_write = session.info.get(_LAST_WRITE)
+        context = current_request_context()
+        if context is not None:
+            last_write = max(last_write or 0.0, context.items.get(_LAST_WRITE, 0.0))
+        return last_write is not None and time.monotonic() - last_write < self.read_your_writes
+
+
+class RoutingSession(Session):
+    """
+    Session sending read-only transactions (Session.info[READ_ONLY]) to a replica.
+    The replica is chosen once per transaction, so all its reads see one snapshot.
+    Flushes and DML statements always go to the primary.
+    """
+    def __init__(self, *args: Any, router: Optional[ReplicaRouter] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        router = self.router
+        if router is not None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                router.record_write(self)
+            elif self.info.get(READ_ONLY) and not router.pinned(self):
+                replica = self.info.get(_REPLICA)
+                if replica is None:
+                    replica = self.info[_REPLICA] = router.replica()
+                return replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_transaction_state(session: Session, transaction):
+    # Commit, rollback and close all end the transaction
+    if transaction.parent is None:
+        session.info.pop(_WROTE, None)
+        session.info.pop(_REPLICA, None)
+
+
+def _checked_out(engine: Engine) -> int:
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if checkedout is not None else 0
@@ -0,0 +1,102 @@
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+
+class SessionScope:
+    """
+    The sessions of one request or task, opened lazily (one per database)
+    and closed when the scope ends. `items` holds other per-scope state,
+    such as the transaction frames of the transaction managers.
+    """
+    __slots__ = ("sessions", "items")
+
+    def __init__(self):
+        self.sessions: Dict[Tuple[Any, bool], Any] = {}
+        self.items: Dict[Any, Any] = {}
+
+    def session(self, database: Any):
+        session = self.sessions.get((database, False))
+        if session is None:
+            session = self.sessions[(database, False)] = database.session()
+        return session
+
+    def async_session(self, database: Any):
+        session = self.sessions.get((database, True))
+        if session is None:
+            session = self.sessions[(database, True)] = database.async_session()
+        return session
+
+    def close(self):
+        sessions, self.sessions = self.sessions, {}
+        self.items.clear()
+        for (_, is_async), session in sessions.items():
+            if is_async:
+                raise RuntimeError("Async sessions must be closed with aclose() (use 'async with session_scope()').")
+            session.close()
+
+    async def aclose(self):
+        sessions, self.sessions = self.sessions, {}
+        self.items.clear()
+        for (_, is_async), session in sessions.items():
+            if is_async:
+                await session.close()
+            else:
+                session.close()
+
+
+_current_scope: ContextVar[Optional[SessionScope]] = ContextVar("pynidus_session_scope", default=None)
+
+
+def current_session_scope() -> Optional[SessionScope]:
+    return _current_scope.get()
+
+
+class session_scope:
+    """
+    Opens a session scope for a block of work outside of a request (jobs, tasks):
+
+        async with session_scope():
+            await service.run()
+
+    Tasks started inside a request share its scope; a task running concurrently
+    with the request should open its own.
+    """
+    __slots__ = ("scope", "_token")
+
+    def __enter__(self) -> SessionScope:
+        self.scope = SessionScope()
+        self._token = _current_scope.set(self.scope)
+        return self.scope
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            self.scope.close()
+        finally:
+            _current_scope.reset(self._token)
+        return False
+
+    async def __aenter__(self) -> SessionScope:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        try:
+            await self.scope.aclose()
+        finally:
+            _current_scope.reset(self._token)
+        return False
+
+
+class SessionScopeMiddleware:
+    """
+    Opens a session scope per request and closes its sessions when the response is done.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        async with session_scope():
+            await self.app(scope, receive, send)
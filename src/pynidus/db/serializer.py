@@ -0,0 +1,197 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+import collections.abc
+import datetime
+import decimal
+import enum
+import functools
+import inspect
+import json
+import types
+import typing
+import uuid
+from fastapi.encoders import decimal_encoder, jsonable_encoder
+from sqlalchemy import inspect as sqlalchemy_inspect
+from sqlalchemy.orm import Mapper
+from starlette.responses import Response
+
+# Expressions converting a non-None value, matching FastAPI's jsonable_encoder
+_CONVERTERS: Tuple[Tuple[type, str], ...] = (
+    (bool, "{}"),
+    (enum.Enum, "{}.value"),
+    (int, "{}"),
+    (float, "{}"),
+    (str, "{}"),
+    (datetime.datetime, "{}.isoformat()"),
+    (datetime.date, "{}.isoformat()"),
+    (datetime.time, "{}.isoformat()"),
+    (datetime.timedelta, "{}.total_seconds()"),
+    (decimal.Decimal, "_decimal({})"),
+    (uuid.UUID, "str({})"),
+    (bytes, "{}.decode()"),
+)
+
+
+def _mapper(model: Any) -> Optional[Mapper]:
+    if not isinstance(model, type):
+        return None
+    mapper = sqlalchemy_inspect(model, raiseerr=False)
+    return mapper if isinstance(mapper, Mapper) else None
+
+
+def _converter(column: Any) -> Optional[str]:
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+    for kind, expression in _CONVERTERS:
+        if issubclass(python_type, kind):
+            return expression
+    return None
+
+
+class EntitySerializer:
+    """
+    Serializer of one mapped class, generated once from its mapper: a single function
+    reading each column attribute and converting it inline, instead of reflecting on
+    every object like jsonable_encoder. relationships lists the relationships to
+    include, with dotted paths for nested ones ("author", "comments.author").
+    """
+    def __init__(self, model: Type[Any], relationships: Sequence[str] = (), exclude: Sequence[str] = ()):
+        mapper = _mapper(model)
+        if mapper is None:
+            raise ValueError(f"{model!r} is not a mapped class.")
+        self.model = model
+        self.relationships = tuple(relationships)
+        self.exclude = tuple(exclude)
+        self.serialize: Callable[[Any], Dict[str, Any]] = self._compile(mapper)
+
+    def _compile(self, mapper: Mapper) -> Callable[[Any], Dict[str, Any]]:
+        namespace: Dict[str, Any] = {"_decimal": decimal_encoder, "_encode": jsonable_encoder}
+        fields: List[str] = []
+        for attribute in mapper.column_attrs:
+            if attribute.key in self.exclude:
+                continue
+            column = attribute.columns[0]
+            expression = _converter(column)
+            if expression is None:
+                # JSON, arrays and custom types: the generic encoder
+                fields.append(f"{attribute.key!r}: _encode(entity.{attribute.key})")
+            elif expression == "{}":
+                fields.append(f"{attribute.key!r}: entity.{attribute.key}")
+            else:
+                fields.append(f"{attribute.key!r}: (None if (value := entity.{attribute.key}) is None else {expression.format('value')})")
+
+        nested: Dict[str, List[str]] = {}
+        for path in self.relationships:
+            name, _, rest = path.partition(".")
+            nested.setdefault(name, [])
+            if rest:
+                nested[name].append(rest)
+        for name, paths in nested.items():
+            relationship = mapper.relationships.get(name)
+            if relationship is None:
+                raise ValueError(f"{self.model.__name__} has no relationship '{name}'.")
+            namespace[f"_{name}"] = compile_serializer(relationship.mapper.class_, paths).serialize
+            if relationship.uselist:
+                fields.append(f"{name!r}: [_{name}(item) for item in entity.{name}]")
+            else:
+                fields.append(f"{name!r}: (None if (value := entity.{name}) is None else _{name}(value))")
+
+        source = "def serialize(entity):\n    return {" + ", ".join(fields) + "}\n"
+        exec(compile(source, f"<serializer {self.model.__qualname__}>", "exec"), namespace)
+        return namespace["serialize"]
+
+    def __call__(self, entity: Any) -> Dict[str, Any]:
+        return self.serialize(entity)
+
+    def many(self, entities: Iterable[Any]) -> List[Dict[str, Any]]:
+        serialize = self.serialize
+        return [serialize(entity) for entity in entities]
+
+    def encode(self, value: Any) -> bytes:
+        """
+        JSON bytes of an entity, an iterable of entities or None, with the
+        options of FastAPI's JSONResponse.
+        """
+        if value is None:
+            data = None
+        elif isinstance(value, self.model):
+            data = self.serialize(value)
+        else:
+            data = self.many(value)
+        return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"EntitySerializer({self.model.__name__})"
+
+
+_serializers: Dict[Tuple[Type[Any], Tuple[str, ...], Tuple[str, ...]], EntitySerializer] = {}
+
+
+def compile_serializer(model: Type[Any], relationships: Sequence[str] = (), exclude: Sequence[str] = ()) -> EntitySerializer:
+    """
+    Returns the serializer of a mapped class, compiled on first use.
+    """
+    key = (model, tuple(relationships), tuple(exclude))
+    serializer = _serializers.get(key)
+    if serializer is None:
+        serializer = _serializers[key] = EntitySerializer(model, relationships, exclude)
+    return serializer
+
+
+def route_serializer(function: Callable[..., Any], serialize: Any = None) -> Optional[EntitySerializer]:
+    """
+    The serializer of a route: given with @Get(..., serialize=Model or serializer), or
+    found in a return annotation such as -> User, -> List[User] or -> Optional[User].
+    """
+    if isinstance(serialize, EntitySerializer):
+        return serialize
+    if serialize is not None:
+        return compile_serializer(serialize)
+    if "return" not in getattr(function, "__annotations__", {}):
+        return None
+    try:
+        annotation = typing.get_type_hints(function).get("return")
+    except Exception:
+        return None
+    model = _annotated_model(annotation)
+    return compile_serializer(model) if model is not None else None
+
+
+def _annotated_model(annotation: Any) -> Optional[Type[Any]]:
+    if annotation is None:
+        return None
+    if _mapper(annotation) is not None:
+        return annotation
+    origin = typing.get_origin(annotation)
+    arguments = [argument for argument in typing.get_args(annotation) if argument is not type(None)]
+    if origin in (Union, types.UnionType) and len(arguments) == 1:
+        return _annotated_model(arguments[0])
+    if isinstance(origin, type) and issubclass(origin, collections.abc.Iterable) and len(arguments) >= 1:
+        if _mapper(arguments[0]) is not None and (len(arguments) == 1 or arguments[1] is Ellipsis):
+            return arguments[0]
+    return None
+
+
+def serializing_endpoint(endpoint: Callable[..., Any], signature: inspect.Signature, serializer: EntitySerializer) -> Callable[..., Any]:
+    """
+    Wraps an endpoint so that its entities are encoded by the serializer into
+    a ready JSON response. Sync endpoints stay sync and keep running in a thread.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        async def serialized(**kwargs):
+            result = await endpoint(**kwargs)
+            if isinstance(result, Response):
+                return result
+            return Response(serializer.encode(result), media_type="application/json")
+    else:
+        def serialized(**kwargs):
+            result = endpoint(**kwargs)
+            if isinstance(result, Response):
+                return result
+            return Response(serializer.encode(result), media_type="application/json")
+
+    functools.update_wrapper(serialized, endpoint)
+    serialized.__dict__.pop("__wrapped__", None)
+    serialized.__signature__ = signature.replace(return_annotation=inspect.Signature.empty)
+    return serialized
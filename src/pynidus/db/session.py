@@ -1,18 +1,14 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from .database import DEFAULT_DATABASE_URL, DatabaseConfig, default_database
 
-# Default to in-memory SQLite for simplicity if no URL is provided, 
-# but typically this would come from configuration.
-DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+# The database used when none is configured, through its async driver;
+# typically the database comes from DatabaseModule.for_root().
+DATABASE_URL = DatabaseConfig(DEFAULT_DATABASE_URL).async_url.render_as_string(hide_password=False)
 
-engine = create_async_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Needed for SQLite
-    echo=False,
-)
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-)
+def __getattr__(name: str):
+    # The engine is only created when first used, never at import time
+    if name == "engine":
+        return default_database().async_engine
+    if name == "AsyncSessionLocal":
+        return default_database().async_session_factory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
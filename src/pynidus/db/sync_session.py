@@ -1,18 +1,13 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from .database import DEFAULT_DATABASE_URL, default_database
 
-# Default to in-memory SQLite for simplicity if no URL is provided
-DATABASE_URL = "sqlite:///./test.db"
+# The database used when none is configured
+DATABASE_URL = DEFAULT_DATABASE_URL
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Needed for SQLite
-    echo=False,
-)
 
-SessionLocal = sessionmaker(
-    bind=engine,
-    class_=Session,
-    expire_on_commit=False,
-    autoflush=False,
-)
+def __getattr__(name: str):
+    # The engine is only created when first used, never at import time
+    if name == "engine":
+        return default_database().engine
+    if name == "SessionLocal":
+        return default_database().session_factory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,31 +1,257 @@
-from typing import Any
+from typing import Any, Callable, List, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from pynidus.common.decorators.transactional import Propagation
+from .context import AsyncSessionContext, SessionContext
+from .routing import READ_ONLY
 
-class SQLAlchemyTransactionManager:
-    def __init__(self, session: Session):
+class UnexpectedRollbackError(RuntimeError):
+    """
+    Raised when an outer transaction commits after a joined inner call rolled back.
+    """
+
+class _Frame:
+    """
+    What begin() did, so that the matching commit()/rollback() undoes exactly that.
+    """
+    __slots__ = ("kind", "session", "savepoint", "root", "rollback_only")
+
+    # Started (or adopted) the real transaction: commit/rollback it
+    OWNER = "owner"
+    # Joined the enclosing transaction: commit is a no-op
+    JOINED = "joined"
+    # SAVEPOINT inside the enclosing transaction
+    NESTED = "nested"
+    # Independent transaction on a new session (REQUIRES_NEW)
+    NEW = "new"
+    # SUPPORTS without an enclosing transaction
+    NONE = "none"
+
+    def __init__(self, kind: str, session: Any, savepoint: Any = None, root: Optional["_Frame"] = None):
+        self.kind = kind
         self.session = session
+        self.savepoint = savepoint
+        # The frame owning the real transaction, marked rollback-only by joined frames
+        self.root = root
+        self.rollback_only = False
+
+class _FrameStack:
+    def __init__(self, session: Any, session_factory: Optional[Callable[[], Any]]):
+        self.base_session = session
+        self.session_factory = session_factory
+        self.frames: List[_Frame] = []
+
+    @property
+    def session(self) -> Any:
+        # The session of the innermost transaction (REQUIRES_NEW swaps it)
+        for frame in reversed(self.frames):
+            if frame.kind in (_Frame.OWNER, _Frame.NEW):
+                return frame.session
+        return self.base_session
+
+    def active(self) -> Optional[_Frame]:
+        for frame in reversed(self.frames):
+            if frame.kind in (_Frame.OWNER, _Frame.NEW):
+                return frame
+        return None
+
+    def plan(self, propagation: str) -> str:
+        if propagation not in Propagation.ALL:
+            raise ValueError(f"Unknown propagation '{propagation}'. Expected one of {', '.join(Propagation.ALL)}.")
+        active = self.active()
+        if active is None:
+            if propagation == Propagation.SUPPORTS:
+                return _Frame.NONE
+            if propagation == Propagation.REQUIRES_NEW and self.frames:
+                return _Frame.NEW
+            return _Frame.OWNER
+        if propagation == Propagation.REQUIRES_NEW:
+            return _Frame.NEW
+        if propagation == Propagation.NESTED:
+            return _Frame.NESTED
+        return _Frame.JOINED
+
+    def new_session(self) -> Any:
+        if self.session_factory is None:
+            raise ValueError("REQUIRES_NEW propagation needs a transaction manager created with a session_factory.")
+        return self.session_factory()
+
+class _BaseTransactionManager:
+    def __init__(self, session: Any, session_factory: Optional[Callable[[], Any]] = None):
+        if isinstance(session, SessionContext):
+            # The frames live in the current session scope, not in the manager
+            self._context: Optional[SessionContext] = session
+            self._own_stack: Optional[_FrameStack] = None
+        else:
+            self._context = None
+            self._own_stack = _FrameStack(session, session_factory)
+        self._session_factory = session_factory
+
+    @property
+    def _stack(self) -> _FrameStack:
+        stack = self._own_stack
+        if stack is not None:
+            return stack
+        context = self._context
+        items = context.scope().items
+        stack = items.get(self)
+        if stack is None:
+            stack = items[self] = _FrameStack(context.session, self._session_factory or context.session_factory)
+        return stack
+
+    @property
+    def session(self) -> Any:
+        return self._stack.session
 
-    def begin(self) -> None:
-        if not self.session.in_transaction():
-            self.session.begin()
+    def in_transaction(self) -> bool:
+        """
+        True while a @Transactional call managed by this manager is running.
+        """
+        return self._stack.active() is not None
+
+class SQLAlchemyTransactionManager(_BaseTransactionManager):
+    """
+    Transaction manager for a Session, supporting nested @Transactional calls:
+
+    - REQUIRED joins the enclosing transaction; only the outermost call commits.
+    - REQUIRES_NEW runs on a new session from session_factory (see `session`).
+    - NESTED uses a SAVEPOINT, so a failure only rolls back the inner work.
+    - SUPPORTS joins an enclosing transaction, or runs without one.
+
+    Given a SessionContext instead of a session, the manager works on the session of
+    the current request or task, so it can be shared by singleton services.
+    """
+    def __init__(self, session: Union[Session, SessionContext], session_factory: Optional[Callable[[], Session]] = None):
+        super().__init__(session, session_factory)
+
+    @property
+    def session(self) -> Session:
+        return self._stack.session
+
+    def begin(self, read_only: bool = False, propagation: str = Propagation.REQUIRED) -> None:
+        stack = self._stack
+        kind = stack.plan(propagation)
+        session = stack.session
+        if kind == _Frame.NESTED:
+            stack.frames.append(_Frame(kind, session, session.begin_nested()))
+            return
+        if kind in (_Frame.JOINED, _Frame.NONE):
+            stack.frames.append(_Frame(kind, session, root=stack.active()))
+            return
+
+        if kind == _Frame.NEW:
+            session = stack.new_session()
+        if not session.in_transaction():
+            # Read-only transactions may be served by a replica
+            session.info[READ_ONLY] = read_only
+            session.begin()
+        stack.frames.append(_Frame(kind, session))
 
     def commit(self) -> None:
-        self.session.commit()
+        # The frame stays on the stack until the commit succeeded; after a failed
+        # commit, rollback() is expected to be called (as @Transactional does)
+        stack = self._stack
+        frame = stack.frames[-1]
+        if frame.kind == _Frame.NESTED:
+            frame.savepoint.commit()
+        elif frame.kind in (_Frame.OWNER, _Frame.NEW):
+            if frame.rollback_only:
+                raise UnexpectedRollbackError("Transaction was marked rollback-only because an inner transactional call failed.")
+            self._end(frame, commit=True)
+        stack.frames.pop()
 
     def rollback(self) -> None:
-        self.session.rollback()
+        stack = self._stack
+        if not stack.frames:
+            stack.base_session.rollback()
+            return
+        frame = stack.frames.pop()
+        if frame.kind == _Frame.NESTED:
+            frame.savepoint.rollback()
+        elif frame.kind in (_Frame.JOINED, _Frame.NONE):
+            if frame.root is not None:
+                # The enclosing transaction can no longer commit
+                frame.root.rollback_only = True
+        else:
+            self._end(frame, commit=False)
 
-class AsyncSQLAlchemyTransactionManager:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+    def _end(self, frame: _Frame, commit: bool) -> None:
+        session = frame.session
+        try:
+            if commit:
+                session.commit()
+            else:
+                session.rollback()
+        finally:
+            session.info.pop(READ_ONLY, None)
+            if frame.kind == _Frame.NEW:
+                session.close()
+
+class AsyncSQLAlchemyTransactionManager(_BaseTransactionManager):
+    """
+    Async counterpart of SQLAlchemyTransactionManager, with the same propagation rules.
+    """
+    def __init__(self, session: Union[AsyncSession, AsyncSessionContext], session_factory: Optional[Callable[[], AsyncSession]] = None):
+        super().__init__(session, session_factory)
+
+    @property
+    def session(self) -> AsyncSession:
+        return self._stack.session
 
-    async def begin(self) -> None:
-        if not self.session.in_transaction():
-            await self.session.begin()
+    async def begin(self, read_only: bool = False, propagation: str = Propagation.REQUIRED) -> None:
+        stack = self._stack
+        kind = stack.plan(propagation)
+        session = stack.session
+        if kind == _Frame.NESTED:
+            stack.frames.append(_Frame(kind, session, await session.begin_nested()))
+            return
+        if kind in (_Frame.JOINED, _Frame.NONE):
+            stack.frames.append(_Frame(kind, session, root=stack.active()))
+            return
+
+        if kind == _Frame.NEW:
+            session = stack.new_session()
+        if not session.in_transaction():
+            session.info[READ_ONLY] = read_only
+            await session.begin()
+        stack.frames.append(_Frame(kind, session))
 
     async def commit(self) -> None:
-        await self.session.commit()
+        # The frame stays on the stack until the commit succeeded; after a failed
+        # commit, rollback() is expected to be called (as @Transactional does)
+        stack = self._stack
+        frame = stack.frames[-1]
+        if frame.kind == _Frame.NESTED:
+            await frame.savepoint.commit()
+        elif frame.kind in (_Frame.OWNER, _Frame.NEW):
+            if frame.rollback_only:
+                raise UnexpectedRollbackError("Transaction was marked rollback-only because an inner transactional call failed.")
+            await self._end(frame, commit=True)
+        stack.frames.pop()
 
     async def rollback(self) -> None:
-        await self.session.rollback()
+        stack = self._stack
+        if not stack.frames:
+            await stack.base_session.rollback()
+            return
+        frame = stack.frames.pop()
+        if frame.kind == _Frame.NESTED:
+            await frame.savepoint.rollback()
+        elif frame.kind in (_Frame.JOINED, _Frame.NONE):
+            if frame.root is not None:
+                # The enclosing transaction can no longer commit
+                frame.root.rollback_only = True
+        else:
+            await self._end(frame, commit=False)
+
+    async def _end(self, frame: _Frame, commit: bool) -> None:
+        session = frame.session
+        try:
+            if commit:
+                await session.commit()
+            else:
+                await session.rollback()
+        finally:
+            session.info.pop(READ_ONLY, None)
+            if frame.kind == _Frame.NEW:
+                await session.close()
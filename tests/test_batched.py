@@ -0,0 +1,158 @@
+import asyncio
+import gc
+import weakref
+from typing import List
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from pynidus import NidusFactory, Module, Controller, Get, Injectable, Batched
+from pynidus.core.scope import RequestContext, _current_context
+from pynidus.db import AsyncSessionContext, DatabaseManager, DatabaseModule
+from pynidus.db.database import default_database, set_default_database
+
+class BatchBase(DeclarativeBase):
+    pass
+
+class Author(BatchBase):
+    __tablename__ = "authors"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+class UserService:
+    def __init__(self):
+        self.batches: List[List[int]] = []
+
+    @Batched(max_batch=3)
+    async def get_user(self, ids: List[int]):
+        self.batches.append(ids)
+        return [{"id": id} for id in ids]
+
+    @Batched(window_ms=20)
+    async def get_team(self, ids: List[int]):
+        self.batches.append(ids)
+        return {id: f"team {id}" for id in ids if id != 0}
+
+@pytest.mark.asyncio
+async def test_calls_in_the_same_tick_share_a_batch():
+    service = UserService()
+    users = await asyncio.gather(*(service.get_user(id) for id in [1, 2, 2, 1]))
+
+    assert users == [{"id": 1}, {"id": 2}, {"id": 2}, {"id": 1}]
+    assert service.batches == [[1, 2]]
+
+@pytest.mark.asyncio
+async def test_batches_are_split_at_max_batch():
+    service = UserService()
+    await asyncio.gather(*(service.get_user(id) for id in range(7)))
+
+    assert service.batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+@pytest.mark.asyncio
+async def test_window_collects_calls_across_ticks():
+    service = UserService()
+
+    async def later(id):
+        await asyncio.sleep(0.005)
+        return await service.get_team(id)
+
+    teams = await asyncio.gather(service.get_team(1), later(2), later(0))
+    assert teams == ["team 1", "team 2", None]
+    assert service.batches == [[1, 2, 0]]
+
+@pytest.mark.asyncio
+async def test_errors_reach_their_callers():
+    class FlakyService:
+        @Batched()
+        async def load(self, keys):
+            if "boom" in keys:
+                raise RuntimeError("batch failed")
+            return [KeyError(key) if key == "missing" else key.upper() for key in keys]
+
+    service = FlakyService()
+    results = await asyncio.gather(service.load("a"), service.load("missing"), return_exceptions=True)
+    assert results[0] == "A"
+    assert isinstance(results[1], KeyError)
+
+    results = await asyncio.gather(service.load("a"), service.load("boom"), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_results_are_cached_per_request():
+    service = UserService()
+
+    async def request():
+        token = _current_context.set(RequestContext())
+        try:
+            await asyncio.gather(service.get_user(1), service.get_user(2))
+            await service.get_user(1)
+            await UserService.get_user.load_many(service, [2, 3])
+        finally:
+            _current_context.reset(token)
+
+    await request()
+    assert service.batches == [[1, 2], [3]]
+
+    await request()
+    assert service.batches == [[1, 2], [3], [1, 2], [3]]
+
+@pytest.mark.asyncio
+async def test_loaders_do_not_keep_their_instance_alive():
+    service = UserService()
+    assert await service.get_user(1) == {"id": 1}
+    reference = weakref.ref(service)
+
+    del service
+    gc.collect()
+
+    assert reference() is None
+    assert len(UserService.__dict__["get_user"]._loaders) == 0
+
+def test_batched_needs_an_async_method():
+    with pytest.raises(ValueError, match="needs an async method"):
+        Batched()(lambda self, keys: keys)
+
+def test_batched_lookups_run_one_query(tmp_path):
+    previous = default_database()
+
+    @Injectable()
+    class AuthorService:
+        def __init__(self):
+            self.context = AsyncSessionContext()
+
+        @Batched()
+        async def get_author(self, ids: List[int]):
+            authors = await self.context.session.scalars(select(Author).where(Author.id.in_(ids)))
+            return {author.id: author.name for author in authors}
+
+    @Controller("/posts")
+    class PostController:
+        def __init__(self, authors: AuthorService):
+            self.authors = authors
+
+        @Get("/")
+        async def index(self):
+            posts = [{"id": id, "author_id": id % 3 + 1} for id in range(10)]
+            names = await asyncio.gather(*(self.authors.get_author(post["author_id"]) for post in posts))
+            return names
+
+    @Module(imports=[DatabaseModule.for_root(url=f"sqlite:///{tmp_path}/batched.db")], controllers=[PostController], providers=[AuthorService])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    database = app.state.nidus.container[DatabaseManager].default
+    BatchBase.metadata.create_all(database.engine)
+    with database.session() as session:
+        session.add_all([Author(id=1, name="ada"), Author(id=2, name="bob"), Author(id=3, name="cy")])
+        session.commit()
+
+    statements = []
+    event.listen(database.async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    try:
+        with TestClient(app) as client:
+            assert client.get("/posts/").json() == ["ada", "bob", "cy", "ada", "bob", "cy", "ada", "bob", "cy", "ada"]
+    finally:
+        set_default_database(previous)
+
+    assert len([statement for statement in statements if statement.startswith("SELECT")]) == 1
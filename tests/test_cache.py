@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Get, Injectable, Cacheable, CacheEvict, CacheModule, CacheStore, InMemoryCacheStore
+from pynidus.common.cache import MISSING, default_cache_store, set_default_cache_store
+
+@pytest.fixture
+def restore_default_cache_store():
+    previous = default_cache_store()
+    yield
+    set_default_cache_store(previous)
+
+def test_store_expires_entries_after_ttl():
+    store = InMemoryCacheStore()
+    store.set("users", 1, "alice", ttl=0.05)
+    store.set("users", 2, "bob")
+    assert store.get("users", 1) == "alice"
+
+    time.sleep(0.06)
+    assert store.get("users", 1) is MISSING
+    assert store.get("users", 2) == "bob"
+    stats = store.stats("users")
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 1, 1, 1)
+
+def test_store_evicts_least_recently_used():
+    store = InMemoryCacheStore(max_entries=2)
+    store.set("users", 1, "alice")
+    store.set("users", 2, "bob")
+    store.get("users", 1)
+    store.set("users", 3, "carol")
+
+    assert store.get("users", 2) is MISSING
+    assert store.get("users", 1) == "alice"
+    assert store.get("users", 3) == "carol"
+    assert store.stats("users").evictions == 1
+
+    # Limits are per cache
+    store.set("teams", 1, "core", max_entries=1)
+    store.set("teams", 2, "web", max_entries=1)
+    assert store.stats("teams").size == 1
+    assert store.stats("users").size == 2
+
+class UserService:
+    def __init__(self):
+        self.cache_store = InMemoryCacheStore()
+        self.calls = 0
+
+    @Cacheable(ttl=60)
+    def find(self, user_id: int, active: bool = True):
+        self.calls += 1
+        return {"id": user_id, "active": active}
+
+    @Cacheable(key="user:{user_id}")
+    async def load(self, user_id: int):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": user_id}
+
+    @CacheEvict(find)
+    def update(self, user_id: int):
+        pass
+
+    @CacheEvict(load, key=lambda user_id: f"user:{user_id}")
+    async def rename(self, user_id: int):
+        pass
+
+    @CacheEvict(find, all_entries=True)
+    def reset(self):
+        pass
+
+def test_cacheable_sync_method():
+    service = UserService()
+    assert service.find(1) == {"id": 1, "active": True}
+    assert service.find(1) is service.find(user_id=1)
+    assert service.find(1, active=False) == {"id": 1, "active": False}
+    assert service.calls == 2
+
+    stats = service.cache_store.stats(UserService.find.__cache_name__)
+    assert (stats.hits, stats.misses, stats.size) == (2, 2, 2)
+
+    service.update(1)
+    service.find(1)
+    assert service.calls == 3
+
+    service.reset()
+    service.find(1, active=False)
+    assert service.calls == 4
+
+@pytest.mark.asyncio
+async def test_cacheable_async_method():
+    service = UserService()
+    assert await service.load(1) == {"id": 1}
+    assert await service.load(1) == {"id": 1}
+    assert service.calls == 1
+
+    await service.rename(1)
+    await service.load(1)
+    assert service.calls == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_async_misses_compute_once():
+    service = UserService()
+    results = await asyncio.gather(*(service.load(7) for _ in range(500)))
+
+    assert service.calls == 1
+    assert all(result is results[0] for result in results)
+
+@pytest.mark.asyncio
+async def test_failed_computation_is_not_cached():
+    class FlakyService:
+        cache_store = InMemoryCacheStore()
+        calls = 0
+
+        @Cacheable()
+        async def load(self, key: str):
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            if self.calls == 1:
+                raise RuntimeError("unavailable")
+            return key
+
+    service = FlakyService()
+    results = await asyncio.gather(*(service.load("a") for _ in range(10)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await service.load("a") == "a"
+    assert service.calls == 2
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_fail_waiting_callers():
+    service = UserService()
+    leader = asyncio.create_task(service.load(3))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(service.load(3)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    results = await asyncio.gather(*followers)
+    assert results == [{"id": 3}] * 3
+    # One follower took over the computation
+    assert service.calls == 2
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+def test_concurrent_thread_misses_compute_once():
+    class SlowService:
+        cache_store = InMemoryCacheStore()
+        calls = 0
+
+        @Cacheable()
+        def compute(self, key: str):
+            self.calls += 1
+            time.sleep(0.05)
+            return key.upper()
+
+    service = SlowService()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.compute("a"))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["A"] * 20
+    assert service.calls == 1
+
+def test_cache_evict_needs_a_cacheable_method():
+    with pytest.raises(ValueError, match="is not a @Cacheable method"):
+        CacheEvict(lambda self: None)
+
+def test_cache_module_provides_the_store(restore_default_cache_store):
+    store = InMemoryCacheStore()
+
+    @Injectable()
+    class PriceService:
+        def __init__(self, cache_store: CacheStore):
+            self.cache_store = cache_store
+            self.calls = 0
+
+        @Cacheable(ttl=30)
+        def price(self, sku: str):
+            self.calls += 1
+            return 42
+
+    @Controller("/prices")
+    class PriceController:
+        def __init__(self, service: PriceService):
+            self.service = service
+            self.calls = 0
+
+        @Get("/{sku}")
+        @Cacheable()
+        def show(self, sku: str):
+            self.calls += 1
+            return {"sku": sku, "price": self.service.price(sku)}
+
+    @Module(imports=[CacheModule.for_root(store=store)], controllers=[PriceController], providers=[PriceService])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    assert app.state.nidus.container[CacheStore] is store
+    assert default_cache_store() is store
+
+    with TestClient(app) as client:
+        assert client.get("/prices/abc").json() == {"sku": "abc", "price": 42}
+        assert client.get("/prices/abc").json() == {"sku": "abc", "price": 42}
+
+    assert store.stats(PriceController.show.__cache_name__).hits == 1
+    assert store.stats(PriceService.price.__cache_name__).misses == 1
+
+def test_each_application_uses_its_own_store(restore_default_cache_store):
+    @Controller("/numbers")
+    class NumberController:
+        def __init__(self):
+            self.calls = 0
+
+        @Get("/")
+        @Cacheable()
+        def next(self):
+            self.calls += 1
+            return self.calls
+
+    def application(store):
+        @Module(imports=[CacheModule.for_root(store=store)], controllers=[NumberController])
+        class AppModule:
+            pass
+        return NidusFactory.create(AppModule, lazy=True)
+
+    first_store, second_store = InMemoryCacheStore(), InMemoryCacheStore()
+    first, second = application(first_store), application(second_store)
+
+    with TestClient(first) as first_client, TestClient(second) as second_client:
+        assert first_client.get("/numbers/").json() == 1
+        assert second_client.get("/numbers/").json() == 1
+        assert first_client.get("/numbers/").json() == 1
+
+    cache = NumberController.next.__cache_name__
+    assert (first_store.stats(cache).hits, first_store.stats(cache).misses) == (1, 1)
+    assert (second_store.stats(cache).hits, second_store.stats(cache).misses) == (0, 1)
@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from pynidus import NidusFactory, Module, Controller, Get, Post, Injectable, Transactional
+from pynidus.db import (
+    AsyncSessionContext,
+    AsyncSQLAlchemyTransactionManager,
+    Database,
+    DatabaseConfig,
+    DatabaseModule,
+    SessionContext,
+    SQLAlchemyTransactionManager,
+    current_session_scope,
+    get_db,
+    session_scope,
+)
+from pynidus.db.database import default_database, set_default_database
+
+class ContextBase(DeclarativeBase):
+    pass
+
+class Order(ContextBase):
+    __tablename__ = "orders"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    item: Mapped[str]
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(DatabaseConfig(f"sqlite:///{tmp_path}/context.db"))
+    ContextBase.metadata.create_all(database.engine)
+    return database
+
+def test_session_requires_a_scope(database):
+    with pytest.raises(RuntimeError, match="No session scope is active"):
+        SessionContext(database).session
+
+def test_scope_opens_one_session_and_closes_it(database):
+    context = SessionContext(database)
+
+    with session_scope() as scope:
+        session = context.session
+        assert context.session is session
+        session.execute(select(1))
+        assert database.pool_stats()["sync"].checked_out == 1
+
+    assert scope.sessions == {}
+    assert database.pool_stats()["sync"].checked_out == 0
+
+@pytest.mark.asyncio
+async def test_singleton_service_is_safe_across_concurrent_tasks(database):
+    class OrderService:
+        def __init__(self):
+            self.transaction_manager = AsyncSQLAlchemyTransactionManager(AsyncSessionContext(database))
+
+        @Transactional()
+        async def place(self, item: str):
+            session = self.transaction_manager.session
+            session.add(Order(item=item))
+            await asyncio.sleep(0.01)
+            await session.flush()
+            return session
+
+    service = OrderService()
+
+    async def handle(index: int):
+        async with session_scope():
+            return await service.place(f"item{index}")
+
+    try:
+        sessions = await asyncio.gather(*(handle(index) for index in range(10)))
+        assert len({id(session) for session in sessions}) == 10
+    finally:
+        await database.dispose()
+
+    with database.session() as session:
+        assert session.execute(select(func.count()).select_from(Order)).scalar() == 10
+
+def test_transaction_frames_are_per_scope(database):
+    manager = SQLAlchemyTransactionManager(SessionContext(database))
+
+    with session_scope():
+        manager.begin()
+        assert manager.in_transaction()
+        with session_scope():
+            # Another request sees no running transaction
+            assert not manager.in_transaction()
+        manager.commit()
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_requests_get_their_own_session(tmp_path, lazy):
+    previous = default_database()
+
+    @Injectable()
+    class OrderService:
+        def __init__(self, transaction_manager: SQLAlchemyTransactionManager):
+            self.transaction_manager = transaction_manager
+
+        @Transactional()
+        def place(self, item: str):
+            session = self.transaction_manager.session
+            session.add(Order(item=item))
+            session.flush()
+            return id(session)
+
+    @Controller("/orders")
+    class OrderController:
+        def __init__(self, service: OrderService):
+            self.service = service
+
+        @Post("/{item}")
+        def place(self, item: str):
+            return self.service.place(item)
+
+        @Get("/session")
+        async def shared_with_get_db(self, session: AsyncSession = Depends(get_db)):
+            return any(value is session for value in current_session_scope().sessions.values())
+
+    @Module(
+        imports=[DatabaseModule.for_root(url=f"sqlite:///{tmp_path}/app.db")],
+        controllers=[OrderController],
+        providers=[OrderService],
+    )
+    class AppModule:
+        pass
+
+    try:
+        app = NidusFactory.create(AppModule, lazy=lazy)
+        database = app.state.nidus.container[Database]
+        ContextBase.metadata.create_all(database.engine)
+
+        with TestClient(app) as client:
+            assert client.post("/orders/a").status_code == 200
+            assert client.post("/orders/b").status_code == 200
+            assert client.get("/orders/session").json() is True
+
+        assert database.pool_stats()["sync"].checked_out == 0
+        with database.session() as session:
+            assert session.execute(select(Order.item).order_by(Order.id)).scalars().all() == ["a", "b"]
+    finally:
+        set_default_database(previous)
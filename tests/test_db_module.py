@@ -0,0 +1,166 @@
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from pynidus import NidusFactory, Module, Controller, Get, Injectable, Provider
+from pynidus.db import Database, DatabaseConfig, DatabaseManager, DatabaseModule, PoolOptions
+from pynidus.db.database import default_database, set_default_database
+
+@pytest.fixture
+def restore_default_database():
+    previous = default_database()
+    yield
+    set_default_database(previous)
+
+def test_importing_does_not_create_engines():
+    import pynidus.db.session
+    import pynidus.db.sync_session
+
+    assert "engine" not in vars(pynidus.db.session)
+    assert "engine" not in vars(pynidus.db.sync_session)
+
+def test_async_url_is_derived():
+    config = DatabaseConfig("sqlite:///app.db")
+    assert config.async_url.drivername == "sqlite+aiosqlite"
+
+    config = DatabaseConfig("postgresql+asyncpg://user@localhost/app")
+    assert config.url.drivername == "postgresql+psycopg2"
+    assert config.async_url.drivername == "postgresql+asyncpg"
+
+def test_engines_are_created_on_first_use(tmp_path):
+    database = Database(DatabaseConfig(f"sqlite:///{tmp_path}/lazy.db", pool=PoolOptions(size=2, max_overflow=1, recycle=60)))
+    assert database.pool_stats() == {}
+
+    with database.session() as session:
+        assert session.execute(text("SELECT 1")).scalar() == 1
+
+    stats = database.pool_stats()["sync"]
+    assert stats.size == 2
+    assert stats.checkouts == 1
+    assert stats.checked_out == 0
+
+def test_after_fork_drops_inherited_connections(tmp_path):
+    database = Database(DatabaseConfig(f"sqlite:///{tmp_path}/fork.db"))
+    with database.session() as session:
+        session.execute(text("SELECT 1"))
+    inherited = database.engine.pool
+
+    database.after_fork()
+
+    assert database.engine.pool is not inherited
+    assert database.engine.pool.checkedin() == 0
+    with database.session() as session:
+        assert session.execute(text("SELECT 1")).scalar() == 1
+
+def test_pool_wait_time_is_recorded(tmp_path):
+    database = Database(DatabaseConfig(f"sqlite:///{tmp_path}/wait.db", pool=PoolOptions(size=1, max_overflow=0)))
+    engine = database.engine
+
+    held = engine.connect()
+    released = threading.Timer(0.05, held.close)
+    released.start()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    released.join()
+
+    stats = database.pool_stats()["sync"]
+    assert stats.waits == 1
+    assert stats.wait_time_max >= 0.03
+    assert stats.overflow == 0
+
+def test_database_module_provides_named_databases(tmp_path, restore_default_database):
+    @Injectable()
+    class ReportService:
+        def __init__(self, databases: DatabaseManager, database: Database):
+            self.databases = databases
+            self.database = database
+
+    @Controller("/reports")
+    class ReportController:
+        def __init__(self, service: ReportService):
+            self.service = service
+
+        @Get("/")
+        def index(self):
+            analytics = self.service.databases.get("analytics")
+            with analytics.session() as session:
+                value = session.execute(text("SELECT 2")).scalar()
+            return {"default": self.service.database.name, "analytics": value}
+
+    @Module(
+        imports=[DatabaseModule.for_root(
+            url=f"sqlite:///{tmp_path}/main.db",
+            databases={"analytics": f"sqlite:///{tmp_path}/analytics.db"},
+            pool=PoolOptions(size=3),
+        )],
+        controllers=[ReportController],
+        providers=[ReportService],
+    )
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    manager = app.state.nidus.container[DatabaseManager]
+    assert default_database() is manager.default
+
+    with TestClient(app) as client:
+        assert client.get("/reports/").json() == {"default": "default", "analytics": 2}
+        assert manager.get("analytics").pool_stats()["sync"].checkouts == 1
+
+    with pytest.raises(ValueError, match="Unknown database 'missing'"):
+        manager.get("missing")
+
+def test_each_application_gets_its_own_default_database(tmp_path, restore_default_database):
+    @Controller("/default")
+    class DefaultController:
+        @Get("/")
+        def url(self):
+            return str(default_database().config.url)
+
+    def application(name):
+        @Module(imports=[DatabaseModule.for_root(url=f"sqlite:///{tmp_path}/{name}.db")], controllers=[DefaultController])
+        class AppModule:
+            pass
+        return NidusFactory.create(AppModule, lazy=True)
+
+    first, second = application("first"), application("second")
+
+    with TestClient(first) as first_client, TestClient(second) as second_client:
+        assert first_client.get("/default/").json() == f"sqlite:///{tmp_path}/first.db"
+        assert second_client.get("/default/").json() == f"sqlite:///{tmp_path}/second.db"
+    # Outside of their requests, the application registered last
+    assert default_database() is second.state.nidus.container[DatabaseManager].default
+
+def test_database_module_needs_a_database():
+    with pytest.raises(ValueError, match="needs a url or databases"):
+        DatabaseModule.for_root()
+
+def test_custom_providers():
+    class Settings:
+        def __init__(self, name: str):
+            self.name = name
+
+    class Greeter:
+        def __init__(self, settings: Settings):
+            self.greeting = f"Hello {settings.name}"
+
+    class FriendlyGreeter(Greeter):
+        pass
+
+    @Module(
+        providers=[
+            Provider(Settings, use_value=Settings("world")),
+            Provider(Greeter, use_class=FriendlyGreeter),
+            Provider(str, use_factory=lambda greeter: greeter.greeting.upper(), inject=[Greeter]),
+        ],
+    )
+    class AppModule:
+        pass
+
+    container = NidusFactory.create(AppModule).state.nidus.container
+    assert type(container[Greeter]) is FriendlyGreeter
+    assert container[Greeter].greeting == "Hello world"
+    assert container[str] == "HELLO WORLD"
+
+    with pytest.raises(ValueError, match="exactly one of"):
+        Provider(Settings, use_class=Settings, use_value=None)
@@ -0,0 +1,225 @@
+import asyncio
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from pynidus import Transactional, Propagation, transactional
+from pynidus.db import Database, DatabaseConfig
+from pynidus.db.transaction_manager import SQLAlchemyTransactionManager, AsyncSQLAlchemyTransactionManager, UnexpectedRollbackError
+
+class PropagationBase(DeclarativeBase):
+    pass
+
+class Entry(PropagationBase):
+    __tablename__ = "entries"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(DatabaseConfig(f"sqlite:///{tmp_path}/propagation.db"))
+    PropagationBase.metadata.create_all(database.engine)
+    return database
+
+def stored(database):
+    with database.session() as session:
+        return session.execute(select(Entry.name).order_by(Entry.id)).scalars().all()
+
+class EntryService:
+    def __init__(self, database: Database):
+        self.transaction_manager = SQLAlchemyTransactionManager(database.session(), database.session_factory)
+
+    @property
+    def session(self):
+        return self.transaction_manager.session
+
+    @Transactional()
+    def add(self, name: str):
+        self.session.add(Entry(name=name))
+        self.session.flush()
+
+    @Transactional()
+    def add_failing(self, name: str):
+        self.session.add(Entry(name=name))
+        self.session.flush()
+        raise ValueError(name)
+
+    @Transactional(propagation=Propagation.NESTED)
+    def add_nested(self, name: str, fail: bool = False):
+        self.session.add(Entry(name=name))
+        self.session.flush()
+        if fail:
+            raise ValueError(name)
+
+    @Transactional(propagation=Propagation.REQUIRES_NEW)
+    def audit(self, name: str):
+        self.session.add(Entry(name=name))
+
+    @Transactional(propagation=Propagation.SUPPORTS)
+    def count(self):
+        return len(self.session.execute(select(Entry)).all())
+
+    @Transactional()
+    def batch(self, names):
+        for name in names:
+            self.add(name)
+
+    @Transactional()
+    def batch_with_nested(self, names):
+        for name in names:
+            try:
+                self.add_nested(name, fail=name.startswith("bad"))
+            except ValueError:
+                pass
+
+    @Transactional()
+    def batch_swallowing_failure(self):
+        self.add("kept?")
+        try:
+            self.add_failing("inner")
+        except ValueError:
+            pass
+
+    @Transactional()
+    def work_with_audit(self, fail: bool):
+        # SQLite allows a single writer, so the independent transaction runs first
+        self.audit("audit")
+        self.add("work")
+        if fail:
+            raise ValueError("work")
+
+def test_required_commits_once(database):
+    service = EntryService(database)
+    commits = []
+    event.listen(service.session, "after_commit", lambda session: commits.append(session))
+
+    service.batch(["a", "b", "c"])
+
+    assert len(commits) == 1
+    assert stored(database) == ["a", "b", "c"]
+
+def test_nested_rolls_back_only_the_savepoint(database):
+    service = EntryService(database)
+
+    service.batch_with_nested(["a", "bad1", "b", "bad2"])
+
+    assert stored(database) == ["a", "b"]
+
+def test_failed_joined_call_marks_transaction_rollback_only(database):
+    service = EntryService(database)
+
+    with pytest.raises(UnexpectedRollbackError):
+        service.batch_swallowing_failure()
+
+    assert stored(database) == []
+
+def test_requires_new_commits_independently(database):
+    service = EntryService(database)
+
+    with pytest.raises(ValueError):
+        service.work_with_audit(fail=True)
+
+    assert stored(database) == ["audit"]
+
+def test_requires_new_needs_session_factory(database):
+    class Service:
+        def __init__(self):
+            self.transaction_manager = SQLAlchemyTransactionManager(database.session())
+
+        @Transactional(propagation=Propagation.REQUIRES_NEW)
+        def inner(self):
+            pass
+
+        @Transactional()
+        def outer(self):
+            self.inner()
+
+    with pytest.raises(ValueError, match="session_factory"):
+        Service().outer()
+
+def test_supports_runs_with_or_without_transaction(database):
+    service = EntryService(database)
+    service.add("a")
+
+    assert service.count() == 1
+    assert service.transaction_manager._stack.frames == []
+
+def test_unknown_propagation_is_rejected():
+    with pytest.raises(ValueError, match="Unknown propagation"):
+        Transactional(propagation="mandatory")
+
+@pytest.mark.asyncio
+async def test_async_nested_propagation(database):
+    class AsyncEntryService:
+        def __init__(self):
+            self.transaction_manager = AsyncSQLAlchemyTransactionManager(database.async_session(), database.async_session_factory)
+
+        @Transactional(propagation=Propagation.NESTED)
+        async def add_nested(self, name: str):
+            session = self.transaction_manager.session
+            session.add(Entry(name=name))
+            await session.flush()
+            if name.startswith("bad"):
+                raise ValueError(name)
+
+        @Transactional()
+        async def batch(self, names):
+            for name in names:
+                try:
+                    await self.add_nested(name)
+                except ValueError:
+                    pass
+
+    service = AsyncEntryService()
+    try:
+        await service.batch(["a", "bad", "b"])
+    finally:
+        await service.transaction_manager.session.close()
+        await database.dispose()
+
+    assert stored(database) == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_cancelled_call_does_not_leave_its_transaction_open(database):
+    class AsyncEntryService:
+        def __init__(self):
+            self.transaction_manager = AsyncSQLAlchemyTransactionManager(database.async_session())
+            self.started = asyncio.Event()
+
+        @Transactional()
+        async def slow(self):
+            self.transaction_manager.session.add(Entry(name="cancelled"))
+            self.started.set()
+            await asyncio.sleep(10)
+
+        @Transactional()
+        async def add(self, name: str):
+            self.transaction_manager.session.add(Entry(name=name))
+
+    service = AsyncEntryService()
+    manager = service.transaction_manager
+    try:
+        task = asyncio.create_task(service.slow())
+        await service.started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert manager._stack.frames == []
+
+        async def block():
+            async with transactional(manager):
+                manager.session.add(Entry(name="block cancelled"))
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(block())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert manager._stack.frames == []
+
+        await service.add("after")
+    finally:
+        await manager.session.close()
+        await database.dispose()
+
+    assert stored(database) == ["after"]
@@ -0,0 +1,167 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from pynidus import NidusFactory, Module, Controller, Get, Post, Injectable, Transactional
+from pynidus.db import Database, DatabaseConfig, DatabaseModule, ReplicaSelection
+from pynidus.db.database import default_database, set_default_database
+from pynidus.db.transaction_manager import SQLAlchemyTransactionManager, AsyncSQLAlchemyTransactionManager
+
+class ReplicaBase(DeclarativeBase):
+    pass
+
+class Note(ReplicaBase):
+    __tablename__ = "notes"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    origin: Mapped[str]
+
+def make_database(tmp_path, **options) -> Database:
+    # Each file gets a row naming it, so reads tell which database served them
+    names = ["primary", "replica1", "replica2"]
+    for name in names:
+        engine = create_engine(f"sqlite:///{tmp_path}/{name}.db")
+        ReplicaBase.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(Note.__table__.insert().values(origin=name))
+        engine.dispose()
+
+    return Database(DatabaseConfig(
+        f"sqlite:///{tmp_path}/primary.db",
+        replicas=[f"sqlite:///{tmp_path}/replica1.db", f"sqlite:///{tmp_path}/replica2.db"],
+        journal_mode="wal",
+        **options,
+    ))
+
+class NoteService:
+    def __init__(self, database: Database):
+        self.session = database.session()
+        self.transaction_manager = SQLAlchemyTransactionManager(self.session)
+
+    @Transactional(read_only=True)
+    def origin(self):
+        return self.session.execute(select(Note.origin).order_by(Note.id)).scalars().first()
+
+    @Transactional()
+    def add(self, origin: str):
+        self.session.add(Note(origin=origin))
+
+    @Transactional()
+    def primary_origin(self):
+        return self.session.execute(select(Note.origin).order_by(Note.id)).scalars().first()
+
+def test_read_only_transactions_use_replicas_round_robin(tmp_path):
+    service = NoteService(make_database(tmp_path))
+
+    assert [service.origin() for _ in range(4)] == ["replica1", "replica2", "replica1", "replica2"]
+    assert service.primary_origin() == "primary"
+
+def test_read_only_transaction_stays_on_one_replica(tmp_path):
+    database = make_database(tmp_path)
+
+    class ReportService(NoteService):
+        @Transactional(read_only=True)
+        def origins(self):
+            return [self.session.execute(select(Note.origin)).scalars().first() for _ in range(3)]
+
+    service = ReportService(database)
+    assert service.origins() == ["replica1"] * 3
+    assert service.origins() == ["replica2"] * 3
+
+def test_replicas_use_wal(tmp_path):
+    database = make_database(tmp_path)
+    with database.replica_engines[0].connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+def test_least_connections_selection(tmp_path):
+    database = make_database(tmp_path, replica_selection=ReplicaSelection.LEAST_CONNECTIONS)
+    service = NoteService(database)
+
+    busy = database.replica_engines[0].connect()
+    try:
+        assert service.origin() == "replica2"
+        assert service.origin() == "replica2"
+    finally:
+        busy.close()
+
+def test_writes_pin_session_to_primary(tmp_path):
+    service = NoteService(make_database(tmp_path, read_your_writes=60))
+
+    assert service.origin() == "replica1"
+    service.add("written")
+    assert service.origin() == "primary"
+
+def test_without_window_reads_return_to_replicas(tmp_path):
+    service = NoteService(make_database(tmp_path))
+
+    service.add("written")
+    assert service.origin() == "replica1"
+
+def test_read_your_writes_spans_the_request(tmp_path):
+    make_database(tmp_path)
+    previous = default_database()
+
+    @Injectable()
+    class NotesProvider:
+        def __init__(self, database: Database):
+            self.database = database
+
+    @Controller("/notes")
+    class NotesController:
+        def __init__(self, notes: NotesProvider):
+            self.notes = notes
+
+        @Get("/")
+        def read(self):
+            return NoteService(self.notes.database).origin()
+
+        @Post("/")
+        def write_then_read(self):
+            NoteService(self.notes.database).add("written")
+            # A different session in the same request
+            return NoteService(self.notes.database).origin()
+
+    @Module(
+        imports=[DatabaseModule.for_root(
+            url=f"sqlite:///{tmp_path}/primary.db",
+            replicas=[f"sqlite:///{tmp_path}/replica1.db"],
+            read_your_writes=0.5,
+        )],
+        controllers=[NotesController],
+        providers=[NotesProvider],
+    )
+    class AppModule:
+        pass
+
+    try:
+        client = TestClient(NidusFactory.create(AppModule))
+        assert client.post("/notes/").json() == "primary"
+    finally:
+        set_default_database(previous)
+
+@pytest.mark.asyncio
+async def test_async_read_only_transactions_use_replicas(tmp_path):
+    database = make_database(tmp_path)
+
+    class AsyncNoteService:
+        def __init__(self):
+            self.session = database.async_session()
+            self.transaction_manager = AsyncSQLAlchemyTransactionManager(self.session)
+
+        @Transactional(read_only=True)
+        async def origin(self):
+            result = await self.session.execute(select(Note.origin).order_by(Note.id))
+            return result.scalars().first()
+
+        @Transactional()
+        async def primary_origin(self):
+            result = await self.session.execute(select(Note.origin).order_by(Note.id))
+            return result.scalars().first()
+
+    service = AsyncNoteService()
+    try:
+        assert await service.origin() == "replica1"
+        assert await service.origin() == "replica2"
+        assert await service.primary_origin() == "primary"
+    finally:
+        await service.session.close()
+        await database.dispose()
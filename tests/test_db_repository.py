@@ -0,0 +1,173 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Mapped, mapped_column
+from pynidus import NidusFactory, Module, Controller, Get, Post, Injectable, Transactional
+from pynidus.db import (
+    AsyncRepository,
+    Base,
+    Database,
+    DatabaseConfig,
+    DatabaseModule,
+    Repository,
+    SQLAlchemyTransactionManager,
+)
+from pynidus.db.database import default_database, set_default_database
+
+class Product(Base):
+    __tablename__ = "repository_products"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    sku: Mapped[str] = mapped_column(unique=True)
+    price: Mapped[int]
+
+class ProductRepository(Repository[Product]):
+    pass
+
+class Order(Base):
+    __tablename__ = "repository_orders"
+    number: Mapped[int] = mapped_column("order_number", primary_key=True)
+    total: Mapped[int] = mapped_column("order_total")
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(DatabaseConfig(f"sqlite:///{tmp_path}/repository.db"))
+    Base.metadata.create_all(database.engine, tables=[Product.__table__, Order.__table__])
+    return database
+
+def rows(count, start=0):
+    return [{"id": index, "sku": f"sku{index}", "price": index} for index in range(start, start + count)]
+
+def test_model_is_bound_by_subclassing(database):
+    assert ProductRepository.model is Product
+    with pytest.raises(ValueError, match="needs a model"):
+        Repository(database.session())
+
+def test_bulk_insert_and_stream(database):
+    with database.session() as session:
+        repository = ProductRepository(session)
+        assert repository.bulk_insert(rows(2500), batch_size=1000) == 2500
+        repository.bulk_insert([Product(id=2500, sku="sku2500", price=1)])
+        session.commit()
+
+        streamed = list(repository.stream(chunk=100))
+        assert len(streamed) == 2501
+        assert repository.get(42).sku == "sku42"
+
+        cheap = list(repository.stream(select(Product).where(Product.price < 3)))
+        assert sorted(product.id for product in cheap) == [0, 1, 2, 2500]
+
+def test_bulk_upsert(database):
+    with database.session() as session:
+        repository = ProductRepository(session)
+        repository.bulk_insert(rows(3))
+        repository.bulk_upsert([{"id": 1, "sku": "sku1", "price": 100}, {"id": 5, "sku": "sku5", "price": 5}])
+        repository.bulk_upsert([{"sku": "sku2", "price": 200, "id": 2}], index_elements=["sku"], update_columns=["price"])
+        session.commit()
+
+        prices = dict(session.execute(select(Product.id, Product.price)).all())
+        assert prices == {0: 0, 1: 100, 2: 200, 5: 5}
+
+def test_keyset_pagination(database):
+    with database.session() as session:
+        repository = ProductRepository(session)
+        repository.bulk_insert(rows(25))
+
+        seen = []
+        page = repository.seek(limit=10)
+        while True:
+            seen.extend(product.id for product in page)
+            if page.next_key is None:
+                break
+            page = repository.seek(limit=10, after=page.next_key)
+        assert seen == list(range(25))
+
+        page = repository.seek(limit=3, key=["price", "id"], descending=True)
+        assert [product.id for product in page] == [24, 23, 22]
+        assert page.next_key == (22, 22)
+        assert [product.id for product in repository.seek(limit=2, key=["price", "id"], descending=True, after=page.next_key)] == [21, 20]
+
+def test_keyset_pagination_on_renamed_columns(database):
+    with database.session() as session:
+        repository = Repository(session, model=Order)
+        repository.bulk_insert([{"number": index, "total": index * 10} for index in range(5)])
+
+        page = repository.seek(limit=2)
+        assert page.next_key == (1,)
+        assert [order.number for order in repository.seek(limit=2, after=page.next_key)] == [2, 3]
+
+        page = repository.seek(limit=2, key=[Order.__table__.c.order_total], descending=True)
+        assert page.next_key == (30,)
+
+def test_bulk_upsert_on_renamed_columns(database):
+    with database.session() as session:
+        repository = Repository(session, model=Order)
+        repository.bulk_insert([{"number": 1, "total": 10}, {"number": 2, "total": 20}])
+        repository.bulk_upsert([{"number": 1, "total": 15}, {"number": 3, "total": 30}])
+        repository.bulk_upsert([{"number": 2, "total": 25}], index_elements=["number"], update_columns=["total"])
+        session.commit()
+
+        totals = dict(session.execute(select(Order.number, Order.total)).all())
+        assert totals == {1: 15, 2: 25, 3: 30}
+
+@pytest.mark.asyncio
+async def test_async_repository(database):
+    session = database.async_session()
+    try:
+        repository = AsyncRepository(session, model=Product)
+        assert await repository.bulk_insert(rows(50)) == 50
+        await repository.bulk_upsert([{"id": 0, "sku": "sku0", "price": 7}])
+        await session.commit()
+
+        streamed = [product.id async for product in repository.stream(chunk=10)]
+        assert len(streamed) == 50
+        assert (await repository.get(0)).price == 7
+
+        page = await repository.seek(limit=20, after=(40,))
+        assert [product.id for product in page] == list(range(41, 50))
+        assert page.next_key is None
+    finally:
+        await session.close()
+        await database.dispose()
+
+def test_repositories_are_injectable(tmp_path):
+    previous = default_database()
+
+    @Injectable()
+    class CatalogService:
+        def __init__(self, products: Repository[Product], transaction_manager: SQLAlchemyTransactionManager):
+            self.products = products
+            self.transaction_manager = transaction_manager
+
+        @Transactional()
+        def import_products(self, count: int):
+            return self.products.bulk_insert(rows(count))
+
+    @Controller("/catalog")
+    class CatalogController:
+        def __init__(self, service: CatalogService):
+            self.service = service
+
+        @Post("/{count}")
+        def import_products(self, count: int):
+            return self.service.import_products(count)
+
+        @Get("/")
+        def first_page(self):
+            return [product.sku for product in self.service.products.seek(limit=2)]
+
+    @Module(
+        imports=[DatabaseModule.for_root(url=f"sqlite:///{tmp_path}/catalog.db"), DatabaseModule.for_feature([Product])],
+        controllers=[CatalogController],
+        providers=[CatalogService],
+    )
+    class AppModule:
+        pass
+
+    try:
+        app = NidusFactory.create(AppModule)
+        Base.metadata.create_all(app.state.nidus.container[Database].engine, tables=[Product.__table__])
+        client = TestClient(app)
+        assert client.post("/catalog/5").json() == 5
+        assert client.get("/catalog/").json() == ["sku0", "sku1"]
+    finally:
+        set_default_database(previous)
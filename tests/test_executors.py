@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Get, Post, Injectable
+from pynidus.core.executors import ExecutorRegistry, TrackedExecutor
+from pynidus.core.scope import current_request_context
+
+@Controller("/compute")
+class ComputeController:
+    @Get("/sum/{n}", executor="cpu")
+    @staticmethod
+    def total(n: int):
+        return {"total": sum(range(n)), "pid": os.getpid()}
+
+    @Post("/echo", executor="cpu")
+    @staticmethod
+    def echo(payload: dict):
+        return payload
+
+    @Get("/thread")
+    def thread(self):
+        return {"thread": threading.current_thread().name}
+
+def test_cpu_routes_run_in_worker_processes():
+    @Module(controllers=[ComputeController])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule, executors={"cpu": 2})
+    with TestClient(app) as client:
+        response = client.get("/compute/sum/1000").json()
+        assert response["total"] == 499500
+        assert response["pid"] != os.getpid()
+        assert client.post("/compute/echo", json={"values": [1, 2, 3]}).json() == {"values": [1, 2, 3]}
+        assert not client.get("/compute/thread").json()["thread"].startswith("nidus-")
+
+        stats = app.state.nidus.executors.stats()["cpu"]
+        assert (stats.max_workers, stats.completed, stats.in_flight) == (2, 2, 0)
+
+def test_controller_executor_isolates_slow_handlers():
+    @Injectable(scope="request")
+    class RequestState:
+        def __init__(self):
+            self.context = current_request_context()
+
+    @Controller("/reports", executor="reports")
+    class ReportController:
+        def __init__(self, state: RequestState):
+            self.state = state
+
+        @Get("/{name}")
+        def build(self, name: str):
+            time.sleep(0.01)
+            return {
+                "name": name,
+                "thread": threading.current_thread().name,
+                "same_context": current_request_context() is self.state.context,
+            }
+
+    @Module(controllers=[ReportController], providers=[RequestState])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule, executors={"reports": 2})
+    with TestClient(app) as client:
+        response = client.get("/reports/sales").json()
+
+    assert response["name"] == "sales"
+    assert response["thread"].startswith("nidus-reports")
+    assert response["same_context"] is True
+    assert app.state.nidus.executors.stats()["reports"].completed == 1
+
+def test_queue_depth_is_tracked():
+    executor = TrackedExecutor("slow", 1)
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(3)]
+
+    stats = executor.stats()
+    assert (stats.in_flight, stats.running, stats.queued) == (3, 1, 2)
+
+    release.set()
+    for future in futures:
+        future.result()
+    executor.shutdown()
+    stats = executor.stats()
+    assert (stats.in_flight, stats.queued, stats.completed, stats.max_queued) == (0, 0, 3, 2)
+
+def test_invalid_executor_routes_are_rejected():
+    @Controller("/bad")
+    class AsyncController:
+        @Get("/", executor="cpu")
+        async def index(self):
+            return {}
+
+    @Controller("/bad")
+    class BoundController:
+        @Get("/", executor="cpu")
+        def index(self):
+            return {}
+
+    @Controller("/bad", executor="missing")
+    class UnknownController:
+        @Get("/")
+        def index(self):
+            return {}
+
+    for controller, message in [
+        (AsyncController, "only sync, non-streaming handlers"),
+        (BoundController, "must be a @staticmethod"),
+        (UnknownController, "Unknown executor 'missing'"),
+    ]:
+        @Module(controllers=[controller])
+        class AppModule:
+            pass
+
+        with pytest.raises(ValueError, match=message):
+            NidusFactory.create(AppModule)
+
+    with pytest.raises(ValueError, match="cannot be replaced"):
+        ExecutorRegistry({"default": 4})
@@ -67,3 +67,12 @@ def test_di_ignore_args_kwargs():
 
     # Should not raise error
     NidusFactory.create(TestModule)
+
+def test_listen_rejects_create_options_for_a_built_application():
+    @Module()
+    class TestModule:
+        pass
+
+    app = NidusFactory.create(TestModule)
+    with pytest.raises(ValueError, match="lazy"):
+        NidusFactory.listen(app, lazy=True)
@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import pytest
+import pynidus
+import pynidus.db
+
+# Cumulative -X importtime of the decorator imports below; eager imports took about 0.7s
+IMPORT_BUDGET = 0.15
+HEAVY = {"fastapi", "starlette", "pydantic", "sqlalchemy", "uvicorn"}
+
+def import_times(code: str, cwd=None):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, cwd=cwd,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.rstrip()))
+    return imports
+
+def test_decorators_import_within_budget():
+    imports = import_times("import pynidus, pynidus.db; from pynidus import Module, Injectable, Controller, Get, Post, Transactional")
+
+    loaded = {name.strip().split(".")[0] for _, name in imports}
+    assert not loaded & HEAVY
+    # Top-level entries only: their cumulative time includes what they import
+    total = sum(cumulative for cumulative, name in imports if name.startswith(" pynidus"))
+    assert total < IMPORT_BUDGET * 1e6, f"pynidus imports took {total / 1000:.1f} ms"
+
+def test_importing_db_has_no_side_effects(tmp_path):
+    imports = import_times("import pynidus.db", cwd=tmp_path)
+
+    assert not {name.strip().split(".")[0] for _, name in imports} & HEAVY
+    assert list(tmp_path.iterdir()) == []
+
+APP_WITHOUT_DATABASE = """
+import sys
+from pynidus import NidusFactory, Module, Controller, Get
+
+@Controller()
+class PingController:
+    @Get("/")
+    def ping(self) -> dict:
+        return {}
+
+@Module(controllers=[PingController])
+class AppModule:
+    pass
+
+NidusFactory.create(AppModule)
+"""
+
+def test_application_without_database_does_not_load_sqlalchemy():
+    loaded = {name.strip() for _, name in import_times(APP_WITHOUT_DATABASE)}
+
+    assert "sqlalchemy" not in loaded
+    assert "pynidus.db.serializer" not in loaded
+
+def test_lazy_exports_resolve():
+    for name in pynidus.__all__:
+        assert getattr(pynidus, name) is not None
+    for name in pynidus.db.__all__:
+        if name not in ("AsyncSessionLocal", "async_engine", "SessionLocal", "sync_engine"):
+            assert getattr(pynidus.db, name) is not None
+
+    assert "NidusFactory" in dir(pynidus)
+    assert pynidus.NidusFactory.__module__ == "pynidus.core.factory"
+    with pytest.raises(AttributeError):
+        pynidus.Missing
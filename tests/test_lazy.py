@@ -0,0 +1,97 @@
+import threading
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Injectable, Get
+from pynidus.core.lazy import LazyProxy, is_materialized
+
+def test_lazy_provider_is_built_on_first_use():
+    built = []
+
+    @Injectable(lazy=True)
+    class AdminService:
+        def __init__(self):
+            built.append(self)
+
+        def get_stats(self):
+            return {"users": 3}
+
+    @Controller("/admin")
+    class AdminController:
+        def __init__(self, admin_service: AdminService):
+            self.admin_service = admin_service
+
+        @Get("/stats")
+        def stats(self):
+            return self.admin_service.get_stats()
+
+    @Module(controllers=[AdminController], providers=[AdminService])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    assert built == []
+
+    client = TestClient(app)
+    assert client.get("/admin/stats").json() == {"users": 3}
+    assert client.get("/admin/stats").json() == {"users": 3}
+    assert len(built) == 1
+
+def test_factory_wide_lazy_defers_dependency_subtree():
+    built = []
+
+    @Injectable()
+    class Repository:
+        def __init__(self):
+            built.append("repository")
+
+    @Injectable()
+    class Service:
+        def __init__(self, repository: Repository):
+            built.append("service")
+            self.repository = repository
+
+        def ping(self):
+            return "pong"
+
+    @Module(providers=[Service, Repository])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule, lazy=True)
+    factory = app.state.nidus
+    service = factory.container[Service]
+
+    assert built == []
+    assert isinstance(service, Service)
+    assert service.ping() == "pong"
+    # The repository proxy was injected but never used
+    assert built == ["service"]
+
+    report = factory.lazy_report()
+    assert report.materialized == (Service,)
+    assert report.unmaterialized == (Repository,)
+
+def test_concurrent_first_use_builds_once():
+    built = []
+    barrier = threading.Barrier(8)
+
+    class Expensive:
+        def __init__(self):
+            built.append(self)
+            self.value = 42
+
+    proxy = LazyProxy(Expensive, Expensive)
+    results = []
+
+    def use():
+        barrier.wait()
+        results.append(proxy.value)
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 8
+    assert len(built) == 1
+    assert is_materialized(proxy)
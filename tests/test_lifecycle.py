@@ -0,0 +1,233 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Injectable, Get
+
+def test_hooks_run_in_dependency_order():
+    events = []
+
+    @Injectable()
+    class Database:
+        async def on_module_init(self):
+            await asyncio.sleep(0.01)
+            events.append("database:init")
+
+        async def on_application_shutdown(self):
+            events.append("database:shutdown")
+
+    @Injectable()
+    class UsersService:
+        def __init__(self, database: Database):
+            self.database = database
+
+        def on_module_init(self):
+            events.append("users:init")
+
+        def on_application_bootstrap(self):
+            events.append("users:bootstrap")
+
+        async def on_application_shutdown(self):
+            events.append("users:shutdown")
+
+    @Controller()
+    class UsersController:
+        def __init__(self, users: UsersService):
+            self.users = users
+
+        def on_module_init(self):
+            events.append("controller:init")
+
+        @Get("/events")
+        def get_events(self):
+            return list(events)
+
+    @Module(controllers=[UsersController], providers=[UsersService, Database])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    assert events == []
+
+    with TestClient(app) as client:
+        assert client.get("/events").json() == ["database:init", "users:init", "controller:init", "users:bootstrap"]
+
+    assert events[-2:] == ["users:shutdown", "database:shutdown"]
+
+def test_independent_hooks_run_concurrently():
+    def make_provider(name):
+        async def on_module_init(self):
+            await asyncio.sleep(0.2)
+        return Injectable()(type(name, (), {"on_module_init": on_module_init}))
+
+    providers = [make_provider(f"Warmup{index}") for index in range(5)]
+
+    @Module(providers=providers)
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    start = time.perf_counter()
+    with TestClient(app):
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.8
+
+def test_hook_timeout_fails_startup():
+    events = []
+
+    @Injectable()
+    class FastService:
+        async def on_application_shutdown(self):
+            events.append("fast:shutdown")
+
+    @Injectable()
+    class SlowService:
+        def __init__(self, fast: FastService):
+            self.fast = fast
+
+        async def on_module_init(self):
+            await asyncio.sleep(5)
+
+    @Module(providers=[FastService, SlowService])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule, hook_timeout=0.05)
+
+    with pytest.raises(TimeoutError, match="SlowService.on_module_init"):
+        with TestClient(app):
+            pass
+
+    # Providers that were already initialized are still shut down
+    assert events == ["fast:shutdown"]
+
+def test_shutdown_errors_do_not_stop_other_hooks():
+    events = []
+
+    @Injectable()
+    class Cache:
+        def on_application_shutdown(self):
+            events.append("cache:shutdown")
+
+    @Injectable()
+    class Broken:
+        def __init__(self, cache: Cache):
+            self.cache = cache
+
+        def on_application_shutdown(self):
+            raise RuntimeError("boom")
+
+    @Module(providers=[Broken, Cache])
+    class AppModule:
+        pass
+
+    with TestClient(NidusFactory.create(AppModule)):
+        pass
+
+    assert events == ["cache:shutdown"]
+
+def test_unused_lazy_providers_are_skipped():
+    @Injectable(lazy=True)
+    class AdminService:
+        def __init__(self):
+            raise AssertionError("should not be built")
+
+        def on_module_init(self):
+            pass
+
+    @Module(providers=[AdminService])
+    class AppModule:
+        pass
+
+    with TestClient(NidusFactory.create(AppModule)):
+        pass
+
+def test_lazy_providers_used_after_startup_run_their_hooks():
+    events = []
+
+    @Injectable(lazy=True)
+    class AdminService:
+        def on_module_init(self):
+            events.append("admin:init")
+
+        def on_application_bootstrap(self):
+            events.append("admin:bootstrap")
+
+        def on_application_shutdown(self):
+            events.append("admin:shutdown")
+
+        def ping(self):
+            return "pong"
+
+    @Module(providers=[AdminService])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    with TestClient(app):
+        assert events == []
+        admin = app.state.nidus.resolve(AdminService)
+        assert admin.ping() == "pong"
+        assert events == ["admin:init", "admin:bootstrap"]
+        admin.ping()
+        assert events == ["admin:init", "admin:bootstrap"]
+
+    assert events == ["admin:init", "admin:bootstrap", "admin:shutdown"]
+
+def test_lazy_providers_with_async_init_hooks_are_built_at_startup():
+    events = []
+
+    @Injectable(lazy=True)
+    class Warmup:
+        async def on_module_init(self):
+            events.append("warmup:init")
+
+    @Module(providers=[Warmup])
+    class AppModule:
+        pass
+
+    with TestClient(NidusFactory.create(AppModule)):
+        assert events == ["warmup:init"]
+
+def test_lazy_providers_built_during_startup_run_their_hooks_in_phase_order():
+    events = []
+
+    @Injectable(lazy=True)
+    class Warmup:
+        async def on_module_init(self):
+            events.append("warmup:init")
+
+        def on_application_bootstrap(self):
+            events.append("warmup:bootstrap")
+
+    @Injectable(lazy=True)
+    class Settings:
+        def on_module_init(self):
+            events.append("settings:init")
+
+        def on_application_bootstrap(self):
+            events.append("settings:bootstrap")
+
+        def get(self):
+            return 1
+
+    @Injectable()
+    class Consumer:
+        def __init__(self, settings: Settings):
+            self.settings = settings
+
+        def on_module_init(self):
+            # Builds Settings, whose layer has already been initialized
+            events.append(f"consumer:init:{self.settings.get()}")
+
+    @Module(providers=[Warmup, Settings, Consumer])
+    class AppModule:
+        pass
+
+    with TestClient(NidusFactory.create(AppModule)):
+        pass
+
+    assert events.index("warmup:init") < events.index("warmup:bootstrap")
+    assert events.index("settings:init") < events.index("consumer:init:1") < events.index("settings:bootstrap")
+    assert events.count("settings:init") == 1 and events.count("settings:bootstrap") == 1
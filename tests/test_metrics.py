@@ -0,0 +1,158 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from pynidus import NidusFactory, Module, Controller, Get, Post, Injectable, Transactional, MetricsModule, MetricsRegistry
+from pynidus.core.metrics import current_metrics, disable_metrics, enable_metrics
+from pynidus.db import Database, DatabaseConfig, PoolOptions
+from pynidus.db.transaction_manager import SQLAlchemyTransactionManager
+
+@pytest.fixture
+def metrics():
+    registry = MetricsRegistry(buckets=(0.01, 0.1, 1))
+    enable_metrics(registry)
+    yield registry
+    disable_metrics(registry)
+
+def test_histogram_buckets_and_rendering():
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    histogram = registry.histogram("jobs_seconds", "Job durations.", ("queue",))
+    child = histogram.labels("mail")
+    for value in (0.05, 0.1, 0.5, 3):
+        child.observe(value)
+
+    assert child.cumulative_counts() == [2, 3, 4]
+    assert registry.histogram("jobs_seconds", "Job durations.", ("queue",)) is histogram
+    with pytest.raises(ValueError, match="already registered"):
+        registry.histogram("jobs_seconds", "Job durations.", ("kind",))
+    with pytest.raises(ValueError, match="expects labels queue"):
+        histogram.labels()
+
+    lines = registry.render().splitlines()
+    assert "# TYPE jobs_seconds histogram" in lines
+    assert 'jobs_seconds_bucket{queue="mail",le="0.1"} 2' in lines
+    assert 'jobs_seconds_bucket{queue="mail",le="+Inf"} 4' in lines
+    assert 'jobs_seconds_sum{queue="mail"} 3.65' in lines
+    assert 'jobs_seconds_count{queue="mail"} 4' in lines
+
+def test_retry_series_use_attempt_buckets():
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    registry.transaction_attempts.labels("Service.work", "recovered").observe(2)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE nidus_transaction_retry_backoff_seconds histogram" in lines
+    assert 'nidus_transaction_attempts_bucket{function="Service.work",outcome="recovered",le="2.0"} 1' in lines
+    assert 'nidus_transaction_attempts_bucket{function="Service.work",outcome="recovered",le="10.0"} 1' in lines
+
+def test_subscribers_receive_observations():
+    registry = MetricsRegistry()
+    received = []
+    unsubscribe = registry.subscribe(lambda histogram, labels, value: received.append((histogram.name, labels, value)))
+
+    registry.transaction_commit.observe(0.5)
+    unsubscribe()
+    registry.transaction_commit.observe(0.7)
+
+    assert received == [("nidus_transaction_duration_seconds", ("commit",), 0.5)]
+
+def test_metrics_module_records_requests_and_providers():
+    @Injectable()
+    class GreetingService:
+        def greet(self, name: str) -> str:
+            return f"Hello {name}"
+
+    @Controller("/greetings")
+    class GreetingController:
+        def __init__(self, service: GreetingService):
+            self.service = service
+
+        @Get("/{name}")
+        def show(self, name: str):
+            return {"message": self.service.greet(name)}
+
+        @Post("/")
+        async def create(self):
+            return {}
+
+    @Module(imports=[MetricsModule.for_root()], controllers=[GreetingController], providers=[GreetingService])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    registry = app.state.nidus.container[MetricsRegistry]
+    try:
+        with TestClient(app) as client:
+            assert current_metrics() is registry
+            client.get("/greetings/ada")
+            client.get("/greetings/bob")
+            client.post("/greetings/")
+            body = client.get("/metrics").text
+        assert current_metrics() is None
+    finally:
+        disable_metrics(registry)
+
+    assert 'nidus_request_duration_seconds_count{method="GET",route="/greetings/{name}",handler="GreetingController.show"} 2' in body
+    assert 'nidus_request_duration_seconds_count{method="POST",route="/greetings/",handler="GreetingController.create"} 1' in body
+    assert 'nidus_provider_construction_seconds_count{provider="GreetingService"} 1' in body
+
+def test_metrics_are_bound_to_their_application():
+    @Injectable()
+    class ClockService:
+        def now(self) -> int:
+            return 0
+
+    @Controller("/clock")
+    class ClockController:
+        def __init__(self, service: ClockService):
+            self.service = service
+
+        @Get("/")
+        def show(self):
+            return {"now": self.service.now()}
+
+    @Module(imports=[MetricsModule.for_root()], controllers=[ClockController], providers=[ClockService])
+    class MeasuredModule:
+        pass
+
+    @Module(controllers=[ClockController], providers=[ClockService])
+    class PlainModule:
+        pass
+
+    measured = NidusFactory.create(MeasuredModule, lazy=True)
+    plain = NidusFactory.create(PlainModule, lazy=True)
+    registry = measured.state.nidus.container[MetricsRegistry]
+    try:
+        with TestClient(measured) as measured_client, TestClient(plain) as plain_client:
+            measured_client.get("/clock/")
+            plain_client.get("/clock/")
+            plain_client.get("/clock/")
+            body = measured_client.get("/metrics").text
+    finally:
+        disable_metrics(registry)
+
+    assert 'nidus_request_duration_seconds_count{method="GET",route="/clock/",handler="ClockController.show"} 1' in body
+    assert 'nidus_provider_construction_seconds_count{provider="ClockService"} 1' in body
+
+def test_transactions_and_pool_waits_are_recorded(tmp_path, metrics):
+    database = Database(DatabaseConfig(f"sqlite:///{tmp_path}/metrics.db", pool=PoolOptions(size=1)), name="main")
+
+    class AccountService:
+        def __init__(self):
+            self.transaction_manager = SQLAlchemyTransactionManager(database.session())
+
+        @Transactional()
+        def balance(self):
+            return self.transaction_manager.session.execute(text("SELECT 1")).scalar()
+
+        @Transactional()
+        def fail(self):
+            raise RuntimeError("declined")
+
+    service = AccountService()
+    assert service.balance() == 1
+    with pytest.raises(RuntimeError):
+        service.fail()
+
+    phases = {child.label_values[0]: child.count for child in metrics.transaction_duration.children.values()}
+    assert phases == {"begin": 2, "commit": 1, "rollback": 1}
+    assert metrics.pool_wait.labels("main").count >= 1
+    database.engine.dispose()
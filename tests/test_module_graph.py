@@ -0,0 +1,137 @@
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Injectable, Get, CircularDependencyError
+from pynidus.core.module_graph import ModuleGraph
+
+def build_diamond():
+    @Injectable()
+    class DatabaseService:
+        pass
+
+    @Controller("/health")
+    class HealthController:
+        @Get("/")
+        def health(self):
+            return {"status": "ok"}
+
+    @Module(controllers=[HealthController], providers=[DatabaseService], exports=[DatabaseService])
+    class DatabaseModule:
+        pass
+
+    @Injectable()
+    class UsersService:
+        def __init__(self, database: DatabaseService):
+            self.database = database
+
+    @Module(imports=[DatabaseModule], providers=[UsersService], exports=[UsersService])
+    class UsersModule:
+        pass
+
+    @Injectable()
+    class OrdersService:
+        def __init__(self, database: DatabaseService):
+            self.database = database
+
+    @Module(imports=[DatabaseModule], providers=[OrdersService])
+    class OrdersModule:
+        pass
+
+    @Module(imports=[UsersModule, OrdersModule])
+    class AppModule:
+        pass
+
+    return AppModule, DatabaseModule, UsersModule, OrdersModule, DatabaseService, UsersService
+
+def test_shared_module_is_processed_once():
+    AppModule, *_ = build_diamond()
+
+    app = NidusFactory.create(AppModule)
+    health_routes = [route for route in app.routes if getattr(route, "path", None) == "/health/"]
+    assert len(health_routes) == 1
+
+    client = TestClient(app)
+    assert client.get("/health/").json() == {"status": "ok"}
+
+def test_graph_visits_distinct_modules():
+    AppModule, DatabaseModule, UsersModule, OrdersModule, *_ = build_diamond()
+
+    graph = ModuleGraph(AppModule)
+
+    assert list(graph.nodes) == [DatabaseModule, UsersModule, OrdersModule, AppModule]
+    assert graph.node(OrdersModule).imports == (graph.node(DatabaseModule),)
+
+def test_graph_tracks_visible_exports():
+    AppModule, DatabaseModule, UsersModule, OrdersModule, DatabaseService, UsersService = build_diamond()
+
+    graph = ModuleGraph(AppModule)
+
+    assert DatabaseService in graph.visible_to(UsersModule)
+    assert UsersService in graph.visible_to(AppModule)
+    assert DatabaseService not in graph.visible_to(AppModule)
+
+def test_reexported_module_exposes_its_exports():
+    @Injectable()
+    class SharedService:
+        pass
+
+    @Module(providers=[SharedService], exports=[SharedService])
+    class SharedModule:
+        pass
+
+    @Module(imports=[SharedModule], exports=[SharedModule])
+    class CommonModule:
+        pass
+
+    @Module(imports=[CommonModule])
+    class AppModule:
+        pass
+
+    graph = ModuleGraph(AppModule)
+    assert SharedService in graph.visible_to(AppModule)
+
+def test_dependencies_on_unexported_providers_are_rejected():
+    @Injectable()
+    class SecretService:
+        pass
+
+    @Module(providers=[SecretService])
+    class SecretModule:
+        pass
+
+    @Injectable()
+    class ReportService:
+        def __init__(self, secret: SecretService):
+            self.secret = secret
+
+    @Module(imports=[SecretModule], providers=[ReportService])
+    class AppModule:
+        pass
+
+    with pytest.raises(ValueError, match="ReportService in AppModule depends on SecretService, which is not visible there"):
+        NidusFactory.compile(AppModule)
+
+    @Controller("/reports")
+    class ReportController:
+        def __init__(self, secret: SecretService):
+            self.secret = secret
+
+    @Module(imports=[SecretModule], controllers=[ReportController])
+    class ControllerModule:
+        pass
+
+    with pytest.raises(ValueError, match="SecretModule must export it"):
+        NidusFactory.compile(ControllerModule)
+
+def test_import_cycle_is_reported():
+    @Module()
+    class AModule:
+        pass
+
+    @Module(imports=[AModule])
+    class BModule:
+        pass
+
+    AModule.__module_metadata__.imports.append(BModule)
+
+    with pytest.raises(CircularDependencyError, match="AModule -> BModule -> AModule"):
+        ModuleGraph(AModule)
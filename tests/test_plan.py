@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Injectable, Get, ApplicationPlan, CircularDependencyError
+from pynidus.core.plan import resolve_dependencies
+
+def test_compile_orders_dependencies_first():
+    @Injectable()
+    class Config:
+        pass
+
+    @Injectable()
+    class Repository:
+        def __init__(self, config: Config):
+            self.config = config
+
+    @Injectable()
+    class Service:
+        def __init__(self, repository: Repository, config: Config):
+            self.repository = repository
+
+    @Module(providers=[Service, Repository, Config])
+    class AppModule:
+        pass
+
+    plan = NidusFactory.compile(AppModule)
+
+    assert isinstance(plan, ApplicationPlan)
+    assert [provider.token for provider in plan.providers] == [Config, Repository, Service]
+    assert plan.providers[2].dependencies == (Repository, Config)
+
+def test_plan_is_frozen_and_reusable():
+    @Injectable()
+    class AppService:
+        def get_hello(self) -> str:
+            return "Hello Plan!"
+
+    @Controller()
+    class AppController:
+        def __init__(self, app_service: AppService):
+            self.app_service = app_service
+
+        @Get("/hello")
+        def get_hello(self):
+            return {"message": self.app_service.get_hello()}
+
+    @Module(controllers=[AppController], providers=[AppService])
+    class AppModule:
+        pass
+
+    plan = NidusFactory.compile(AppModule)
+
+    with pytest.raises(AttributeError):
+        plan.providers = ()
+
+    for _ in range(2):
+        client = TestClient(NidusFactory.create(plan))
+        assert client.get("/hello").json() == {"message": "Hello Plan!"}
+
+def test_compile_includes_unlisted_dependencies():
+    class Clock:
+        pass
+
+    @Injectable()
+    class Service:
+        def __init__(self, clock: Clock):
+            self.clock = clock
+
+    @Module(providers=[Service])
+    class AppModule:
+        pass
+
+    plan = NidusFactory.compile(AppModule)
+    assert [provider.token for provider in plan.providers] == [Clock, Service]
+
+def test_circular_dependency_reports_path():
+    class A:
+        def __init__(self, b: "B"):
+            pass
+
+    class B:
+        def __init__(self, c: "C"):
+            pass
+
+    class C:
+        def __init__(self, a: A):
+            pass
+
+    # Resolve the forward references by hand, as they live in a local scope
+    A.__init__.__annotations__["b"] = B
+    B.__init__.__annotations__["c"] = C
+
+    @Module(providers=[A])
+    class AppModule:
+        pass
+
+    with pytest.raises(CircularDependencyError, match="A -> B -> C -> A") as exc_info:
+        NidusFactory.compile(AppModule)
+
+    assert exc_info.value.path == [A, B, C, A]
+
+def test_resolve_dependencies_is_cached():
+    class Dependency:
+        pass
+
+    class Service:
+        def __init__(self, dependency: Dependency):
+            pass
+
+    assert resolve_dependencies(Service) is resolve_dependencies(Service)
@@ -0,0 +1,85 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Get, Injectable, ProfilingModule, Profiler
+from pynidus.core.profiling import current_profiler, disable_profiler
+
+def burn(seconds: float):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+@Injectable()
+class ReportService:
+    def build(self):
+        return burn(0.05)
+
+@Controller("/reports")
+class ReportController:
+    def __init__(self, service: ReportService):
+        self.service = service
+
+    @Get("/sync")
+    def sync_report(self):
+        return {"total": self.service.build()}
+
+    @Get("/async")
+    async def async_report(self):
+        return {"total": burn(0.05)}
+
+def application(lazy=False, **options):
+    @Module(imports=[ProfilingModule.for_root(**options)], controllers=[ReportController], providers=[ReportService])
+    class AppModule:
+        pass
+
+    return NidusFactory.create(AppModule, lazy=lazy)
+
+def test_sampling_decision():
+    profiler = Profiler(sample_every=3, header="X-Profile")
+    assert [profiler.should_sample({"headers": []}) for _ in range(6)] == [False, False, True, False, False, True]
+    assert profiler.should_sample({"headers": [(b"x-profile", b"1")]})
+
+    header_only = Profiler(sample_every=0)
+    assert not header_only.should_sample({"headers": []})
+    assert header_only.should_sample({"headers": [(b"x-nidus-profile", b"1")]})
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_sampled_requests_are_aggregated_per_handler(lazy):
+    app = application(lazy, sample_every=0)
+    profiler = app.state.nidus.container[Profiler]
+    try:
+        with TestClient(app) as client:
+            assert current_profiler() is profiler
+            client.get("/reports/sync")
+            assert profiler.requests == {}
+
+            client.get("/reports/sync", headers={"x-nidus-profile": "1"})
+            client.get("/reports/async", headers={"x-nidus-profile": "1"})
+
+            collapsed = client.get("/_profile").text
+            sync_only = client.get("/_profile", params={"handler": "ReportController.sync_report"}).text
+            assert client.delete("/_profile").status_code == 204
+            assert client.get("/_profile").text == ""
+    finally:
+        disable_profiler(profiler)
+
+    assert profiler.requests == {}
+    lines = collapsed.splitlines()
+    assert any(line.startswith("ReportController.sync_report;test_profiling.ReportService.build;test_profiling.burn ") for line in lines)
+    assert any(line.startswith("ReportController.async_report;test_profiling.burn ") for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+    assert sync_only and all(line.startswith("ReportController.sync_report;") for line in sync_only.splitlines())
+
+def test_sampler_thread_stops_at_shutdown():
+    app = application(header=None, sample_every=1)
+    profiler = app.state.nidus.container[Profiler]
+    try:
+        with TestClient(app) as client:
+            client.get("/reports/async")
+            assert profiler.requests == {"ReportController.async_report": 1}
+        assert profiler._thread is None
+        assert current_profiler() is None
+    finally:
+        disable_profiler(profiler)
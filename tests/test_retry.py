@@ -0,0 +1,193 @@
+import sqlite3
+import threading
+import pytest
+from unittest.mock import Mock
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from pynidus import Transactional, RetryPolicy, MetricsRegistry
+from pynidus.core.metrics import disable_metrics, enable_metrics
+from pynidus.common.retry import is_retryable_error
+from pynidus.db import Database, DatabaseConfig
+from pynidus.db.transaction_manager import SQLAlchemyTransactionManager
+
+class RetryBase(DeclarativeBase):
+    pass
+
+class Counter(RetryBase):
+    __tablename__ = "counters"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    value: Mapped[int]
+
+class DriverError(Exception):
+    def __init__(self, *args, sqlstate=None):
+        super().__init__(*args)
+        self.sqlstate = sqlstate
+
+def operational(*args, **kwargs):
+    return OperationalError("UPDATE", {}, DriverError(*args, **kwargs))
+
+def test_contention_errors_are_classified():
+    assert is_retryable_error(operational("database is locked"))
+    assert is_retryable_error(operational("could not serialize access", sqlstate="40001"))
+    assert is_retryable_error(operational("deadlock detected", sqlstate="40P01"))
+    assert is_retryable_error(operational(1213, "Deadlock found when trying to get lock"))
+    assert is_retryable_error(operational(1205, "Lock wait timeout exceeded"))
+
+    assert not is_retryable_error(operational("no such table: users"))
+    assert not is_retryable_error(IntegrityError("INSERT", {}, DriverError("UNIQUE constraint failed")))
+    assert not is_retryable_error(ValueError("database is locked"))
+
+class FlakyService:
+    def __init__(self, failures, error):
+        self.transaction_manager = Mock(spec=["begin", "commit", "rollback"])
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def attempt(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return self.calls
+
+def test_retry_reruns_in_fresh_transaction():
+    policy = RetryPolicy(max_attempts=3, backoff=0)
+
+    class Service(FlakyService):
+        @Transactional(retry=policy)
+        def work(self):
+            return self.attempt()
+
+    service = Service(2, operational("database is locked"))
+
+    assert service.work() == 3
+    assert service.transaction_manager.begin.call_count == 3
+    assert service.transaction_manager.rollback.call_count == 2
+    assert policy.stats.retries == 2
+    assert policy.stats.recovered == 1
+    assert policy.stats.by_function == {"test_retry_reruns_in_fresh_transaction.<locals>.Service.work": 2}
+
+def test_retry_gives_up():
+    policy = RetryPolicy(max_attempts=2, backoff=0)
+
+    class Service(FlakyService):
+        @Transactional(retry=policy)
+        def work(self):
+            return self.attempt()
+
+    service = Service(5, operational("database is locked"))
+    with pytest.raises(OperationalError):
+        service.work()
+    assert service.calls == 2
+    assert policy.stats.exhausted == 1
+
+def test_retries_are_recorded_in_metrics():
+    policy = RetryPolicy(max_attempts=3, backoff=0)
+
+    class Service(FlakyService):
+        @Transactional(retry=policy)
+        def work(self):
+            return self.attempt()
+
+    registry = MetricsRegistry()
+    enable_metrics(registry)
+    try:
+        Service(1, operational("database is locked")).work()
+        with pytest.raises(OperationalError):
+            Service(5, operational("database is locked")).work()
+    finally:
+        disable_metrics(registry)
+
+    name = "test_retries_are_recorded_in_metrics.<locals>.Service.work"
+    assert registry.transaction_retry_backoff.labels(name).count == 3
+    recovered = registry.transaction_attempts.labels(name, "recovered")
+    exhausted = registry.transaction_attempts.labels(name, "exhausted")
+    assert (recovered.count, recovered.sum) == (1, 2)
+    assert (exhausted.count, exhausted.sum) == (1, 3)
+
+def test_non_retryable_errors_are_raised_immediately():
+    policy = RetryPolicy(max_attempts=5, backoff=0)
+
+    class Service(FlakyService):
+        @Transactional(retry=policy)
+        def work(self):
+            return self.attempt()
+
+    service = Service(1, ValueError("bad input"))
+    with pytest.raises(ValueError):
+        service.work()
+    assert service.calls == 1
+    assert policy.stats.retries == 0
+
+def test_custom_retry_on():
+    policy = RetryPolicy(max_attempts=2, backoff=0, retry_on=TimeoutError)
+
+    class Service(FlakyService):
+        @Transactional(retry=policy)
+        def work(self):
+            return self.attempt()
+
+    assert Service(1, TimeoutError()).work() == 2
+
+def test_joined_calls_are_not_retried():
+    policy = RetryPolicy(max_attempts=3, backoff=0)
+
+    class Service(FlakyService):
+        @Transactional(retry=policy)
+        def work(self):
+            return self.attempt()
+
+    service = Service(1, operational("database is locked"))
+    service.transaction_manager = Mock()
+    service.transaction_manager.in_transaction.return_value = True
+    with pytest.raises(OperationalError):
+        service.work()
+    assert service.calls == 1
+
+@pytest.mark.asyncio
+async def test_async_retry():
+    policy = RetryPolicy(max_attempts=3, backoff=0.001)
+
+    class Service(FlakyService):
+        @Transactional(retry=policy)
+        async def work(self):
+            return self.attempt()
+
+    service = Service(1, operational("deadlock detected", sqlstate="40P01"))
+    assert await service.work() == 2
+    assert policy.stats.retries == 1
+
+def test_sqlite_lock_is_retried(tmp_path):
+    path = tmp_path / "locked.db"
+    database = Database(DatabaseConfig(f"sqlite:///{path}", connect_args={"timeout": 0}))
+    RetryBase.metadata.create_all(database.engine)
+
+    # Another writer holds the lock for a moment
+    blocker = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(0.1, blocker.execute, args=("COMMIT",))
+    release.start()
+
+    policy = RetryPolicy(max_attempts=20, backoff=0.02, max_backoff=0.05)
+
+    class CounterService:
+        def __init__(self):
+            self.session = database.session()
+            self.transaction_manager = SQLAlchemyTransactionManager(self.session)
+
+        @Transactional(retry=policy)
+        def increment(self):
+            self.session.add(Counter(value=1))
+            self.session.flush()
+
+    service = CounterService()
+    try:
+        service.increment()
+    finally:
+        release.join()
+        blocker.close()
+
+    assert policy.stats.retries >= 1
+    with database.session() as session:
+        assert session.execute(select(Counter.value)).scalars().all() == [1]
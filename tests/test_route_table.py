@@ -0,0 +1,123 @@
+import functools
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Get, Post, Delete
+
+def logged(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+def test_route_table_is_collected_at_decoration():
+    @Controller("/items")
+    class ItemsController:
+        @Get("/")
+        def list_items(self):
+            return []
+
+        @Post("/")
+        def create_item(self):
+            return {}
+
+        def helper(self):
+            pass
+
+    table = ItemsController.__route_table__
+    assert [(name, route.method, route.path) for name, route in table] == [
+        ("list_items", "GET", "/"),
+        ("create_item", "POST", "/"),
+    ]
+
+def test_inherited_routes_and_overrides():
+    class BaseController:
+        @Get("/health")
+        def health(self):
+            return {"status": "base"}
+
+        @Get("/version")
+        def version(self):
+            return {"version": 1}
+
+        @Delete("/cache")
+        def clear_cache(self):
+            return {}
+
+    @Controller("/api")
+    class ApiController(BaseController):
+        @Get("/health")
+        def health(self):
+            return {"status": "api"}
+
+        def clear_cache(self):
+            # Overridden without a route: no longer exposed
+            return {}
+
+    @Module(controllers=[ApiController])
+    class AppModule:
+        pass
+
+    assert [name for name, _ in ApiController.__route_table__] == ["health", "version"]
+
+    client = TestClient(NidusFactory.create(AppModule))
+    assert client.get("/api/health").json() == {"status": "api"}
+    assert client.get("/api/version").json() == {"version": 1}
+    assert client.delete("/api/cache").status_code == 404
+
+def test_duplicate_routes_are_rejected():
+    with pytest.raises(ValueError, match="Route GET /a is defined by both Conflicting.first and Conflicting.second"):
+        @Controller()
+        class Conflicting:
+            @Get("/a")
+            def first(self):
+                pass
+
+            @Get("/a")
+            def second(self):
+                pass
+
+def test_decorator_stacking_order_does_not_matter():
+    @Controller()
+    class StackedController:
+        @logged
+        @Get("/inner")
+        def inner(self):
+            return "inner"
+
+        @Get("/outer")
+        @logged
+        def outer(self):
+            return "outer"
+
+        @Get("/both")
+        @Post("/both")
+        def both(self):
+            return "both"
+
+    @Module(controllers=[StackedController])
+    class AppModule:
+        pass
+
+    client = TestClient(NidusFactory.create(AppModule))
+    assert client.get("/inner").json() == "inner"
+    assert client.get("/outer").json() == "outer"
+    assert client.get("/both").json() == "both"
+    assert client.post("/both").json() == "both"
+
+def test_registration_does_not_scan_instance_attributes():
+    @Controller()
+    class PropertyController:
+        @property
+        def expensive(self):
+            raise AssertionError("attributes should not be evaluated during registration")
+
+        @Get("/")
+        def index(self):
+            return "ok"
+
+    @Module(controllers=[PropertyController])
+    class AppModule:
+        pass
+
+    client = TestClient(NidusFactory.create(AppModule))
+    assert client.get("/").json() == "ok"
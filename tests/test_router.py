@@ -0,0 +1,130 @@
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Get, Post
+from pynidus.core.router import RadixRouter, RadixTree
+
+def build_app():
+    @Controller("/users")
+    class UsersController:
+        @Get("/")
+        def list_users(self):
+            return ["alice", "bob"]
+
+        @Get("/me")
+        def me(self):
+            return {"id": "me"}
+
+        @Get("/{user_id}")
+        def get_user(self, user_id: int):
+            return {"id": user_id}
+
+        @Post("/{user_id}")
+        def update_user(self, user_id: int):
+            return {"updated": user_id}
+
+        @Get("/{user_id}/posts/{slug}")
+        def get_post(self, user_id: int, slug: str):
+            return {"user": user_id, "slug": slug}
+
+    @Module(controllers=[UsersController])
+    class AppModule:
+        pass
+
+    return NidusFactory.create(AppModule, router="radix")
+
+def test_radix_router_dispatches_routes():
+    app = build_app()
+    assert isinstance(app.router.middleware_stack, RadixRouter)
+
+    client = TestClient(app)
+    assert client.get("/users/").json() == ["alice", "bob"]
+    assert client.get("/users/me").json() == {"id": "me"}
+    assert client.get("/users/42").json() == {"id": 42}
+    assert client.post("/users/42").json() == {"updated": 42}
+    assert client.get("/users/7/posts/hello").json() == {"user": 7, "slug": "hello"}
+
+def test_radix_router_falls_back_for_unmatched_requests():
+    client = TestClient(build_app())
+
+    assert client.get("/missing").status_code == 404
+    assert client.delete("/users/1").status_code == 405
+    assert client.get("/openapi.json").status_code == 200
+
+def test_openapi_is_unchanged():
+    paths = build_app().openapi()["paths"]
+
+    assert "/users/{user_id}" in paths
+    assert set(paths["/users/{user_id}"]) == {"get", "post"}
+
+def test_routes_added_later_are_indexed():
+    app = build_app()
+
+    @app.get("/late")
+    def late():
+        return {"late": True}
+
+    client = TestClient(app)
+    assert client.get("/late").json() == {"late": True}
+    assert app.router.middleware_stack.tree.match("GET", "/late") is not None
+
+def test_typed_segments():
+    from starlette.routing import Route
+
+    def endpoint(request):
+        pass
+
+    tree = RadixTree()
+    tree.insert(Route("/items/{item_id:int}", endpoint, methods=["GET"]))
+    tree.insert(Route("/items/{name:str}", endpoint, methods=["GET"]))
+    tree.insert(Route("/files/{file_path:path}", endpoint, methods=["GET"]))
+
+    route, params = tree.match("GET", "/items/12")
+    assert params == {"item_id": 12}
+
+    route, params = tree.match("GET", "/items/abc")
+    assert params == {"name": "abc"}
+
+    # Path parameters are left to Starlette
+    assert tree.match("GET", "/files/a/b") is None
+
+def test_first_registered_route_wins():
+    from starlette.routing import Route
+
+    def endpoint(request):
+        pass
+
+    tree = RadixTree()
+    by_id = Route("/items/{item_id:int}", endpoint, methods=["GET"])
+    first = Route("/items/1", endpoint, methods=["GET"])
+    latest = Route("/items/latest", endpoint, methods=["GET"])
+    by_name = Route("/items/{name:str}", endpoint, methods=["GET"])
+    for route in (by_id, first, latest, by_name):
+        tree.insert(route)
+
+    assert tree.match("GET", "/items/1") == (by_id, {"item_id": 1})
+    assert tree.match("GET", "/items/latest") == (latest, {})
+    assert tree.match("GET", "/items/other") == (by_name, {"name": "other"})
+
+def test_routes_after_a_path_route_are_left_to_starlette():
+    app = build_app()
+
+    @app.get("/files/{file_path:path}")
+    def files(file_path: str):
+        return {"file": file_path}
+
+    @app.get("/files/readme")
+    def readme():
+        return {"readme": True}
+
+    client = TestClient(app)
+    assert client.get("/files/readme").json() == {"file": "readme"}
+    assert app.router.middleware_stack.tree.match("GET", "/files/readme") is None
+    assert app.router.middleware_stack.tree.match("GET", "/users/me") is not None
+
+def test_unknown_router_is_rejected():
+    @Module()
+    class AppModule:
+        pass
+
+    with pytest.raises(ValueError, match="Unknown router"):
+        NidusFactory.create(AppModule, router="trie")
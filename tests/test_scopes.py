@@ -0,0 +1,147 @@
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Injectable, Get
+from pynidus.core.scope import Scope, RequestContext
+
+def test_request_scoped_provider_is_shared_within_a_request():
+    @Injectable(scope="request")
+    class RequestState:
+        count = 0
+
+        def __init__(self):
+            RequestState.count += 1
+            self.id = RequestState.count
+
+    @Injectable()
+    class AuditService:
+        def __init__(self, state: RequestState):
+            self.state = state
+
+    @Controller("/state")
+    class StateController:
+        def __init__(self, state: RequestState, audit: AuditService):
+            self.state = state
+            self.audit = audit
+
+        @Get("/")
+        def get_state(self):
+            return {"id": self.state.id, "same": self.audit.state is self.state}
+
+        @Get("/async")
+        async def get_state_async(self):
+            return {"id": self.state.id}
+
+    @Module(controllers=[StateController], providers=[RequestState, AuditService])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    client = TestClient(app)
+
+    assert client.get("/state/").json() == {"id": 1, "same": True}
+    assert client.get("/state/").json() == {"id": 2, "same": True}
+    assert client.get("/state/async").json() == {"id": 3}
+
+    # The singleton depending on request state was promoted to the request scope
+    assert app.state.nidus.plans[AuditService].scope == Scope.REQUEST
+
+def test_transient_provider_is_built_per_injection():
+    @Injectable(scope="transient")
+    class Builder:
+        pass
+
+    @Injectable()
+    class First:
+        def __init__(self, builder: Builder):
+            self.builder = builder
+
+    @Injectable()
+    class Second:
+        def __init__(self, builder: Builder):
+            self.builder = builder
+
+    @Module(providers=[First, Second, Builder])
+    class AppModule:
+        pass
+
+    factory = NidusFactory.create(AppModule).state.nidus
+
+    assert factory.resolve(First).builder is not factory.resolve(Second).builder
+    assert factory.resolve(Builder) is not factory.resolve(Builder)
+
+def test_pooled_transient_instances_are_recycled():
+    @Injectable(scope="transient", pool_size=2)
+    class Buffer:
+        def __init__(self):
+            self.data = []
+
+        def on_recycle(self):
+            self.data.clear()
+
+    @Controller("/buffer")
+    class BufferController:
+        def __init__(self, buffer: Buffer):
+            self.buffer = buffer
+
+        @Get("/")
+        def fill(self):
+            self.buffer.data.append(1)
+            return {"size": len(self.buffer.data), "id": id(self.buffer)}
+
+    @Module(controllers=[BufferController], providers=[Buffer])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    client = TestClient(app)
+
+    first = client.get("/buffer/").json()
+    second = client.get("/buffer/").json()
+
+    assert first["size"] == second["size"] == 1
+    assert first["id"] == second["id"]
+
+    pool = app.state.nidus.pools[Buffer]
+    assert pool.created == 1
+    assert pool.reused == 1
+
+def test_request_scope_requires_context():
+    @Injectable(scope="request")
+    class RequestState:
+        pass
+
+    @Module(providers=[RequestState])
+    class AppModule:
+        pass
+
+    factory = NidusFactory.create(AppModule).state.nidus
+
+    with pytest.raises(RuntimeError, match="request scoped"):
+        factory.resolve(RequestState)
+
+    context = RequestContext()
+    assert factory.resolve(RequestState, context) is factory.resolve(RequestState, context)
+
+def test_invalid_scope_options():
+    with pytest.raises(ValueError, match="Unknown scope"):
+        Injectable(scope="session")
+
+    with pytest.raises(ValueError, match="pool_size"):
+        Injectable(pool_size=4)
+
+def test_pooled_provider_cannot_depend_on_request_scope():
+    @Injectable(scope="request")
+    class RequestState:
+        pass
+
+    @Injectable(scope="transient", pool_size=2)
+    class Worker:
+        def __init__(self, state: RequestState):
+            self.state = state
+
+    @Module(providers=[Worker])
+    class AppModule:
+        pass
+
+    with pytest.raises(ValueError, match="cannot depend on request-scoped"):
+        NidusFactory.compile(AppModule)
@@ -0,0 +1,127 @@
+import datetime
+import decimal
+import enum
+import json
+import uuid
+from typing import List, Optional
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy import ForeignKey, JSON
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from pynidus import NidusFactory, Module, Controller, Get
+from pynidus.db import compile_serializer
+
+class SerializerBase(DeclarativeBase):
+    pass
+
+class Status(enum.Enum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+class Customer(SerializerBase):
+    __tablename__ = "customers"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+class Invoice(SerializerBase):
+    __tablename__ = "invoices"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    reference: Mapped[uuid.UUID]
+    total: Mapped[decimal.Decimal]
+    issued_at: Mapped[datetime.datetime]
+    due: Mapped[Optional[datetime.date]]
+    status: Mapped[Status]
+    paid: Mapped[bool]
+    extra: Mapped[Optional[dict]] = mapped_column(JSON)
+    customer_id: Mapped[Optional[int]] = mapped_column(ForeignKey("customers.id"))
+    customer: Mapped[Optional[Customer]] = relationship()
+    lines: Mapped[List["Line"]] = relationship()
+
+class Line(SerializerBase):
+    __tablename__ = "lines"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    invoice_id: Mapped[int] = mapped_column(ForeignKey("invoices.id"))
+    label: Mapped[str]
+
+def invoice(id: int, **values) -> Invoice:
+    defaults = dict(
+        reference=uuid.UUID(int=id),
+        total=decimal.Decimal("12.50"),
+        issued_at=datetime.datetime(2024, 5, 1, 12, 30),
+        due=None,
+        status=Status.OPEN,
+        paid=False,
+        extra={"tags": ["a"]},
+    )
+    defaults.update(values)
+    return Invoice(id=id, **defaults)
+
+def test_serializer_matches_jsonable_encoder():
+    entity = invoice(1, due=datetime.date(2024, 6, 1), customer_id=None)
+    serialized = compile_serializer(Invoice)(entity)
+
+    assert serialized == {
+        "id": 1,
+        "reference": "00000000-0000-0000-0000-000000000001",
+        "total": 12.5,
+        "issued_at": "2024-05-01T12:30:00",
+        "due": "2024-06-01",
+        "status": "open",
+        "paid": False,
+        "extra": {"tags": ["a"]},
+        "customer_id": None,
+    }
+    expected = jsonable_encoder(entity)
+    assert {key: serialized[key] for key in expected} == expected
+
+def test_relationships_are_opt_in():
+    entity = invoice(2, customer=Customer(id=5, name="Ada"), lines=[Line(id=1, label="tea"), Line(id=2, label="cake")])
+
+    serialized = compile_serializer(Invoice, relationships=["customer", "lines"], exclude=["extra"])(entity)
+    assert serialized["customer"] == {"id": 5, "name": "Ada"}
+    assert [line["label"] for line in serialized["lines"]] == ["tea", "cake"]
+    assert "extra" not in serialized
+
+    assert compile_serializer(Invoice) is compile_serializer(Invoice)
+    with pytest.raises(ValueError, match="has no relationship 'owner'"):
+        compile_serializer(Invoice, relationships=["owner"])
+    with pytest.raises(ValueError, match="is not a mapped class"):
+        compile_serializer(dict)
+
+def test_controllers_return_encoded_entities():
+    @Controller("/invoices")
+    class InvoiceController:
+        @Get("/")
+        def index(self) -> List[Invoice]:
+            return [invoice(id) for id in range(3)]
+
+        @Get("/{id}")
+        async def show(self, id: int) -> Optional[Invoice]:
+            return invoice(id) if id > 0 else None
+
+        @Get("/{id}/full", serialize=compile_serializer(Invoice, relationships=["customer"]))
+        def full(self, id: int):
+            return invoice(id, customer=Customer(id=1, name="Ada"))
+
+        @Get("/{id}/customer", serialize=Customer)
+        def customer(self, id: int):
+            return Customer(id=id, name="Bob")
+
+    @Module(controllers=[InvoiceController])
+    class AppModule:
+        pass
+
+    app = NidusFactory.create(AppModule)
+    with TestClient(app) as client:
+        response = client.get("/invoices/")
+        assert response.headers["content-type"] == "application/json"
+        assert [item["reference"] for item in response.json()] == [str(uuid.UUID(int=id)) for id in range(3)]
+
+        assert client.get("/invoices/4").json()["id"] == 4
+        assert client.get("/invoices/0").json() is None
+        assert client.get("/invoices/1/full").json()["customer"] == {"id": 1, "name": "Ada"}
+        assert client.get("/invoices/7/customer").content == json.dumps({"id": 7, "name": "Bob"}, separators=(",", ":")).encode()
+
+    schema = app.openapi()
+    assert "/invoices/{id}" in schema["paths"]
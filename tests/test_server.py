@@ -0,0 +1,86 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="forking workers needs os.fork")
+
+SERVER = """
+import os, sys
+from pynidus import NidusFactory, Module, Controller, Injectable, Get
+
+@Injectable()
+class WorkerState:
+    def __init__(self):
+        self.built_in = os.getpid()
+        self.started_in = None
+
+    def on_worker_start(self):
+        self.started_in = os.getpid()
+
+@Controller()
+class WorkerController:
+    def __init__(self, state: WorkerState):
+        self.state = state
+
+    @Get("/")
+    def show(self):
+        return {"pid": os.getpid(), "built_in": self.state.built_in, "started_in": self.state.started_in}
+
+@Module(controllers=[WorkerController], providers=[WorkerState])
+class AppModule:
+    pass
+
+NidusFactory.listen(AppModule, port=int(sys.argv[1]), workers=2, log_level="warning")
+"""
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def get(port: int, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                return json.loads(response.read())
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+def test_listen_forks_workers_sharing_the_built_application(tmp_path):
+    port = free_port()
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    parent = subprocess.Popen([sys.executable, str(script), str(port)], env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)})
+    try:
+        pids = set()
+        deadline = time.monotonic() + 10
+        while len(pids) < 2 and time.monotonic() < deadline:
+            body = get(port)
+            # Built once in the parent, on_worker_start ran in the worker
+            assert body["built_in"] == parent.pid
+            assert body["started_in"] == body["pid"] != parent.pid
+            pids.add(body["pid"])
+        assert len(pids) == 2
+
+        # A crashed worker is replaced
+        crashed = pids.pop()
+        os.kill(crashed, signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            pid = get(port)["pid"]
+            if pid not in pids and pid != crashed:
+                break
+        else:
+            pytest.fail("the crashed worker was not restarted")
+    finally:
+        parent.send_signal(signal.SIGTERM)
+        assert parent.wait(timeout=10) == 0
@@ -0,0 +1,67 @@
+import json
+import logging
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Get, Injectable
+
+def build_module():
+    @Injectable()
+    class Settings:
+        def __init__(self):
+            self.table = [str(index) for index in range(20_000)]
+
+    @Injectable()
+    class UserService:
+        def __init__(self, settings: Settings):
+            self.settings = settings
+
+    @Controller("/users")
+    class UserController:
+        def __init__(self, service: UserService):
+            self.service = service
+
+        @Get("/")
+        def index(self):
+            return []
+
+    @Module(providers=[Settings], exports=[Settings])
+    class ConfigModule:
+        pass
+
+    @Module(imports=[ConfigModule], controllers=[UserController], providers=[UserService])
+    class AppModule:
+        pass
+
+    return AppModule
+
+def test_startup_report_records_providers_and_controllers(caplog):
+    with caplog.at_level(logging.INFO, logger="pynidus"):
+        app = NidusFactory.create(build_module(), profile_startup=True)
+    report = app.state.nidus.startup_report
+
+    spans = {span.name.rsplit(".", 1)[-1]: span for span in report.spans}
+    assert [span.kind for span in report.spans][:1] == ["compile"]
+    settings = spans["Settings"]
+    assert settings.kind == "provider"
+    assert settings.module == "ConfigModule"
+    assert [link.rsplit(".", 1)[-1] for link in settings.chain] == ["AppModule", "UserController", "UserService", "Settings"]
+    assert settings.allocated > 500_000
+    assert spans["UserController"].kind == "controller"
+    assert report.slowest(1)[0] is settings
+    assert list(report.by_module())[0] == "ConfigModule"
+    assert "Startup:" in caplog.text and "Settings" in caplog.text
+
+    with TestClient(app) as client:
+        assert client.get("/users/").json() == []
+
+def test_startup_profile_writes_chrome_trace(tmp_path):
+    path = tmp_path / "startup.json"
+    app = NidusFactory.create(build_module(), profile_startup=str(path))
+
+    events = json.loads(path.read_text())["traceEvents"]
+    assert len(events) == len(app.state.nidus.startup_report.spans)
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    assert {event["cat"] for event in events} >= {"compile", "provider", "controller"}
+
+def test_startup_is_not_profiled_by_default():
+    app = NidusFactory.create(build_module())
+    assert app.state.nidus.startup_report is None
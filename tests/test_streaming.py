@@ -0,0 +1,179 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from pynidus import NidusFactory, Module, Controller, Get, Stream, ServerSentEvent
+from pynidus.core.streaming import iterate
+
+closed = []
+
+@Controller("/export")
+class ExportController:
+    @Get("/numbers/{count}")
+    def numbers(self, count: int):
+        for index in range(count):
+            yield {"n": index}
+
+    @Get("/letters")
+    async def letters(self):
+        for letter in "abc":
+            await asyncio.sleep(0)
+            yield {"letter": letter}
+
+    @Stream(format="csv")
+    @Get("/users")
+    def users(self):
+        return [{"id": 1, "name": "Ada"}, {"id": 2, "name": "Grace, Hopper"}]
+
+    @Get("/events")
+    async def events(self):
+        yield "hello"
+        yield ServerSentEvent({"done": True}, event="end", id="2")
+
+    @Get("/forever")
+    async def forever(self):
+        try:
+            index = 0
+            while True:
+                yield {"tick": index}
+                index += 1
+                await asyncio.sleep(0)
+        finally:
+            closed.append("async")
+
+    @Get("/forever-sync")
+    def forever_sync(self):
+        try:
+            while True:
+                yield {"tick": 1}
+        finally:
+            closed.append("sync")
+
+    @Get("/slow-sync")
+    def slow_sync(self):
+        try:
+            while True:
+                yield {"tick": 1}
+                # Still running in its thread when the client goes away
+                time.sleep(0.2)
+        finally:
+            closed.append("slow")
+
+    @Stream()
+    @Get("/threads")
+    def threads(self):
+        # Built before streaming starts, as with a blocking query
+        return [{"thread": threading.get_ident()}]
+
+    @Get("/plain")
+    def plain(self):
+        return {"plain": True}
+
+@Module(controllers=[ExportController])
+class StreamingModule:
+    pass
+
+@pytest.fixture
+def client():
+    return TestClient(NidusFactory.create(StreamingModule))
+
+def test_generators_stream_ndjson(client):
+    response = client.get("/export/numbers/3")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+    response = client.get("/export/letters")
+    assert response.text == '{"letter":"a"}\n{"letter":"b"}\n{"letter":"c"}\n'
+
+def test_stream_decorator_sets_format(client):
+    response = client.get("/export/users")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == ["id,name", "1,Ada", '2,"Grace, Hopper"']
+
+def test_accept_header_selects_format(client):
+    response = client.get("/export/numbers/2", headers={"Accept": "text/csv"})
+    assert response.text.splitlines() == ["n", "0", "1"]
+
+    response = client.get("/export/events", headers={"Accept": "text/event-stream"})
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.text == 'data: hello\n\nevent: end\nid: 2\ndata: {"done":true}\n\n'
+
+def test_sync_handlers_run_outside_the_event_loop():
+    @Controller("/loop")
+    class LoopController:
+        @Get("/")
+        async def thread(self):
+            return {"thread": threading.get_ident()}
+
+    @Module(controllers=[ExportController, LoopController])
+    class AppModule:
+        pass
+
+    with TestClient(NidusFactory.create(AppModule)) as loop_client:
+        loop_thread = loop_client.get("/loop/").json()["thread"]
+        streamed = json.loads(loop_client.get("/export/threads").text)
+    assert streamed["thread"] != loop_thread
+
+def test_regular_methods_are_not_streamed(client):
+    assert client.get("/export/plain").json() == {"plain": True}
+
+def test_openapi_still_builds(client):
+    assert "/export/numbers/{count}" in client.get("/openapi.json").json()["paths"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, kind", [("/export/forever", "async"), ("/export/forever-sync", "sync"), ("/export/slow-sync", "slow")])
+async def test_generator_is_closed_on_disconnect(path, kind):
+    app = NidusFactory.create(StreamingModule)
+    first_chunk = asyncio.Event()
+    received = []
+
+    async def receive():
+        if not received:
+            received.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await first_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_chunk.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+    assert kind in closed
+
+@pytest.mark.asyncio
+async def test_cancelled_step_finishes_before_the_generator_is_closed():
+    def slow():
+        try:
+            while True:
+                yield 1
+                time.sleep(0.2)
+        finally:
+            closed.append("cancelled")
+
+    async def consume():
+        async for _ in iterate(slow()):
+            pass
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert "cancelled" in closed
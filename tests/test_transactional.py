@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import Mock
-from pynidus import Transactional, TransactionManager
+from pynidus import NidusFactory, Module, Injectable, Transactional, TransactionManager, transactional
 
 class MockTransactionManager:
     def __init__(self):
@@ -83,3 +83,112 @@ def test_missing_manager_attribute():
     service = TestServiceMissingManager()
     with pytest.raises(AttributeError, match="has no 'transaction_manager' attribute"):
         service.method()
+
+class AsyncManager:
+    def __init__(self):
+        self.calls = []
+
+    async def begin(self):
+        self.calls.append("begin")
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+def test_manager_is_classified_once_per_type():
+    from pynidus.common.decorators.transactional import classify_manager, _classified
+
+    assert classify_manager(AsyncManager()) == (True, True, False)
+    assert _classified[AsyncManager] == (True, True, False)
+
+    # Methods set on the instance are not cached by type
+    classify_manager(MockTransactionManager())
+    assert MockTransactionManager not in _classified
+
+@pytest.mark.asyncio
+async def test_lazy_managers_are_classified_by_their_real_type():
+    @Injectable()
+    class SyncManager:
+        def __init__(self):
+            self.calls = []
+
+        def begin(self):
+            self.calls.append("begin")
+
+        def commit(self):
+            self.calls.append("commit")
+
+        def rollback(self):
+            self.calls.append("rollback")
+
+    @Injectable()
+    class AsyncTransactionManager(AsyncManager):
+        pass
+
+    @Injectable()
+    class SyncService:
+        def __init__(self, transaction_manager: SyncManager):
+            self.transaction_manager = transaction_manager
+
+        @Transactional()
+        async def run(self):
+            return "sync"
+
+    @Injectable()
+    class AsyncService:
+        def __init__(self, transaction_manager: AsyncTransactionManager):
+            self.transaction_manager = transaction_manager
+
+        @Transactional()
+        async def run(self):
+            return "async"
+
+    @Module(providers=[SyncManager, AsyncTransactionManager, SyncService, AsyncService])
+    class AppModule:
+        pass
+
+    container = NidusFactory.create(AppModule, lazy=True).state.nidus.container
+    assert await container[SyncService].run() == "sync"
+    assert await container[AsyncService].run() == "async"
+
+    assert container[SyncManager].calls == ["begin", "commit"]
+    assert container[AsyncTransactionManager].calls == ["begin", "commit"]
+
+def test_transactional_context_manager():
+    manager = MockTransactionManager()
+
+    with transactional(manager) as active:
+        assert active is manager
+    manager.commit.assert_called_once()
+
+    with pytest.raises(ValueError):
+        with transactional(manager):
+            raise ValueError("error")
+    manager.rollback.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_transactional_async_context_manager():
+    manager = AsyncManager()
+
+    async with transactional(manager):
+        pass
+    with pytest.raises(ValueError):
+        async with transactional(manager):
+            raise ValueError("error")
+
+    assert manager.calls == ["begin", "commit", "begin", "rollback"]
+
+@pytest.mark.asyncio
+async def test_failed_commit_rolls_back():
+    manager = AsyncManager()
+
+    async def failing_commit():
+        raise RuntimeError("commit failed")
+    manager.commit = failing_commit
+
+    with pytest.raises(RuntimeError, match="commit failed"):
+        async with transactional(manager):
+            pass
+    assert manager.calls == ["begin", "rollback"]